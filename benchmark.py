@@ -0,0 +1,167 @@
+#!/usr/bin/python
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+
+from deck_of_cards import Card, DeckOfCards, SUITS, generateDeck
+from poker_hand import ScoredPokerHand, evaluate_hand
+import play_poker
+
+
+# One seven card hand for each entry of ScoredPokerHand.SCORE_CLASS, as (suit index, value) pairs
+SCORE_CLASS_HANDS = [
+	[(3,11),(3,9),(2,8),(1,7),(2,5),(0,4),(3,2)],
+	[(3,2),(3,8),(3,5),(1,4),(2,8),(2,9),(3,7)],
+	[(3,2),(3,8),(3,5),(1,5),(2,7),(2,9),(3,7)],
+	[(1,2),(3,13),(3,2),(1,11),(2,2),(2,9),(3,6)],
+	[(2,10),(2,9),(1,8),(0,7),(2,6),(3,4),(2,2)],
+	[(3,7),(0,7),(3,2),(3,11),(3,6),(2,2),(3,5)],
+	[(3,7),(0,7),(3,2),(1,7),(0,6),(2,2),(3,5)],
+	[(3,7),(3,13),(3,2),(1,11),(0,11),(2,11),(3,11)],
+	[(2,13),(2,12),(2,11),(2,10),(2,9),(1,2),(0,3)],
+	[(0,14),(0,13),(0,12),(0,11),(0,10),(1,2),(2,3)],
+]
+
+SORT_SIZE = 1000
+
+def score_class_hand(score_class):
+	return [Card(SUITS[suit], value) for suit, value in SCORE_CLASS_HANDS[score_class]]
+
+def _random_hands(num_of_hands, seed=0):
+	rng = random.Random(seed)
+	deck = [card for card in generateDeck()]
+	return [rng.sample(deck, 7) for i in xrange(num_of_hands)]
+
+def _deck_construction():
+	return DeckOfCards
+
+def _draw_cards():
+	# One deck built up front, so only the reset and the draws are timed
+	deck = DeckOfCards()
+	def draw_cards():
+		deck.reset()
+		deck.draw_cards(9)
+	return draw_cards
+
+def _scored_poker_hand(score_class):
+	def setup():
+		list_of_cards = score_class_hand(score_class)
+		return lambda: ScoredPokerHand(list_of_cards)
+	return setup
+
+def _evaluate_hand(score_class):
+	def setup():
+		list_of_cards = score_class_hand(score_class)
+		return lambda: evaluate_hand(list_of_cards)
+	return setup
+
+def _sort_hands():
+	scored_hands = [ScoredPokerHand(hand) for hand in _random_hands(SORT_SIZE)]
+	return lambda: sorted(scored_hands)
+
+def _score_message():
+	scored_hands = [ScoredPokerHand(score_class_hand(score_class)) for score_class in xrange(len(SCORE_CLASS_HANDS))]
+	def score_message():
+		for scored_hand in scored_hands:
+			# Clear the cached message so every call builds it again
+			scored_hand._message = None
+			scored_hand.score_message()
+	return score_message
+
+def _play_poker():
+	devnull = open(os.devnull, 'w')
+	def play():
+		stdout = sys.stdout
+		sys.stdout = devnull
+		try:
+			play_poker.play_poker()
+		finally:
+			sys.stdout = stdout
+	return play
+
+# Each benchmark is a setup function returning the callable to time
+BENCHMARKS = [('deck_construction', _deck_construction), ('draw_cards', _draw_cards)]
+BENCHMARKS += [('scored_poker_hand.' + ScoredPokerHand.SCORE_CLASS[score_class].lower().replace(' ', '_'), _scored_poker_hand(score_class))
+	       for score_class in xrange(len(SCORE_CLASS_HANDS))]
+BENCHMARKS += [('evaluate_hand.' + ScoredPokerHand.SCORE_CLASS[score_class].lower().replace(' ', '_'), _evaluate_hand(score_class))
+	       for score_class in xrange(len(SCORE_CLASS_HANDS))]
+BENCHMARKS += [('sort_hands', _sort_hands), ('score_message', _score_message), ('play_poker', _play_poker)]
+
+def time_callable(function, repeat=3, min_time=0.2):
+	# Grows the number of calls until one run takes min_time, then keeps the fastest of repeat runs
+	timer = timeit.Timer(function)
+	number = 1
+	while True:
+		elapsed = timer.timeit(number)
+		if elapsed >= min_time or number >= 10 ** 7:
+			break
+		number *= 10
+	best = min([elapsed] + timer.repeat(repeat - 1, number)) if repeat > 1 else elapsed
+	return best / number, number
+
+def run_benchmarks(name_filter=None, repeat=3, min_time=0.2):
+	results = {}
+	for name, setup in BENCHMARKS:
+		if name_filter and name_filter not in name:
+			continue
+		seconds_per_call, number = time_callable(setup(), repeat, min_time)
+		results[name] = {'seconds_per_call': seconds_per_call, 'calls': number}
+
+	return {'python': platform.python_version(), 'results': results}
+
+def compare_results(baseline, current, threshold=0.1):
+	# Returns (name, baseline seconds, current seconds, ratio) for every benchmark in both runs,
+	# and the names whose time per call grew by more than threshold
+	comparisons = []
+	regressions = []
+	for name in sorted(current['results']):
+		if name not in baseline['results']:
+			continue
+		baseline_seconds = baseline['results'][name]['seconds_per_call']
+		current_seconds = current['results'][name]['seconds_per_call']
+		ratio = current_seconds / baseline_seconds if baseline_seconds else float('inf')
+		comparisons.append((name, baseline_seconds, current_seconds, ratio))
+		if ratio > 1 + threshold:
+			regressions.append(name)
+	return comparisons, regressions
+
+def format_results(results):
+	return '\n'.join('{0:<40}{1:>14.3f} us'.format(name, result['seconds_per_call'] * 1e6)
+			 for name, result in sorted(results['results'].items()))
+
+def format_comparison(comparisons, regressions):
+	lines = []
+	for name, baseline_seconds, current_seconds, ratio in comparisons:
+		lines.append('{0:<40}{1:>14.3f} us{2:>14.3f} us{3:>8.2f}x{4}'.format(
+			name, baseline_seconds * 1e6, current_seconds * 1e6, ratio, '  REGRESSION' if name in regressions else ''))
+	return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Time the dealing, scoring and comparison hot paths')
+	parser.add_argument('--output', default=None, help='file to write the results to as JSON')
+	parser.add_argument('--compare', default=None, help='baseline JSON file to compare the results with')
+	parser.add_argument('--threshold', type=float, default=0.1, help='slowdown ratio above 1 that counts as a regression')
+	parser.add_argument('--filter', default=None, help='only run benchmarks whose name contains this')
+	parser.add_argument('--repeat', type=int, default=3)
+	parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per timed run')
+	args = parser.parse_args()
+
+	results = run_benchmarks(args.filter, args.repeat, args.min_time)
+	if args.output:
+		with open(args.output, 'w') as output_file:
+			json.dump(results, output_file, indent=2, sort_keys=True)
+
+	if args.compare:
+		with open(args.compare) as baseline_file:
+			baseline = json.load(baseline_file)
+		comparisons, regressions = compare_results(baseline, results, args.threshold)
+		print format_comparison(comparisons, regressions)
+		sys.exit(1 if regressions else 0)
+
+	print format_results(results)
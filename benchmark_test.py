@@ -0,0 +1,53 @@
+#!/usr/bin/python
+
+import benchmark
+import poker_hand
+import unittest
+
+class testScoreClassHands(unittest.TestCase):
+	def test_scoreClasses(self):
+		for score_class in xrange(len(poker_hand.ScoredPokerHand.SCORE_CLASS)):
+			scored_hand = poker_hand.ScoredPokerHand(benchmark.score_class_hand(score_class))
+			self.assertEquals(score_class, scored_hand.score_class)
+
+class testRunBenchmarks(unittest.TestCase):
+	def test_filter(self):
+		results = benchmark.run_benchmarks('scored_poker_hand.royal', repeat=1, min_time=0.001)
+
+		self.assertEquals(['scored_poker_hand.royal_flush'], results['results'].keys())
+		self.assertTrue(results['results']['scored_poker_hand.royal_flush']['seconds_per_call'] > 0)
+
+	def test_playPoker(self):
+		results = benchmark.run_benchmarks('play_poker', repeat=1, min_time=0.001)
+
+		self.assertTrue(results['results']['play_poker']['calls'] >= 1)
+
+	def test_uniqueNames(self):
+		names = [name for name, setup in benchmark.BENCHMARKS]
+
+		self.assertEquals(len(names), len(set(names)))
+
+class testCompareResults(unittest.TestCase):
+	def setUp(self):
+		self.baseline = {'results': {'fast': {'seconds_per_call': 1.0}, 'slow': {'seconds_per_call': 1.0}, 'gone': {'seconds_per_call': 1.0}}}
+		self.current = {'results': {'fast': {'seconds_per_call': 0.5}, 'slow': {'seconds_per_call': 1.5}, 'new': {'seconds_per_call': 1.0}}}
+
+	def test_regressions(self):
+		comparisons, regressions = benchmark.compare_results(self.baseline, self.current, threshold=0.1)
+
+		self.assertEquals(['slow'], regressions)
+		self.assertEquals([('fast', 1.0, 0.5, 0.5), ('slow', 1.0, 1.5, 1.5)], comparisons)
+
+	def test_threshold(self):
+		comparisons, regressions = benchmark.compare_results(self.baseline, self.current, threshold=0.6)
+
+		self.assertEquals([], regressions)
+
+	def test_format(self):
+		comparisons, regressions = benchmark.compare_results(self.baseline, self.current)
+
+		self.assertTrue('REGRESSION' in benchmark.format_comparison(comparisons, regressions).splitlines()[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
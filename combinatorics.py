@@ -0,0 +1,67 @@
+#!/usr/bin/python
+
+
+class Error(Exception):
+	pass
+
+class CombinationRangeError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+def binomial(n, k):
+	if k < 0 or k > n:
+		return 0
+	k = min(k, n - k)
+	result = 1
+	for i in xrange(1, k + 1):
+		result = result * (n - k + i) // i
+	return result
+
+def rank_combination(combination, n):
+	# Position of an increasing combination of range(n) in lexicographic order
+	k = len(combination)
+	index = 0
+	previous = -1
+	for i, element in enumerate(combination):
+		for skipped in xrange(previous + 1, element):
+			index += binomial(n - skipped - 1, k - i - 1)
+		previous = element
+	return index
+
+def unrank_combination(index, n, k):
+	if index < 0 or index >= binomial(n, k):
+		raise CombinationRangeError('Expected index between 0 and {0}, observed value: {1}'.format(binomial(n, k) - 1, index))
+
+	combination = []
+	element = 0
+	for i in xrange(k):
+		count = binomial(n - element - 1, k - i - 1)
+		while index >= count:
+			index -= count
+			element += 1
+			count = binomial(n - element - 1, k - i - 1)
+		combination.append(element)
+		element += 1
+	return combination
+
+def iterate_combinations(n, k, start=0, stop=None):
+	# Yields (first_changed, combination) for combinations start to stop - 1 in
+	# lexicographic order. Only positions from first_changed on differ from the
+	# previous combination, so callers can keep state for the unchanged prefix.
+	# The same list is yielded every time and is updated in place.
+	if stop is None:
+		stop = binomial(n, k)
+	if start >= stop:
+		return
+
+	combination = unrank_combination(start, n, k)
+	yield 0, combination
+
+	for index in xrange(start + 1, stop):
+		i = k - 1
+		while combination[i] == n - k + i:
+			i -= 1
+		combination[i] += 1
+		for j in xrange(i + 1, k):
+			combination[j] = combination[j - 1] + 1
+		yield i, combination
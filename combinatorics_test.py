@@ -0,0 +1,57 @@
+#!/usr/bin/python
+
+import combinatorics
+import itertools
+import unittest
+
+class testBinomial(unittest.TestCase):
+	def test_values(self):
+		self.assertEquals(1712304, combinatorics.binomial(48, 5))
+		self.assertEquals(133784560, combinatorics.binomial(52, 7))
+		self.assertEquals(1, combinatorics.binomial(5, 0))
+		self.assertEquals(1, combinatorics.binomial(5, 5))
+
+	def test_outOfRange(self):
+		self.assertEquals(0, combinatorics.binomial(5, 6))
+		self.assertEquals(0, combinatorics.binomial(5, -1))
+
+class testRankCombination(unittest.TestCase):
+	def test_roundTrip(self):
+		for index, combination in enumerate(itertools.combinations(xrange(9), 4)):
+			self.assertEquals(index, combinatorics.rank_combination(list(combination), 9))
+			self.assertEquals(list(combination), combinatorics.unrank_combination(index, 9, 4))
+
+	def test_unrankOutOfRange(self):
+		self.assertRaises(combinatorics.CombinationRangeError, combinatorics.unrank_combination, 126, 9, 4)
+		self.assertRaises(combinatorics.CombinationRangeError, combinatorics.unrank_combination, -1, 9, 4)
+
+class testIterateCombinations(unittest.TestCase):
+	def test_all(self):
+		combinations = [list(combination) for first_changed, combination in combinatorics.iterate_combinations(8, 3)]
+
+		self.assertEquals([list(combination) for combination in itertools.combinations(xrange(8), 3)], combinations)
+
+	def test_range(self):
+		combinations = [list(combination) for first_changed, combination in combinatorics.iterate_combinations(8, 3, 10, 20)]
+
+		self.assertEquals([list(combination) for combination in itertools.combinations(xrange(8), 3)][10:20], combinations)
+
+	def test_firstChanged(self):
+		previous = None
+		for first_changed, combination in combinatorics.iterate_combinations(7, 4, 3):
+			if previous is not None:
+				self.assertEquals(previous[:first_changed], combination[:first_changed])
+				self.assertNotEquals(previous[first_changed], combination[first_changed])
+			else:
+				self.assertEquals(0, first_changed)
+			previous = list(combination)
+
+	def test_empty(self):
+		self.assertEquals([], list(combinatorics.iterate_combinations(8, 3, 5, 5)))
+
+	def test_chooseZero(self):
+		self.assertEquals([(0, [])], list(combinatorics.iterate_combinations(8, 0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,23 +20,47 @@ class DeckOfCardsEmptyError(Error):
 	def __init__(self, msg):
 		self.msg = msg
 
+class CardParseError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
 def generateDeck():
-	for suit in SUITS:
-		for num in xrange(2,15):
-			yield Card(suit,num)
+	for card in DECK_ORDER:
+		yield card
 
 class Card(object):
-	
-	def __init__(self,suit,value):
+	__slots__ = ('suit', 'value', 'id', 'mask')
+
+	_interned = {}
+
+	def __new__(cls, suit, value):
+		try:
+			return cls._interned[(suit, value)]
+		except (KeyError, TypeError):
+			pass
 
 		if suit not in SUITS:
 			raise CardInitializationError('Expected suit in {0}, observed value: {1}'.format(str(SUITS), str(suit)))
 
-		if value < 2 or value > 14:
-			raise CardInitializationError('Expected value to integer between 2 and 14, observed value: {0}'.format(str(value)))
+		raise CardInitializationError('Expected value to integer between 2 and 14, observed value: {0}'.format(str(value)))
 
-		self.suit = suit
-		self.value = value
+	@classmethod
+	def _intern(cls, suit, value):
+		suit_index = SUITS.index(suit)
+
+		card = object.__new__(cls)
+		card.suit = suit
+		card.value = value
+		# Cards sort by value and then by suit, so a card's id orders exactly like (value, suit)
+		card.id = (value - 2) * 4 + suit_index
+		# One 16 bit field per suit, with bit (value - 2) set inside it
+		card.mask = 1 << (16 * suit_index + value - 2)
+
+		cls._interned[(suit, value)] = card
+		return card
+
+	def __reduce__(self):
+		return (Card, (self.suit, self.value))
 
 	def __str__(self):
 		if self.value < 11:
@@ -44,35 +68,135 @@ class Card(object):
 		else:
 			return str(NAMED_VALUES[self.value][0]) + self.suit[0] 
 
-	def __cmp__(self, other):
+	def __hash__(self):
+		return self.id
+
+	def _other_id(self, other):
 		if not isinstance(other, Card):
 			raise CardComparisonError('Attempted to compare Card to {0}'.format(str(type(other))))
 
-		return -cmp((self.value, self.suit), (other.value, other.suit))
+		return other.id
+
+	# Higher cards sort first, so the comparisons on ids are reversed
+	def __cmp__(self, other):
+		return cmp(self._other_id(other), self.id)
+
+	def __eq__(self, other):
+		return self.id == self._other_id(other)
+
+	def __ne__(self, other):
+		return self.id != self._other_id(other)
+
+	def __lt__(self, other):
+		return self.id > self._other_id(other)
+
+	def __le__(self, other):
+		return self.id >= self._other_id(other)
+
+	def __gt__(self, other):
+		return self.id < self._other_id(other)
+
+	def __ge__(self, other):
+		return self.id <= self._other_id(other)
+
+# All 52 cards, indexed by Card.id
+CARDS = [Card._intern(suit, value) for value in xrange(2,15) for suit in SUITS]
+
+# The order generateDeck has always dealt the cards in
+DECK_ORDER = [Card(suit, num) for suit in SUITS for num in xrange(2,15)]
+
+def _card_strings():
+	# Every accepted spelling of every card: the output of Card.__str__, T for ten and either case
+	card_strings = {}
+	for card in CARDS:
+		value_strings = [str(card)[:-1]]
+		if card.value == 10:
+			value_strings.append('T')
+		suit_string = card.suit[0]
+		for value_string in value_strings:
+			for string in [value_string + suit_string, value_string.lower() + suit_string.lower(),
+				       value_string + suit_string.lower(), value_string.lower() + suit_string]:
+				card_strings[string] = card
+	return card_strings
+
+_CARD_STRINGS = _card_strings()
+
+def parse_card(string):
+	try:
+		return _CARD_STRINGS[string]
+	except (KeyError, TypeError):
+		raise CardParseError('Could not parse a card from {0!r}'.format(string))
+
+def parse_cards(string):
+	# A whole hand such as "As Kd 7c 7h 2s", cards separated by whitespace
+	try:
+		return [_CARD_STRINGS[token] for token in string.split()]
+	except KeyError:
+		bad_tokens = [token for token in string.split() if token not in _CARD_STRINGS]
+		raise CardParseError('Could not parse a card from {0!r} in {1!r}'.format(bad_tokens[0], string))
+	except (AttributeError, TypeError):
+		raise CardParseError('Could not parse cards from {0!r}'.format(string))
+
+def parse_card_lines(lines):
+	# One hand per line, blank lines give empty hands so results stay aligned with the input
+	card_strings = _CARD_STRINGS
+	for line_number, line in enumerate(lines, 1):
+		try:
+			yield [card_strings[token] for token in line.split()]
+		except KeyError:
+			bad_tokens = [token for token in line.split() if token not in card_strings]
+			raise CardParseError('Line {0}: could not parse a card from {1!r}'.format(line_number, bad_tokens[0]))
+		except (AttributeError, TypeError):
+			raise CardParseError('Line {0}: could not parse cards from {1!r}'.format(line_number, line))
 
 
 class DeckOfCards(object):
 
-	def __init__(self):
-		self.cards_left= [card for card in generateDeck()]
+	def __init__(self, rng=None, seed=None, excluded_cards=()):
+		if rng is None:
+			rng = random.Random(seed) if seed is not None else random
+		self.rng = rng
+
+		# The first _num_left cards are still in the deck, the rest have been drawn
+		excluded_cards = set(excluded_cards)
+		self._cards = [card for card in DECK_ORDER if card not in excluded_cards]
+		self._num_left = len(self._cards)
+
+	@property
+	def cards_left(self):
+		return self._cards[:self._num_left]
+
+	@cards_left.setter
+	def cards_left(self, cards):
+		cards = list(cards)
+		self._cards = cards + [card for card in self._cards if card not in cards]
+		self._num_left = len(cards)
+
+	def reset(self):
+		self._num_left = len(self._cards)
 
 	def num_of_cards(self):
-		return len(self.cards_left)
+		return self._num_left
 
 	def draw_card(self):
-		if self.num_of_cards():
-			new_card = random.choice(self.cards_left)	
-			self.cards_left.remove(new_card)
+		if self._num_left:
+			# One step of a Fisher-Yates shuffle: swap a random card to the end of the deck
+			cards = self._cards
+			index = int(self.rng.random() * self._num_left)
+			self._num_left -= 1
+			new_card = cards[index]
+			cards[index] = cards[self._num_left]
+			cards[self._num_left] = new_card
 			return new_card
 		else:
 			raise DeckOfCardsEmptyError('Attempted to draw a card from an empty deck')
 
 	def draw_cards(self, num):
-		if self.num_of_cards() >= num:
-			new_cards = random.sample(self.cards_left, num)
-			for new_card in new_cards:	
-				self.cards_left.remove(new_card)
-			return new_cards
+		if num < 0:
+			raise ValueError('Attempted to draw a negative number of cards: {0}'.format(str(num)))
+
+		if self._num_left >= num:
+			return [self.draw_card() for i in xrange(num)]
 		else:
 			raise DeckOfCardsEmptyError('Attempted to draw {0} card(s) from a deck of {1} card(s)'.format(str(num),  str(self.num_of_cards())))
 
@@ -1,6 +1,8 @@
 #!/usr/bin/python
 
 import deck_of_cards
+import pickle
+import random
 import unittest
 
 class testGenerateDeck(unittest.TestCase):
@@ -122,6 +124,98 @@ class testCard(unittest.TestCase):
 
 		self.assertTrue(card_1 < card_2)
 
+	def test_eqError(self):
+		card_1 = deck_of_cards.Card('Hearts', 3)
+
+		self.assertRaises(deck_of_cards.CardComparisonError, card_1.__eq__, "foo")
+
+	def test_sortedMatchesValueSuitOrder(self):
+		cards = [card for card in deck_of_cards.generateDeck()]
+
+		self.assertEquals(sorted(cards), sorted(cards, key=lambda card: (card.value, card.suit), reverse=True))
+
+	def test_interned(self):
+		self.assertTrue(deck_of_cards.Card('Hearts', 3) is deck_of_cards.Card('Hearts', 3))
+
+	def test_generateDeckInterned(self):
+		for card in deck_of_cards.generateDeck():
+			self.assertTrue(card is deck_of_cards.Card(card.suit, card.value))
+
+	def test_noInstanceDict(self):
+		card = deck_of_cards.Card('Hearts', 3)
+
+		self.assertRaises(AttributeError, setattr, card, 'colour', 'Red')
+
+	def test_ids(self):
+		ids = [card.id for card in deck_of_cards.generateDeck()]
+
+		self.assertEquals(sorted(ids), range(52))
+		self.assertTrue(all(deck_of_cards.CARDS[card_id].id == card_id for card_id in ids))
+
+	def test_masks(self):
+		combined_mask = 0
+		for card in deck_of_cards.generateDeck():
+			self.assertEquals(combined_mask & card.mask, 0)
+			combined_mask |= card.mask
+
+		self.assertEquals(deck_of_cards.Card('Clubs', 2).mask, 1)
+		self.assertEquals(deck_of_cards.Card('Spades', 14).mask, 1 << 60)
+
+	def test_hash(self):
+		card = deck_of_cards.Card('Diamonds', 12)
+
+		self.assertEquals(hash(card), card.id)
+		self.assertEquals(len(set(deck_of_cards.generateDeck())), 52)
+
+	def test_pickleInterned(self):
+		card = deck_of_cards.Card('Spades', 11)
+
+		for protocol in xrange(pickle.HIGHEST_PROTOCOL + 1):
+			self.assertTrue(pickle.loads(pickle.dumps(card, protocol)) is card)
+
+
+class testParseCards(unittest.TestCase):
+	def test_inverseOfStr(self):
+		for card in deck_of_cards.generateDeck():
+			self.assertTrue(deck_of_cards.parse_card(str(card)) is card)
+
+	def test_alternateSpellings(self):
+		ten_of_hearts = deck_of_cards.Card('Hearts', 10)
+
+		for string in ['10H', 'TH', 'Th', 'th', '10h']:
+			self.assertTrue(deck_of_cards.parse_card(string) is ten_of_hearts)
+		self.assertTrue(deck_of_cards.parse_card('as') is deck_of_cards.Card('Spades', 14))
+
+	def test_badCard(self):
+		for string in ['1S', 'AX', 'A', '', 'As ', None]:
+			self.assertRaises(deck_of_cards.CardParseError, deck_of_cards.parse_card, string)
+
+	def test_parseHand(self):
+		cards = deck_of_cards.parse_cards('As Kd 7c  7h\t10S')
+
+		self.assertEquals([deck_of_cards.Card('Spades', 14), deck_of_cards.Card('Diamonds', 13), deck_of_cards.Card('Clubs', 7),
+			deck_of_cards.Card('Hearts', 7), deck_of_cards.Card('Spades', 10)], cards)
+
+	def test_parseHandBadCard(self):
+		self.assertRaises(deck_of_cards.CardParseError, deck_of_cards.parse_cards, 'As Kx 7c')
+
+	def test_parseHandNotAString(self):
+		self.assertRaises(deck_of_cards.CardParseError, deck_of_cards.parse_cards, None)
+		self.assertRaises(deck_of_cards.CardParseError, list, deck_of_cards.parse_card_lines(['As Kd', None]))
+
+	def test_parseLines(self):
+		hands = list(deck_of_cards.parse_card_lines(['As Kd\n', '\n', '2c 3c 4c\n']))
+
+		self.assertEquals([[deck_of_cards.Card('Spades', 14), deck_of_cards.Card('Diamonds', 13)], [],
+			[deck_of_cards.Card('Clubs', value) for value in [2, 3, 4]]], hands)
+
+	def test_parseLinesBadCard(self):
+		try:
+			list(deck_of_cards.parse_card_lines(['As Kd', 'Qs Zz']))
+			self.fail('Expected a CardParseError')
+		except deck_of_cards.CardParseError as error:
+			self.assertTrue(error.msg.startswith('Line 2'))
+
 
 class testDeckOfCard(unittest.TestCase):
 	def setUp(self):
@@ -176,6 +270,61 @@ class testDeckOfCard(unittest.TestCase):
 		self.deck_of_cards.cards_left = self.deck_of_cards.cards_left[10:20]
 		self.assertRaises(deck_of_cards.DeckOfCardsEmptyError, self.deck_of_cards.draw_cards, 12)
 
+	def test_drawCardsAll(self):
+		drawn_cards = self.deck_of_cards.draw_cards(52)
+
+		self.assertEquals(len(set(drawn_cards)), 52)
+		self.assertEquals(self.deck_of_cards.num_of_cards(), 0)
+
+	def test_drawCardsFromSetCards(self):
+		cards = self.deck_of_cards.cards_left[10:20]
+		self.deck_of_cards.cards_left = cards
+
+		self.assertEquals(sorted(self.deck_of_cards.draw_cards(10)), sorted(cards))
+
+	def test_reset(self):
+		self.deck_of_cards.draw_cards(20)
+		self.deck_of_cards.reset()
+
+		self.assertEquals(self.deck_of_cards.num_of_cards(), 52)
+		self.assertEquals(sorted(self.deck_of_cards.cards_left), sorted(deck_of_cards.generateDeck()))
+
+	def test_resetAfterSetCards(self):
+		self.deck_of_cards.cards_left = self.deck_of_cards.cards_left[10:20]
+		self.deck_of_cards.reset()
+
+		self.assertEquals(self.deck_of_cards.num_of_cards(), 52)
+
+	def test_seed(self):
+		deck_1 = deck_of_cards.DeckOfCards(seed=5)
+		deck_2 = deck_of_cards.DeckOfCards(seed=5)
+
+		self.assertEquals(deck_1.draw_cards(9), deck_2.draw_cards(9))
+
+	def test_rng(self):
+		deck_1 = deck_of_cards.DeckOfCards(rng=random.Random(3))
+		deck_2 = deck_of_cards.DeckOfCards(seed=3)
+
+		self.assertEquals(deck_1.draw_cards(9), deck_2.draw_cards(9))
+
+	def test_excludedCards(self):
+		excluded_cards = [deck_of_cards.Card('Spades', 14), deck_of_cards.Card('Hearts', 2)]
+		deck = deck_of_cards.DeckOfCards(excluded_cards=excluded_cards)
+		deck.draw_cards(10)
+		deck.reset()
+
+		self.assertEquals(deck.num_of_cards(), 50)
+		self.assertFalse(any(card in excluded_cards for card in deck.draw_cards(50)))
+
+	def test_drawCardUniform(self):
+		deck = deck_of_cards.DeckOfCards(seed=1)
+		counts = dict((card, 0) for card in deck_of_cards.generateDeck())
+		for i in xrange(5200):
+			deck.reset()
+			counts[deck.draw_card()] += 1
+
+		self.assertTrue(all(50 <= count <= 150 for count in counts.values()))
+
 
 if __name__ == '__main__':
     unittest.main()
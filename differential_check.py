@@ -0,0 +1,163 @@
+#!/usr/bin/python
+
+import argparse
+import itertools
+import multiprocessing
+import random
+import sys
+import time
+
+from combinatorics import iterate_combinations
+from deck_of_cards import CARDS
+from poker_hand import ScoredPokerHand, IncrementalPokerHand, evaluate_hand, evaluate_batch, pack_score, numpy
+import hand_census
+
+
+class Error(Exception):
+	pass
+
+class DifferentialBackendError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+def reference_rank(list_of_cards):
+	# The rank of the original scoring code, built from its score tuple rather than from ScoredPokerHand.rank
+	return pack_score(ScoredPokerHand(list_of_cards)._score_tuple())
+
+def _evaluate_hand_backend(hands):
+	return [evaluate_hand(hand) for hand in hands]
+
+def _incremental_backend(hands):
+	return [IncrementalPokerHand(hand).rank() for hand in hands]
+
+def _batch_backend(hands):
+	return evaluate_batch([[card.id for card in hand] for hand in hands]).tolist()
+
+# Each backend scores a list of seven card hands and returns their ranks
+BACKENDS = {
+	'evaluate_hand': _evaluate_hand_backend,
+	'incremental': _incremental_backend,
+	'batch': _batch_backend,
+}
+
+CHUNK_SIZE = 4096
+
+def _sample_hands(seed, num_of_hands):
+	rng = random.Random(seed)
+	for i in xrange(num_of_hands):
+		yield rng.sample(CARDS, 7)
+
+def _enumerate_hands(start, stop):
+	for first_changed, combination in iterate_combinations(52, 7, start, stop):
+		yield [CARDS[i] for i in combination]
+
+def _check_shard(task):
+	backend_name, hands_spec, max_mismatches = task
+	backend = BACKENDS[backend_name]
+	hands = _sample_hands(*hands_spec[1:]) if hands_spec[0] == 'sample' else _enumerate_hands(*hands_spec[1:])
+
+	num_checked = 0
+	num_of_mismatches = 0
+	mismatches = []
+	while True:
+		chunk = list(itertools.islice(hands, CHUNK_SIZE))
+		if not chunk:
+			break
+		for hand, rank in itertools.izip(chunk, backend(chunk)):
+			expected_rank = reference_rank(hand)
+			if rank != expected_rank:
+				num_of_mismatches += 1
+				if len(mismatches) < max_mismatches:
+					mismatches.append((' '.join(str(card) for card in hand), expected_rank, rank))
+		num_checked += len(chunk)
+
+	return num_checked, num_of_mismatches, mismatches
+
+class DifferentialResult(object):
+
+	def __init__(self, backend_name):
+		self.backend_name = backend_name
+		self.num_checked = 0
+		self.num_of_mismatches = 0
+		self.elapsed = 0.0
+
+	def throughput(self):
+		return self.num_checked / self.elapsed if self.elapsed else 0.0
+
+	def __str__(self):
+		return '{0}: {1} hands checked, {2} mismatches, {3:.0f} hands per second'.format(
+			self.backend_name, self.num_checked, self.num_of_mismatches, self.throughput())
+
+def run_check(backend_name='evaluate_hand', num_of_samples=None, start=0, stop=None, shards=None, processes=None,
+	      seed=None, mismatch_file=None, max_mismatches_per_shard=1000):
+	# Compares the backend with the reference on num_of_samples random hands, or, when num_of_samples
+	# is None, on every hand with a lexicographic index from start to stop. Mismatches are written to
+	# mismatch_file as they arrive, at most max_mismatches_per_shard from each shard.
+	if backend_name not in BACKENDS:
+		raise DifferentialBackendError('Expected backend in {0}, observed value: {1}'.format(sorted(BACKENDS), backend_name))
+	if backend_name == 'batch' and numpy is None:
+		raise DifferentialBackendError('The batch backend requires numpy')
+
+	if processes is None:
+		processes = multiprocessing.cpu_count()
+	if shards is None:
+		shards = 4 * processes
+
+	if num_of_samples is not None:
+		seed_rng = random.Random(seed)
+		hands_specs = [('sample', seed_rng.getrandbits(64), num_of_samples * (shard + 1) // shards - num_of_samples * shard // shards)
+			       for shard in xrange(shards)]
+	else:
+		if stop is None:
+			stop = hand_census.NUM_OF_HANDS
+		hands_specs = [('enumerate', start + (stop - start) * shard // shards, start + (stop - start) * (shard + 1) // shards)
+			       for shard in xrange(shards)]
+	tasks = [(backend_name, hands_spec, max_mismatches_per_shard) for hands_spec in hands_specs]
+
+	result = DifferentialResult(backend_name)
+	start_time = time.time()
+	if processes == 1:
+		shard_results = itertools.imap(_check_shard, tasks)
+		pool = None
+	else:
+		pool = multiprocessing.Pool(processes)
+		shard_results = pool.imap_unordered(_check_shard, tasks)
+
+	try:
+		for num_checked, num_of_mismatches, mismatches in shard_results:
+			result.num_checked += num_checked
+			result.num_of_mismatches += num_of_mismatches
+			if mismatch_file is not None:
+				for hand, expected_rank, rank in mismatches:
+					mismatch_file.write('{0}\t{1:#010x}\t{2:#010x}\n'.format(hand, expected_rank, rank))
+				mismatch_file.flush()
+	finally:
+		if pool is not None:
+			pool.terminate()
+			pool.join()
+
+	result.elapsed = time.time() - start_time
+	return result
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Check a fast evaluator against ScoredPokerHand')
+	parser.add_argument('--backend', default='evaluate_hand', choices=sorted(BACKENDS))
+	parser.add_argument('--samples', type=int, default=None, help='check this many random hands instead of every hand')
+	parser.add_argument('--start', type=int, default=0, help='first hand index to check when enumerating')
+	parser.add_argument('--stop', type=int, default=None, help='hand index to stop at when enumerating')
+	parser.add_argument('--shards', type=int, default=None)
+	parser.add_argument('--processes', type=int, default=None, help='worker processes, defaults to one per core')
+	parser.add_argument('--seed', type=int, default=None)
+	parser.add_argument('--mismatches', default=None, help='file to write mismatching hands to, defaults to stdout')
+	args = parser.parse_args()
+
+	mismatch_file = open(args.mismatches, 'w') if args.mismatches else sys.stdout
+	try:
+		result = run_check(args.backend, args.samples, args.start, args.stop, args.shards, args.processes, args.seed, mismatch_file)
+	finally:
+		if args.mismatches:
+			mismatch_file.close()
+
+	print >> sys.stderr, result
+	sys.exit(1 if result.num_of_mismatches else 0)
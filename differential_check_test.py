@@ -0,0 +1,70 @@
+#!/usr/bin/python
+
+import differential_check
+import poker_hand
+import StringIO
+import unittest
+
+def _brokenBackend(hands):
+	return [poker_hand.evaluate_hand(hand) if hand[0].value != 2 else 0 for hand in hands]
+
+class testRunCheck(unittest.TestCase):
+	def setUp(self):
+		differential_check.BACKENDS['broken'] = _brokenBackend
+
+	def tearDown(self):
+		del differential_check.BACKENDS['broken']
+
+	def test_samples(self):
+		result = differential_check.run_check(num_of_samples=1000, shards=3, processes=1, seed=1)
+
+		self.assertEquals(1000, result.num_checked)
+		self.assertEquals(0, result.num_of_mismatches)
+
+	def test_enumerate(self):
+		result = differential_check.run_check('incremental', start=5000, stop=6000, shards=2, processes=1)
+
+		self.assertEquals(1000, result.num_checked)
+		self.assertEquals(0, result.num_of_mismatches)
+
+	def test_processPool(self):
+		result = differential_check.run_check(num_of_samples=500, shards=4, processes=2, seed=3)
+
+		self.assertEquals(500, result.num_checked)
+		self.assertEquals(0, result.num_of_mismatches)
+
+	@unittest.skipIf(poker_hand.numpy is None, 'numpy is not installed')
+	def test_batch(self):
+		result = differential_check.run_check('batch', num_of_samples=1000, shards=1, processes=1, seed=2)
+
+		self.assertEquals(0, result.num_of_mismatches)
+
+	def test_mismatches(self):
+		mismatch_file = StringIO.StringIO()
+		result = differential_check.run_check('broken', start=0, stop=300, shards=3, processes=1,
+						      mismatch_file=mismatch_file, max_mismatches_per_shard=5)
+
+		lines = mismatch_file.getvalue().splitlines()
+		self.assertEquals(300, result.num_of_mismatches)
+		self.assertEquals(15, len(lines))
+		self.assertTrue(lines[0].startswith('2C 2D 2H 2S 3C 3D 3H\t'))
+		self.assertTrue(lines[0].endswith('\t0x00000000'))
+
+	def test_unknownBackend(self):
+		self.assertRaises(differential_check.DifferentialBackendError, differential_check.run_check, 'missing', num_of_samples=1)
+
+	def test_report(self):
+		result = differential_check.DifferentialResult('evaluate_hand')
+		result.num_checked = 100
+		result.elapsed = 0.5
+
+		self.assertEquals('evaluate_hand: 100 hands checked, 0 mismatches, 200 hands per second', str(result))
+
+	def test_referenceRank(self):
+		list_of_cards = [card for card in poker_hand.CARDS[:7]]
+		self.assertEquals(poker_hand.pack_score(poker_hand.ScoredPokerHand(list_of_cards)._score_tuple()),
+				  differential_check.reference_rank(list_of_cards))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,398 @@
+#!/usr/bin/python
+
+import math
+import multiprocessing
+import random
+
+from timeit import default_timer
+
+from combinatorics import binomial, iterate_combinations
+from deck_of_cards import Card, CARDS, DeckOfCards, DECK_ORDER
+from poker_hand import CARD_KEYS, build_rank_tables, rank_from_key
+
+
+class Error(Exception):
+	pass
+
+class EquityCardNumberError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class EquityCardTypeError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class EquityCardUniquenessError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class EquityPlayerNumberError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class EquityPrecisionError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class EquityTimeBudgetError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+# Rounds of an equity estimate with a target precision never get smaller than this, and
+# the interval is not trusted until there are this many samples behind it
+MIN_ROUND_TRIALS = 1000
+MIN_SAMPLES = 30
+# Against a deadline, the clock is read after every sample or, for plain sampling, this many trials
+DEADLINE_CHECK_TRIALS = 64
+
+class EquityResult(object):
+
+	def __init__(self, wins=0, ties=0, losses=0, tie_share=0.0, samples=0, sample_sum=0.0, sample_sum_of_squares=0.0):
+		self.wins = wins
+		self.ties = ties
+		self.losses = losses
+		# Sum over tied trials of the fraction of the pot won, 1/2 for a two way split and so on
+		self.tie_share = tie_share
+		# Monte Carlo runs also keep the pot share of every independent sample, which is a single
+		# trial, an antithetic pair or a round over the strata, for the error of the estimate
+		self.samples = samples
+		self.sample_sum = sample_sum
+		self.sample_sum_of_squares = sample_sum_of_squares
+
+	def trials(self):
+		return self.wins + self.ties + self.losses
+
+	def win_probability(self):
+		return float(self.wins) / self.trials() if self.trials() else 0.0
+
+	def tie_probability(self):
+		return float(self.ties) / self.trials() if self.trials() else 0.0
+
+	def loss_probability(self):
+		return float(self.losses) / self.trials() if self.trials() else 0.0
+
+	def equity(self):
+		return (self.wins + self.tie_share) / self.trials() if self.trials() else 0.0
+
+	def standard_error(self):
+		# None when there is no sampling error to estimate: an exact result or fewer than 2 samples
+		if self.samples < 2:
+			return None
+		mean = self.sample_sum / self.samples
+		variance = max(0.0, (self.sample_sum_of_squares - self.samples * mean * mean) / (self.samples - 1))
+		return math.sqrt(variance / self.samples)
+
+	def confidence_interval(self, confidence=0.95):
+		standard_error = self.standard_error()
+		if standard_error is None:
+			return None
+		half_width = normal_quantile(confidence) * standard_error
+		return max(0.0, self.equity() - half_width), min(1.0, self.equity() + half_width)
+
+	def merge(self, other):
+		self.wins += other.wins
+		self.ties += other.ties
+		self.losses += other.losses
+		self.tie_share += other.tie_share
+		self.samples += other.samples
+		self.sample_sum += other.sample_sum
+		self.sample_sum_of_squares += other.sample_sum_of_squares
+		return self
+
+	def __str__(self):
+		return 'win {0:.4f}, tie {1:.4f}, loss {2:.4f}'.format(
+			self.win_probability(), self.tie_probability(), self.loss_probability())
+
+
+def normal_quantile(confidence):
+	# The z with P(-z < Z < z) = confidence for a standard normal Z, by bisection on erf
+	if not 0 < confidence < 1:
+		raise EquityPrecisionError('Expected confidence between 0 and 1, observed value: {0}'.format(confidence))
+	low, high = 0.0, 40.0
+	for i in xrange(100):
+		middle = (low + high) / 2
+		if math.erf(middle / math.sqrt(2)) < confidence:
+			low = middle
+		else:
+			high = middle
+	return (low + high) / 2
+
+def _hand_key(list_of_cards):
+	hand_key = 0
+	card_mask = 0
+	for card in list_of_cards:
+		hand_key += CARD_KEYS[card.id]
+		card_mask |= card.mask
+	return hand_key, card_mask
+
+def _validate_situation(hole_cards, board, num_opponents):
+	if num_opponents < 0 or len(hole_cards) + num_opponents < 2:
+		raise EquityPlayerNumberError('Expected at least two players, was given {0} hand(s) and {1} opponent(s)'.format(
+			len(hole_cards), num_opponents))
+
+	for hand in hole_cards:
+		if len(hand) != 2:
+			raise EquityCardNumberError('Expected 2 hole cards per player, was given {0}'.format(len(hand)))
+
+	if len(board) > 5:
+		raise EquityCardNumberError('Expected at most 5 board cards, was given {0}'.format(len(board)))
+
+	known_cards = [card for hand in hole_cards for card in hand] + list(board)
+	for card in known_cards:
+		if not isinstance(card, Card):
+			raise EquityCardTypeError('Expected elements of type Card, found element of type {0}'.format(str(type(card))))
+
+	if len(set(known_cards)) != len(known_cards):
+		duplicate = [card for card in known_cards if known_cards.count(card) > 1][0]
+		raise EquityCardUniquenessError('Expected all cards unique, found two instances of {0}'.format(str(duplicate)))
+
+	if len(known_cards) + 2 * num_opponents + 5 - len(board) > 52:
+		raise EquityPlayerNumberError('Not enough cards in the deck for {0} opponent(s)'.format(num_opponents))
+
+	return known_cards
+
+def _record_showdown(results, ranks, best_rank, num_of_winners):
+	for result, rank in zip(results, ranks):
+		if rank != best_rank:
+			result.losses += 1
+		elif num_of_winners == 1:
+			result.wins += 1
+		else:
+			result.ties += 1
+			result.tie_share += 1.0 / num_of_winners
+
+def _simulate(task):
+	hole_cards, board, num_opponents, trials, seed, stratified, antithetic, deadline = task
+
+	known_cards = [card for hand in hole_cards for card in hand] + list(board)
+	rng = random.Random(seed)
+	board_key, board_mask = _hand_key(board)
+	hole_keys = [_hand_key(hand) for hand in hole_cards]
+	num_of_board_cards = 5 - len(board)
+	num_to_draw = 2 * num_opponents + num_of_board_cards
+
+	if stratified and num_of_board_cards:
+		# One stratum per possible first board card, all equally likely. A sample deals once
+		# from every stratum, so its mean weights the strata exactly.
+		strata = [(card, DeckOfCards(rng=rng, excluded_cards=known_cards + [card])) for card in DECK_ORDER if card not in known_cards]
+	else:
+		strata = [(None, DeckOfCards(rng=rng, excluded_cards=known_cards))]
+
+	# The antithetic partner of a deal swaps every unseen card for its opposite in id order, so
+	# high cards become low ones. The swap is one to one, so the partner is just as likely.
+	unseen_cards = [card for card in CARDS if card not in known_cards]
+	mirror = dict(zip(unseen_cards, reversed(unseen_cards)))
+
+	results = [EquityResult() for hand in hole_cards]
+	sample_size = len(strata) * (2 if antithetic else 1)
+	sample_shares = [0.0] * len(hole_cards)
+	tie_share_squares = [0.0] * len(hole_cards)
+
+	def play(drawn_cards):
+		hand_key, card_mask = board_key, board_mask
+		for card in drawn_cards[:num_of_board_cards]:
+			hand_key += CARD_KEYS[card.id]
+			card_mask |= card.mask
+
+		ranks = [rank_from_key(hand_key + key, card_mask | mask) for key, mask in hole_keys]
+		opponent_ranks = [rank_from_key(hand_key + CARD_KEYS[first.id] + CARD_KEYS[second.id], card_mask | first.mask | second.mask)
+				  for first, second in zip(drawn_cards[num_of_board_cards::2], drawn_cards[num_of_board_cards+1::2])]
+
+		best_rank = max(ranks + opponent_ranks)
+		num_of_winners = ranks.count(best_rank) + opponent_ranks.count(best_rank)
+		_record_showdown(results, ranks, best_rank, num_of_winners)
+		if sample_size > 1:
+			for i, rank in enumerate(ranks):
+				if rank == best_rank:
+					sample_shares[i] += 1.0 / num_of_winners
+		elif num_of_winners > 1:
+			for i, rank in enumerate(ranks):
+				if rank == best_rank:
+					tie_share_squares[i] += 1.0 / num_of_winners ** 2
+
+	if sample_size == 1:
+		# Every trial is a sample of its own, so the sample moments follow from the showdown counts
+		deck = strata[0][1]
+		trials_run = 0
+		while trials_run < trials:
+			chunk_trials = trials - trials_run if deadline is None else min(trials - trials_run, DEADLINE_CHECK_TRIALS)
+			for trial in xrange(chunk_trials):
+				deck.reset()
+				play(deck.draw_cards(num_to_draw))
+			trials_run += chunk_trials
+			if deadline is not None and default_timer() >= deadline:
+				break
+
+		for result, squares in zip(results, tie_share_squares):
+			result.samples = trials_run
+			result.sample_sum = result.wins + result.tie_share
+			result.sample_sum_of_squares = result.wins + squares
+		return results
+
+	for sample in xrange(trials // sample_size):
+		for forced_card, deck in strata:
+			deck.reset()
+			if forced_card is None:
+				drawn_cards = deck.draw_cards(num_to_draw)
+			else:
+				drawn_cards = [forced_card] + deck.draw_cards(num_to_draw - 1)
+			play(drawn_cards)
+			if antithetic:
+				play([mirror[card] for card in drawn_cards])
+
+		for i, result in enumerate(results):
+			share = sample_shares[i] / sample_size
+			result.samples += 1
+			result.sample_sum += share
+			result.sample_sum_of_squares += share * share
+			sample_shares[i] = 0.0
+
+		if deadline is not None and default_timer() >= deadline:
+			break
+
+	return results
+
+def _enumerate_boards(task):
+	hole_cards, board, start, stop = task
+
+	known_cards = set([card for hand in hole_cards for card in hand] + board)
+	remaining_cards = [card for card in DECK_ORDER if card not in known_cards]
+	remaining_keys = [CARD_KEYS[card.id] for card in remaining_cards]
+	remaining_masks = [card.mask for card in remaining_cards]
+	hole_keys = [_hand_key(hand) for hand in hole_cards]
+	num_of_board_cards = 5 - len(board)
+
+	# prefix_keys[i] and prefix_masks[i] hold the known board plus the first i drawn board cards,
+	# so moving to the next board only redoes the positions that changed
+	board_key, board_mask = _hand_key(board)
+	prefix_keys = [board_key] * (num_of_board_cards + 1)
+	prefix_masks = [board_mask] * (num_of_board_cards + 1)
+
+	results = [EquityResult() for hand in hole_cards]
+	for first_changed, combination in iterate_combinations(len(remaining_cards), num_of_board_cards, start, stop):
+		for i in xrange(first_changed, num_of_board_cards):
+			prefix_keys[i + 1] = prefix_keys[i] + remaining_keys[combination[i]]
+			prefix_masks[i + 1] = prefix_masks[i] | remaining_masks[combination[i]]
+
+		hand_key = prefix_keys[num_of_board_cards]
+		card_mask = prefix_masks[num_of_board_cards]
+		ranks = [rank_from_key(hand_key + key, card_mask | mask) for key, mask in hole_keys]
+
+		best_rank = max(ranks)
+		_record_showdown(results, ranks, best_rank, ranks.count(best_rank))
+
+	return results
+
+def _split_trials(trials, shards):
+	return [trials // shards + (1 if shard < trials % shards else 0) for shard in xrange(shards)]
+
+# Pools kept alive between calls, by number of processes, for queries against a deadline
+_shared_pools = {}
+
+def shared_pool(processes):
+	# Starting a pool, and joining it afterwards, takes longer than a tight time budget, so a
+	# deadline query with several processes reuses one of these. Calling this up front keeps
+	# even the first query's pool start out of its budget.
+	if processes not in _shared_pools:
+		# Workers inherit the rank tables, rather than filling them in inside a budget
+		build_rank_tables()
+		_shared_pools[processes] = multiprocessing.Pool(processes)
+	return _shared_pools[processes]
+
+def _run_tasks(function, tasks, pool):
+	if pool is None:
+		return map(function, tasks)
+	return pool.map(function, tasks)
+
+def _merge_results(results, shard_results):
+	for shard_result in shard_results:
+		for result, partial_result in zip(results, shard_result):
+			result.merge(partial_result)
+	return results
+
+def calculate_equity(hole_cards, board=(), num_opponents=0, trials=100000, processes=None, shards=None, seed=None, exact=False,
+		     stratified=False, antithetic=False, precision=None, confidence=0.95, time_budget=None):
+	start_time = default_timer()
+	hole_cards = [list(hand) for hand in hole_cards]
+	board = list(board)
+	known_cards = _validate_situation(hole_cards, board, num_opponents)
+
+	if time_budget is not None:
+		if exact:
+			raise EquityTimeBudgetError('Exact equity cannot be cut short, was given a time budget of {0}s'.format(time_budget))
+		if time_budget < 0:
+			raise EquityTimeBudgetError('Expected a time budget of at least 0 seconds, observed value: {0}'.format(time_budget))
+
+	if processes is None:
+		# Against a deadline, sampling in process beats starting a pool inside the budget
+		processes = multiprocessing.cpu_count() if time_budget is None else 1
+	if shards is None:
+		shards = processes
+
+	if exact:
+		# Walk every possible completion of the board, split into contiguous ranges of board indices
+		if num_opponents:
+			raise EquityPlayerNumberError('Exact equity needs every hand known, was given {0} random opponent(s)'.format(num_opponents))
+
+		num_of_boards = binomial(52 - len(known_cards), 5 - len(board))
+		tasks = []
+		start = 0
+		for shard_boards in _split_trials(num_of_boards, shards):
+			tasks.append((hole_cards, board, start, start + shard_boards))
+			start += shard_boards
+		pool = multiprocessing.Pool(processes) if processes != 1 else None
+		try:
+			return _merge_results([EquityResult() for hand in hole_cards], _run_tasks(_enumerate_boards, tasks, pool))
+		finally:
+			if pool is not None:
+				pool.close()
+				pool.join()
+
+	if precision is not None and not 0 < precision < 1:
+		raise EquityPrecisionError('Expected precision between 0 and 1, observed value: {0}'.format(precision))
+	z = normal_quantile(confidence) if precision is not None else None
+
+	# Each shard draws from its own generator, seeded from one master stream, so a
+	# given seed and shard count give the same answer however many processes run them.
+	# Shards run whole samples, a round over the strata and antithetic pairs, so at most
+	# trials are dealt, rounded down to whole samples.
+	# Without a precision all trials run in one round; with one, rounds run until the widest
+	# confidence interval is narrow enough, and trials becomes an upper bound.
+	# With a time budget every shard also stops sampling at the deadline, after at least
+	# one sample or, for plain sampling, one check's worth of trials.
+	sample_size = (52 - len(known_cards) if stratified and len(board) < 5 else 1) * (2 if antithetic else 1)
+	deadline = start_time + time_budget if time_budget is not None else None
+	seed_rng = random.Random(seed)
+	results = [EquityResult() for hand in hole_cards]
+	round_trials = trials if precision is None else min(trials, MIN_ROUND_TRIALS)
+	if processes == 1:
+		pool = None
+	elif time_budget is not None:
+		pool = shared_pool(processes)
+	else:
+		pool = multiprocessing.Pool(processes)
+	try:
+		while round_trials >= sample_size:
+			tasks = [(hole_cards, board, num_opponents, shard_samples * sample_size, seed_rng.getrandbits(64), stratified, antithetic, deadline)
+				 for shard_samples in _split_trials(round_trials // sample_size, shards) if shard_samples]
+			_merge_results(results, _run_tasks(_simulate, tasks, pool))
+
+			trials_done = results[0].trials()
+			if precision is None or (deadline is not None and default_timer() >= deadline):
+				break
+			half_width = z * max(result.standard_error() for result in results) if results[0].samples >= MIN_SAMPLES else None
+			if half_width is not None and half_width <= precision:
+				break
+
+			# The half width shrinks with the square root of the trials, which predicts the trials still needed
+			if half_width is None:
+				needed_trials = trials_done
+			else:
+				needed_trials = int(trials_done * (half_width / precision) ** 2) - trials_done
+			round_trials = min(max(needed_trials, MIN_ROUND_TRIALS), trials_done, trials - trials_done)
+	finally:
+		if pool is not None and time_budget is None:
+			pool.close()
+			pool.join()
+
+	return results
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+
+import collections
+import multiprocessing
+import pickle
+import shelve
+
+from equity import EquityResult, _validate_situation, calculate_equity
+from suit_isomorphism import situation_from_key, situation_key
+
+
+class Error(Exception):
+	pass
+
+class EquityCacheSizeError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+def _copy_results(results):
+	return [EquityResult(result.wins, result.ties, result.losses, result.tie_share, result.samples, result.sample_sum, result.sample_sum_of_squares)
+		for result in results]
+
+class EquityCache(object):
+	# Answers calculate_equity queries from memory when an earlier query differed only by
+	# suit relabelling and card order. A seeded Monte Carlo result is reused for any query with
+	# the same trials, seed, shards and sampling options, whatever its processes.
+
+	def __init__(self, max_entries=100000, max_bytes=None, path=None):
+		if max_entries is not None and max_entries < 1:
+			raise EquityCacheSizeError('Expected max_entries of at least 1, observed value: {0}'.format(max_entries))
+		if max_bytes is not None and max_bytes < 1:
+			raise EquityCacheSizeError('Expected max_bytes of at least 1, observed value: {0}'.format(max_bytes))
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+
+		# Least recently used first. Entry sizes are their pickled length, a stable stand in for memory.
+		self._entries = collections.OrderedDict()
+		self._sizes = {}
+		self.num_of_bytes = 0
+
+		# An optional shelf keeps every result across restarts, the memory bound does not apply to it
+		self._store = shelve.open(path, protocol=pickle.HIGHEST_PROTOCOL) if path is not None else None
+
+		self.hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def _key(self, hole_cards, board, num_opponents, trials, processes, shards, seed, exact, stratified, antithetic, precision, confidence):
+		rounds = hole_cards + [board]
+		if exact:
+			trials = seed = stratified = antithetic = precision = None
+		if precision is None:
+			confidence = None
+		# Each shard draws from its own seed, so a seeded answer depends on the shard count
+		if exact or seed is None:
+			shards = None
+		elif shards is None:
+			shards = processes if processes is not None else multiprocessing.cpu_count()
+		return (situation_key(rounds), len(rounds), num_opponents, exact, trials, seed, shards, stratified, antithetic, precision, confidence)
+
+	def _insert(self, key, results):
+		size = len(pickle.dumps((key, results), pickle.HIGHEST_PROTOCOL))
+		if self.max_bytes is not None and size > self.max_bytes:
+			return
+		self._entries[key] = results
+		self._sizes[key] = size
+		self.num_of_bytes += size
+
+		while ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+		       (self.max_bytes is not None and self.num_of_bytes > self.max_bytes)):
+			evicted_key, evicted_results = self._entries.popitem(last=False)
+			self.num_of_bytes -= self._sizes.pop(evicted_key)
+			self.evictions += 1
+
+	def calculate_equity(self, hole_cards, board=(), num_opponents=0, trials=100000, processes=None, shards=None, seed=None, exact=False,
+			     stratified=False, antithetic=False, precision=None, confidence=0.95, time_budget=None):
+		if time_budget is not None:
+			# How far a deadline run gets depends on the load at the time, so it is never cached
+			return calculate_equity(hole_cards, board, num_opponents, trials, processes, shards, seed, exact,
+						stratified, antithetic, precision, confidence, time_budget)
+
+		hole_cards = [list(hand) for hand in hole_cards]
+		board = list(board)
+		_validate_situation(hole_cards, board, num_opponents)
+		key = self._key(hole_cards, board, num_opponents, trials, processes, shards, seed, exact, stratified, antithetic, precision, confidence)
+
+		results = self._entries.pop(key, None)
+		if results is not None:
+			self.hits += 1
+		elif self._store is not None and repr(key) in self._store:
+			self.disk_hits += 1
+			results = self._store[repr(key)]
+		else:
+			self.misses += 1
+			# The canonical situation is computed, so a seeded query answers the same for every relabelling
+			canonical_rounds = situation_from_key(key[0], key[1])
+			results = calculate_equity(canonical_rounds[:-1], canonical_rounds[-1], num_opponents, trials, processes, shards, seed, exact,
+						   stratified, antithetic, precision, confidence)
+			if self._store is not None:
+				self._store[repr(key)] = results
+
+		if key in self._sizes:
+			# A hit, put it back as the most recently used
+			self._entries[key] = results
+		else:
+			self._insert(key, results)
+		return _copy_results(results)
+
+	def __len__(self):
+		return len(self._entries)
+
+	def stats(self):
+		return {'entries': len(self._entries), 'bytes': self.num_of_bytes, 'hits': self.hits, 'disk_hits': self.disk_hits,
+			'misses': self.misses, 'evictions': self.evictions}
+
+	def clear(self):
+		# Empties memory only, the shelf keeps its results
+		self._entries.clear()
+		self._sizes.clear()
+		self.num_of_bytes = 0
+
+	def sync(self):
+		if self._store is not None:
+			self._store.sync()
+
+	def close(self):
+		if self._store is not None:
+			self._store.close()
+			self._store = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
@@ -0,0 +1,148 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import equity
+import equity_cache
+import os
+import shutil
+import tempfile
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+def equities(results):
+	return [result.equity() for result in results]
+
+class testEquityCache(unittest.TestCase):
+	def setUp(self):
+		self.hole_cards = [cardListCreator([(0,14),(1,14)]), cardListCreator([(2,13),(2,12)])]
+		self.board = cardListCreator([(0,2),(3,7),(2,9),(1,11)])
+		# The same situation with clubs and hearts swapped and the cards reordered
+		self.relabelled_hole_cards = [cardListCreator([(1,14),(2,14)]), cardListCreator([(0,12),(0,13)])]
+		self.relabelled_board = cardListCreator([(0,9),(2,2),(1,11),(3,7)])
+		self.cache = equity_cache.EquityCache()
+
+	def test_exactMatchesEquity(self):
+		results = self.cache.calculate_equity(self.hole_cards, self.board, processes=1, exact=True)
+		expected = equity.calculate_equity(self.hole_cards, self.board, processes=1, exact=True)
+
+		self.assertEquals([(r.wins, r.ties, r.losses) for r in expected], [(r.wins, r.ties, r.losses) for r in results])
+
+	def test_relabelledHit(self):
+		results = self.cache.calculate_equity(self.hole_cards, self.board, processes=1, exact=True)
+		relabelled_results = self.cache.calculate_equity(self.relabelled_hole_cards, self.relabelled_board, processes=1, exact=True)
+
+		self.assertEquals(equities(results), equities(relabelled_results))
+		self.assertEquals(1, self.cache.misses)
+		self.assertEquals(1, self.cache.hits)
+
+	def test_seededMonteCarlo(self):
+		results = self.cache.calculate_equity(self.hole_cards, processes=1, trials=500, seed=3)
+		relabelled_results = self.cache.calculate_equity(self.relabelled_hole_cards, processes=1, trials=500, seed=3)
+		other_seed_results = self.cache.calculate_equity(self.hole_cards, processes=1, trials=500, seed=4)
+
+		self.assertEquals(equities(results), equities(relabelled_results))
+		self.assertEquals(500, other_seed_results[0].trials())
+		self.assertEquals(2, self.cache.misses)
+
+	def test_seededShards(self):
+		one_shard = self.cache.calculate_equity(self.hole_cards, processes=1, shards=1, trials=500, seed=3)
+		two_shards = self.cache.calculate_equity(self.hole_cards, processes=1, shards=2, trials=500, seed=3)
+		expected = equity.calculate_equity(self.hole_cards, processes=1, shards=2, trials=500, seed=3)
+
+		self.assertEquals(2, self.cache.misses)
+		self.assertEquals(equities(expected), equities(two_shards))
+		self.assertNotEquals(equities(one_shard), equities(two_shards))
+
+	def test_defaultShards(self):
+		self.cache.calculate_equity(self.hole_cards, processes=1, trials=500, seed=3)
+		self.cache.calculate_equity(self.hole_cards, processes=1, shards=1, trials=500, seed=3)
+
+		self.assertEquals(1, self.cache.hits)
+
+	def test_samplingOptions(self):
+		results = self.cache.calculate_equity(self.hole_cards, processes=1, trials=500, seed=3, stratified=True)
+		plain_results = self.cache.calculate_equity(self.hole_cards, processes=1, trials=500, seed=3)
+		cached_results = self.cache.calculate_equity(self.relabelled_hole_cards, processes=1, trials=500, seed=3, stratified=True)
+
+		self.assertEquals(2, self.cache.misses)
+		self.assertEquals(results[0].standard_error(), cached_results[0].standard_error())
+		self.assertNotEquals(results[0].samples, plain_results[0].samples)
+
+	def test_timeBudgetNotCached(self):
+		results = self.cache.calculate_equity(self.hole_cards, processes=1, trials=10000000, time_budget=0.01)
+
+		self.assertTrue(0 < results[0].trials() < 10000000)
+		self.assertEquals(0, len(self.cache))
+		self.assertEquals(0, self.cache.misses)
+
+	def test_resultsAreCopies(self):
+		results = self.cache.calculate_equity(self.hole_cards, self.board, processes=1, exact=True)
+		results[0].merge(results[0])
+
+		self.assertEquals(44, self.cache.calculate_equity(self.hole_cards, self.board, processes=1, exact=True)[0].trials())
+
+	def test_entryEviction(self):
+		cache = equity_cache.EquityCache(max_entries=2)
+		boards = [self.board[:3] + [cardCreator(3, value)] for value in [3, 4, 5]]
+		for board in boards:
+			cache.calculate_equity(self.hole_cards, board, processes=1, exact=True)
+		cache.calculate_equity(self.hole_cards, boards[0], processes=1, exact=True)
+
+		self.assertEquals(2, len(cache))
+		self.assertEquals(2, cache.evictions)
+		self.assertEquals(4, cache.misses)
+
+	def test_leastRecentlyUsedEvicted(self):
+		cache = equity_cache.EquityCache(max_entries=2)
+		boards = [self.board[:3] + [cardCreator(3, value)] for value in [3, 4, 5]]
+		cache.calculate_equity(self.hole_cards, boards[0], processes=1, exact=True)
+		cache.calculate_equity(self.hole_cards, boards[1], processes=1, exact=True)
+		cache.calculate_equity(self.hole_cards, boards[0], processes=1, exact=True)
+		cache.calculate_equity(self.hole_cards, boards[2], processes=1, exact=True)
+		cache.calculate_equity(self.hole_cards, boards[0], processes=1, exact=True)
+
+		self.assertEquals(2, cache.hits)
+		self.assertEquals(3, cache.misses)
+
+	def test_byteBound(self):
+		cache = equity_cache.EquityCache(max_entries=None, max_bytes=1)
+		cache.calculate_equity(self.hole_cards, self.board, processes=1, exact=True)
+
+		self.assertEquals(0, len(cache))
+		self.assertEquals(0, cache.num_of_bytes)
+
+		cache = equity_cache.EquityCache(max_entries=None, max_bytes=10 ** 6)
+		cache.calculate_equity(self.hole_cards, self.board, processes=1, exact=True)
+		self.assertEquals(cache.stats()['bytes'], cache.num_of_bytes)
+		self.assertTrue(0 < cache.num_of_bytes <= 10 ** 6)
+
+	def test_badSize(self):
+		self.assertRaises(equity_cache.EquityCacheSizeError, equity_cache.EquityCache, max_entries=0)
+		self.assertRaises(equity_cache.EquityCacheSizeError, equity_cache.EquityCache, max_bytes=0)
+
+	def test_validates(self):
+		self.assertRaises(equity.EquityCardUniquenessError, self.cache.calculate_equity,
+			[self.hole_cards[0], self.hole_cards[0]], processes=1)
+
+	def test_diskStore(self):
+		directory = tempfile.mkdtemp()
+		try:
+			path = os.path.join(directory, 'equity')
+			with equity_cache.EquityCache(path=path) as cache:
+				results = cache.calculate_equity(self.hole_cards, self.board, processes=1, exact=True)
+
+			with equity_cache.EquityCache(path=path) as cache:
+				stored_results = cache.calculate_equity(self.relabelled_hole_cards, self.relabelled_board, processes=1, exact=True)
+				self.assertEquals(1, cache.disk_hits)
+				self.assertEquals(0, cache.misses)
+				self.assertEquals(equities(results), equities(stored_results))
+		finally:
+			shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
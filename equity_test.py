@@ -0,0 +1,280 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import equity
+import itertools
+import poker_hand
+import time
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+class testEquityResult(unittest.TestCase):
+	def test_probabilities(self):
+		result = equity.EquityResult(wins=6, ties=2, losses=2, tie_share=1.0)
+
+		self.assertEquals(10, result.trials())
+		self.assertAlmostEquals(0.6, result.win_probability())
+		self.assertAlmostEquals(0.2, result.tie_probability())
+		self.assertAlmostEquals(0.2, result.loss_probability())
+		self.assertAlmostEquals(0.7, result.equity())
+
+	def test_empty(self):
+		self.assertEquals(0.0, equity.EquityResult().win_probability())
+
+	def test_merge(self):
+		result = equity.EquityResult(wins=1, ties=2, losses=3, tie_share=1.0)
+		result.merge(equity.EquityResult(wins=4, ties=5, losses=6, tie_share=2.5))
+
+		self.assertEquals((5, 7, 9, 3.5), (result.wins, result.ties, result.losses, result.tie_share))
+
+	def test_standardError(self):
+		# Samples of 1, 0, 1, 0.5: mean 0.625, sample variance 0.22916...
+		result = equity.EquityResult(wins=2, ties=1, losses=1, tie_share=0.5, samples=4, sample_sum=2.5, sample_sum_of_squares=2.25)
+
+		self.assertAlmostEquals((0.6875 / 3 / 4) ** 0.5, result.standard_error())
+
+	def test_confidenceInterval(self):
+		result = equity.EquityResult(wins=2, ties=1, losses=1, tie_share=0.5, samples=4, sample_sum=2.5, sample_sum_of_squares=2.25)
+		low, high = result.confidence_interval(0.9)
+
+		self.assertAlmostEquals(0.625 - 1.6449 * result.standard_error(), low, places=3)
+		self.assertEquals(1.0, high)
+
+	def test_noSamples(self):
+		result = equity.EquityResult(wins=6, ties=2, losses=2, tie_share=1.0)
+
+		self.assertEquals(None, result.standard_error())
+		self.assertEquals(None, result.confidence_interval())
+
+	def test_normalQuantile(self):
+		self.assertAlmostEquals(1.95996, equity.normal_quantile(0.95), places=4)
+		self.assertRaises(equity.EquityPrecisionError, equity.normal_quantile, 1.0)
+
+class testCalculateEquity(unittest.TestCase):
+	def setUp(self):
+		self.aces = cardListCreator([(0,14),(1,14)])
+		self.kings = cardListCreator([(2,13),(3,13)])
+
+	def test_acesKings(self):
+		aces_result, kings_result = equity.calculate_equity([self.aces, self.kings], trials=20000, processes=1, seed=1)
+
+		self.assertEquals(20000, aces_result.trials())
+		self.assertTrue(0.79 < aces_result.win_probability() < 0.85)
+		self.assertEquals(aces_result.wins, kings_result.losses)
+		self.assertEquals(aces_result.ties, kings_result.ties)
+
+	def test_fullBoard(self):
+		board = cardListCreator([(2,14),(3,2),(3,7),(0,9),(1,10)])
+		aces_result, kings_result = equity.calculate_equity([self.aces, self.kings], board=board, trials=50, processes=1)
+
+		self.assertEquals(50, aces_result.wins)
+		self.assertEquals(50, kings_result.losses)
+
+	def test_splitPot(self):
+		board = cardListCreator([(2,5),(2,6),(2,7),(2,8),(2,9)])
+		results = equity.calculate_equity([self.aces, self.kings], board=board, trials=10, processes=1)
+
+		self.assertEquals([10, 10], [result.ties for result in results])
+		self.assertEquals([5.0, 5.0], [result.tie_share for result in results])
+
+	def test_randomOpponents(self):
+		result, = equity.calculate_equity([self.aces], num_opponents=3, trials=5000, processes=1, seed=2)
+
+		self.assertTrue(0.58 < result.equity() < 0.70)
+
+	def test_seedDeterministic(self):
+		first = equity.calculate_equity([self.aces, self.kings], trials=500, processes=1, shards=3, seed=9)
+		second = equity.calculate_equity([self.aces, self.kings], trials=500, processes=1, shards=3, seed=9)
+
+		self.assertEquals([result.wins for result in first], [result.wins for result in second])
+
+	def test_processPool(self):
+		in_process = equity.calculate_equity([self.aces, self.kings], trials=2000, processes=1, shards=2, seed=4)
+		pooled = equity.calculate_equity([self.aces, self.kings], trials=2000, processes=2, shards=2, seed=4)
+
+		self.assertEquals([(result.wins, result.ties) for result in in_process], [(result.wins, result.ties) for result in pooled])
+
+	def test_standardErrorOfTrials(self):
+		aces_result, kings_result = equity.calculate_equity([self.aces, self.kings], trials=20000, processes=1, shards=2, seed=1)
+		equity_value = aces_result.equity()
+
+		self.assertEquals(20000, aces_result.samples)
+		self.assertAlmostEquals((equity_value * (1 - equity_value) / 19999) ** 0.5, aces_result.standard_error(), places=4)
+
+	def assertNearExact(self, board, results):
+		exact_results = equity.calculate_equity([self.aces, self.kings], board=board, processes=1, exact=True)
+		for result, exact_result in zip(results, exact_results):
+			self.assertTrue(abs(result.equity() - exact_result.equity()) < 4 * result.standard_error())
+
+	def test_stratified(self):
+		board = cardListCreator([(2,10),(3,2),(3,7)])
+		results = equity.calculate_equity([self.aces, self.kings], board=board, trials=5000, processes=1, seed=3, stratified=True)
+
+		# Whole rounds over the 45 possible turn cards
+		self.assertEquals(4995, results[0].trials())
+		self.assertEquals(111, results[0].samples)
+		self.assertNearExact(board, results)
+
+	def test_antithetic(self):
+		board = cardListCreator([(2,10),(3,2),(3,7)])
+		results = equity.calculate_equity([self.aces, self.kings], board=board, trials=5000, processes=1, seed=3, antithetic=True)
+
+		self.assertEquals(5000, results[0].trials())
+		self.assertEquals(2500, results[0].samples)
+		self.assertNearExact(board, results)
+
+	def test_trialsBoundSamples(self):
+		for options in [{'stratified': True}, {'antithetic': True}, {'stratified': True, 'antithetic': True}]:
+			results = equity.calculate_equity([self.aces, self.kings], trials=1000, processes=1, shards=8, seed=3, **options)
+			self.assertTrue(900 < results[0].trials() <= 1000)
+
+		# Fewer trials than one round over the 48 strata
+		self.assertEquals(0, equity.calculate_equity([self.aces, self.kings], trials=40, processes=1, seed=3, stratified=True)[0].trials())
+
+	def test_stratifiedRandomOpponents(self):
+		result, = equity.calculate_equity([self.aces], num_opponents=3, trials=5000, processes=1, seed=2, stratified=True, antithetic=True)
+
+		self.assertTrue(0.58 < result.equity() < 0.70)
+
+	def test_precisionStopsEarly(self):
+		results = equity.calculate_equity([self.aces, self.kings], trials=1000000, processes=1, seed=5, precision=0.01)
+		low, high = results[0].confidence_interval()
+
+		self.assertTrue(results[0].trials() < 20000)
+		self.assertTrue(high - low <= 0.02)
+
+	def test_precisionTrialBound(self):
+		results = equity.calculate_equity([self.aces, self.kings], trials=3000, processes=1, seed=5, precision=0.0001)
+
+		self.assertEquals(3000, results[0].trials())
+
+	def test_precisionSeedDeterministic(self):
+		first = equity.calculate_equity([self.aces, self.kings], trials=100000, processes=1, shards=2, seed=9, precision=0.01, stratified=True)
+		second = equity.calculate_equity([self.aces, self.kings], trials=100000, processes=1, shards=2, seed=9, precision=0.01, stratified=True)
+
+		self.assertEquals([(result.wins, result.ties) for result in first], [(result.wins, result.ties) for result in second])
+
+	def test_badPrecision(self):
+		self.assertRaises(equity.EquityPrecisionError, equity.calculate_equity, [self.aces, self.kings], precision=0)
+		self.assertRaises(equity.EquityPrecisionError, equity.calculate_equity, [self.aces, self.kings], precision=0.01, confidence=1.5)
+
+	def test_timeBudget(self):
+		start = time.time()
+		results = equity.calculate_equity([self.aces, self.kings], trials=10000000, processes=1, seed=1, time_budget=0.05)
+		elapsed = time.time() - start
+
+		self.assertTrue(elapsed < 0.5)
+		self.assertTrue(equity.DEADLINE_CHECK_TRIALS <= results[0].trials() < 10000000)
+		self.assertEquals(results[0].trials(), results[0].samples)
+		self.assertTrue(0.7 < results[0].equity() < 0.9)
+		self.assertTrue(results[0].standard_error() > 0)
+
+	def test_timeBudgetDefaultProcesses(self):
+		start = time.time()
+		results = equity.calculate_equity([self.aces, self.kings], trials=10000000, seed=1, time_budget=0.05)
+
+		self.assertTrue(time.time() - start < 0.09)
+		self.assertTrue(0 < results[0].trials() < 10000000)
+
+	def test_timeBudgetSharedPool(self):
+		# The shared pool outlives the call, so only the first start up is paid, and not inside a budget here
+		pool = equity.shared_pool(2)
+		start = time.time()
+		results = equity.calculate_equity([self.aces, self.kings], trials=10000000, processes=2, seed=1, time_budget=0.05)
+
+		self.assertTrue(time.time() - start < 0.09)
+		self.assertTrue(0 < results[0].trials() < 10000000)
+		self.assertTrue(pool is equity.shared_pool(2))
+
+	def test_timeBudgetSpent(self):
+		# Even a spent budget leaves one check's worth of trials per shard to estimate from
+		results = equity.calculate_equity([self.aces, self.kings], trials=10000000, processes=1, shards=2, seed=1, time_budget=0)
+
+		self.assertEquals(2 * equity.DEADLINE_CHECK_TRIALS, results[0].trials())
+
+	def test_timeBudgetTrialBound(self):
+		results = equity.calculate_equity([self.aces, self.kings], trials=500, processes=1, seed=1, time_budget=10)
+
+		self.assertEquals(500, results[0].trials())
+
+	def test_timeBudgetWithPrecision(self):
+		results = equity.calculate_equity([self.aces, self.kings], trials=10000000, processes=1, seed=1, stratified=True,
+						  precision=0.0001, time_budget=0.05)
+
+		self.assertTrue(0 < results[0].trials() < 10000000)
+
+	def test_badTimeBudget(self):
+		self.assertRaises(equity.EquityTimeBudgetError, equity.calculate_equity, [self.aces, self.kings], time_budget=-1)
+		self.assertRaises(equity.EquityTimeBudgetError, equity.calculate_equity, [self.aces, self.kings], exact=True, time_budget=1)
+
+	def assertMatchesScoredPokerHand(self, board, results):
+		expected_wins = [0, 0]
+		expected_ties = 0
+		remaining_cards = [card for card in deck_of_cards.generateDeck() if card not in board + self.aces + self.kings]
+		for runout in itertools.combinations(remaining_cards, 5 - len(board)):
+			aces_hand = poker_hand.ScoredPokerHand(board + list(runout) + self.aces)
+			kings_hand = poker_hand.ScoredPokerHand(board + list(runout) + self.kings)
+			if aces_hand > kings_hand:
+				expected_wins[0] += 1
+			elif aces_hand < kings_hand:
+				expected_wins[1] += 1
+			else:
+				expected_ties += 1
+
+		self.assertEquals(expected_wins, [result.wins for result in results])
+		self.assertEquals([expected_ties] * 2, [result.ties for result in results])
+
+	def test_exactFlop(self):
+		board = cardListCreator([(2,14),(3,2),(3,7)])
+		results = equity.calculate_equity([self.aces, self.kings], board=board, processes=1, shards=3, exact=True)
+
+		self.assertEquals([990, 990], [result.trials() for result in results])
+		self.assertMatchesScoredPokerHand(board, results)
+
+	def test_exactTurn(self):
+		board = cardListCreator([(2,5),(3,6),(1,9),(0,10)])
+		results = equity.calculate_equity([self.aces, self.kings], board=board, processes=1, shards=2, exact=True)
+
+		self.assertMatchesScoredPokerHand(board, results)
+
+	def test_exactShardsAgree(self):
+		board = cardListCreator([(2,14),(3,2)])
+		one_shard = equity.calculate_equity([self.aces, self.kings], board=board, processes=1, shards=1, exact=True)
+		pooled = equity.calculate_equity([self.aces, self.kings], board=board, processes=2, shards=5, exact=True)
+
+		self.assertEquals([(result.wins, result.ties, result.losses) for result in one_shard],
+				  [(result.wins, result.ties, result.losses) for result in pooled])
+
+	def test_exactRandomOpponents(self):
+		self.assertRaises(equity.EquityPlayerNumberError, equity.calculate_equity, [self.aces, self.kings], num_opponents=1, exact=True)
+
+	def test_splitTrials(self):
+		self.assertEquals([4, 3, 3], equity._split_trials(10, 3))
+
+	def test_onePlayer(self):
+		self.assertRaises(equity.EquityPlayerNumberError, equity.calculate_equity, [self.aces])
+
+	def test_badHoleCards(self):
+		self.assertRaises(equity.EquityCardNumberError, equity.calculate_equity, [self.aces + self.kings[:1], self.kings])
+
+	def test_badBoard(self):
+		board = cardListCreator([(2,2),(2,3),(2,4),(2,5),(2,6),(2,7)])
+		self.assertRaises(equity.EquityCardNumberError, equity.calculate_equity, [self.aces, self.kings], board=board)
+
+	def test_badCardType(self):
+		self.assertRaises(equity.EquityCardTypeError, equity.calculate_equity, [self.aces, ['AS', 'KS']])
+
+	def test_duplicateCards(self):
+		self.assertRaises(equity.EquityCardUniquenessError, equity.calculate_equity, [self.aces, self.aces])
+
+	def test_tooManyOpponents(self):
+		self.assertRaises(equity.EquityPlayerNumberError, equity.calculate_equity, [self.aces], num_opponents=24)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/python
+
+import argparse
+import errno
+import itertools
+import json
+import sys
+import time
+
+from deck_of_cards import CardParseError, parse_cards
+from hand_history import FIELD_SEPARATOR, HandHistoryFormatError, BACKENDS, _batches, _hand_lines, evaluate_hands, ordered_map, parse_hand_line
+from hand_record import HandRecordFormatError, read_records
+from poker_hand import Error as PokerHandError
+from poker_hand import ScoredPokerHand, rank_score_class
+
+
+class Error(Exception):
+	pass
+
+class EvaluateHandsFormatError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+CLASS_NAMES = [name.lower().replace(' ', '_') for name in ScoredPokerHand.SCORE_CLASS]
+OUTPUT_FORMATS = ['tsv', 'json']
+# Fewest and most cards per player each backend scores
+BACKEND_CARD_COUNTS = {'scored': (7, 7), 'evaluate_hand': (5, 7), 'batch': (7, 7)}
+
+def _check_hand(location, board, hole_cards, backend_name='evaluate_hand'):
+	# location names the hand in errors, "Line N" for text input and "Hand N" for records
+	card_mask = 0
+	for cards in [board] + hole_cards:
+		for card in cards:
+			if card_mask & card.mask:
+				raise EvaluateHandsFormatError('{0}: expected all cards unique, found two instances of {1}'.format(location, str(card)))
+			card_mask |= card.mask
+	min_cards, max_cards = BACKEND_CARD_COUNTS.get(backend_name, (5, 7))
+	for cards in hole_cards:
+		if not min_cards <= len(board) + len(cards) <= max_cards:
+			if min_cards == max_cards:
+				raise EvaluateHandsFormatError('{0}: the {1} backend expects {2} cards per player, found {3}'.format(
+					location, backend_name, max_cards, len(board) + len(cards)))
+			raise EvaluateHandsFormatError('{0}: expected {1} to {2} cards per player, found {3}'.format(
+				location, min_cards, max_cards, len(board) + len(cards)))
+
+def parse_line(line, line_number, backend_name='evaluate_hand'):
+	# A hand history line, "board | hole cards | hole cards ...", or a single hand of 5 to 7 cards,
+	# or exactly 7 for the backends that only score seven.
+	# A single hand is returned as a board with one player holding no hole cards.
+	if FIELD_SEPARATOR in line:
+		try:
+			return parse_hand_line(line, line_number)
+		except HandHistoryFormatError as error:
+			raise EvaluateHandsFormatError(error.msg)
+
+	try:
+		list_of_cards = parse_cards(line)
+	except CardParseError as error:
+		raise EvaluateHandsFormatError('Line {0}: {1}'.format(line_number, error.msg))
+	_check_hand('Line {0}'.format(line_number), list_of_cards, [[]], backend_name)
+	return list_of_cards, [[]]
+
+def _evaluate_chunk(task):
+	# Returns (hand number, ranks) rows for the hands before the first bad one, and the message of
+	# that error or None. The error itself would not survive pickling.
+	binary, chunk, backend_name = task
+	hands = []
+	error_msg = None
+	for item in chunk:
+		try:
+			if binary:
+				number, board, hole_cards = item
+				_check_hand('Hand {0}'.format(number), board, hole_cards, backend_name)
+				hands.append(item)
+			else:
+				line_number, line = item
+				hands.append((line_number,) + parse_line(line, line_number, backend_name))
+		except Error as error:
+			error_msg = error.msg
+			break
+
+	try:
+		return [(result.line_number, result.ranks) for result in evaluate_hands(hands, backend_name)], error_msg
+	except PokerHandError as error:
+		return [], error.msg
+
+def text_chunks(lines, chunk_size):
+	return _batches(_hand_lines(lines), chunk_size)
+
+def binary_chunks(record_file, chunk_size):
+	records = ((number, board, hole_cards) for number, (board, hole_cards, ranks) in enumerate(read_records(record_file), 1))
+	return _batches(records, chunk_size)
+
+def evaluate_stream(chunks, binary=False, backend_name='evaluate_hand', processes=1):
+	# Yields (hand number, ranks) for every hand, in input order
+	tasks = ((binary, chunk, backend_name) for chunk in chunks)
+	if processes == 1:
+		evaluated = itertools.imap(_evaluate_chunk, tasks)
+	else:
+		evaluated = ordered_map(_evaluate_chunk, tasks, processes)
+
+	for rows, error_msg in evaluated:
+		for row in rows:
+			yield row
+		if error_msg is not None:
+			raise EvaluateHandsFormatError(error_msg)
+
+def format_row(number, ranks, output_format='tsv'):
+	best_rank = max(ranks)
+	winners = [player for player, rank in enumerate(ranks) if rank == best_rank]
+	classes = [CLASS_NAMES[rank_score_class(rank)] for rank in ranks]
+	if output_format == 'json':
+		return json.dumps({'hand': number, 'ranks': ranks, 'classes': classes, 'winners': winners}, sort_keys=True)
+	return '{0}\t{1}\t{2}\t{3}'.format(number, ' '.join(str(rank) for rank in ranks), ' '.join(classes), ' '.join(str(player) for player in winners))
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Evaluate hands from a file or standard input. Each output row has the hand '
+		'number, every player\'s rank and score class, and the winning players.')
+	parser.add_argument('path', nargs='?', default='-', help='file to read, - for standard input')
+	parser.add_argument('--binary', action='store_true', help='read the hand_record format instead of text lines')
+	parser.add_argument('--format', default='tsv', choices=OUTPUT_FORMATS, help='output format')
+	parser.add_argument('--backend', default='evaluate_hand', choices=sorted(BACKENDS), help='scored and batch only score seven card hands')
+	parser.add_argument('--processes', type=int, default=1, help='worker processes, 0 for one per core')
+	parser.add_argument('--chunk-size', type=int, default=4096, help='hands per chunk')
+	args = parser.parse_args()
+
+	input_file = sys.stdin if args.path == '-' else open(args.path, 'rb' if args.binary else 'r')
+	chunks = binary_chunks(input_file, args.chunk_size) if args.binary else text_chunks(input_file, args.chunk_size)
+
+	num_of_hands = 0
+	exit_code = 0
+	start_time = time.time()
+	try:
+		for number, ranks in evaluate_stream(chunks, args.binary, args.backend, args.processes or None):
+			sys.stdout.write(format_row(number, ranks, args.format) + '\n')
+			num_of_hands += 1
+		sys.stdout.flush()
+	except (EvaluateHandsFormatError, HandRecordFormatError) as error:
+		print >> sys.stderr, error.msg
+		exit_code = 1
+	except IOError as error:
+		# The reader of a pipeline stopped early, such as head
+		if error.errno != errno.EPIPE:
+			raise
+	finally:
+		if input_file is not sys.stdin:
+			input_file.close()
+
+	elapsed = time.time() - start_time
+	print >> sys.stderr, 'Evaluated {0} hands in {1:.2f}s, {2:.0f} hands per second'.format(
+		num_of_hands, elapsed, num_of_hands / elapsed if elapsed > 0 else 0.0)
+	sys.exit(exit_code)
@@ -0,0 +1,156 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import evaluate_hands
+import hand_record
+import itertools
+import json
+import os
+import poker_hand
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+class testParseLine(unittest.TestCase):
+	def test_singleHand(self):
+		board, hole_cards = evaluate_hands.parse_line('As Kd 7c 7h 2s', 1)
+
+		self.assertEquals(cardListCreator([(3,14),(1,13),(0,7),(2,7),(3,2)]), board)
+		self.assertEquals([[]], hole_cards)
+
+	def test_handHistoryLine(self):
+		board, hole_cards = evaluate_hands.parse_line('As Kd 7c 7h 2s | Qs Qd | 3c 4c', 1)
+
+		self.assertEquals(2, len(hole_cards))
+
+	def test_tooFewCards(self):
+		self.assertRaises(evaluate_hands.EvaluateHandsFormatError, evaluate_hands.parse_line, 'As Kd 7c 7h', 1)
+
+	def test_duplicateCard(self):
+		self.assertRaises(evaluate_hands.EvaluateHandsFormatError, evaluate_hands.parse_line, 'As Kd 7c 7h As', 1)
+
+	def test_backendCardCount(self):
+		self.assertEquals(5, len(evaluate_hands.parse_line('As Kd 7c 7h 2s', 1, 'evaluate_hand')[0]))
+		self.assertRaises(evaluate_hands.EvaluateHandsFormatError, evaluate_hands.parse_line, 'As Kd 7c 7h 2s', 1, 'scored')
+		self.assertRaises(evaluate_hands.EvaluateHandsFormatError, evaluate_hands.parse_line, 'As Kd 7c 7h 2s 3s', 1, 'batch')
+
+	def test_badHandHistoryLine(self):
+		self.assertRaises(evaluate_hands.EvaluateHandsFormatError, evaluate_hands.parse_line, 'As Kd 7c 7h | Qs Qd', 1)
+
+class testEvaluateStream(unittest.TestCase):
+	def setUp(self):
+		rng = random.Random(6)
+		self.hands = [rng.sample(deck_of_cards.CARDS, 7) for i in xrange(200)]
+		self.lines = [' '.join(str(card) for card in hand) + '\n' for hand in self.hands]
+
+	def test_text(self):
+		rows = list(evaluate_hands.evaluate_stream(evaluate_hands.text_chunks(self.lines, 64)))
+
+		self.assertEquals([(number, [poker_hand.evaluate_hand(hand)]) for number, hand in enumerate(self.hands, 1)], rows)
+
+	def test_parallel(self):
+		rows = list(evaluate_hands.evaluate_stream(evaluate_hands.text_chunks(self.lines, 16), processes=2))
+
+		self.assertEquals([(number, [poker_hand.evaluate_hand(hand)]) for number, hand in enumerate(self.hands, 1)], rows)
+
+	@unittest.skipIf(poker_hand.numpy is None, 'numpy is not installed')
+	def test_batchBackend(self):
+		rows = list(evaluate_hands.evaluate_stream(evaluate_hands.text_chunks(self.lines, 64), backend_name='batch'))
+
+		self.assertEquals([[poker_hand.evaluate_hand(hand)] for hand in self.hands], [ranks for number, ranks in rows])
+
+	def test_binary(self):
+		directory = tempfile.mkdtemp()
+		try:
+			path = os.path.join(directory, 'hands.rec')
+			board = cardListCreator([(0,14),(0,13),(1,7),(2,7),(3,2)])
+			hole_cards = [cardListCreator([(3,12),(1,12)]), cardListCreator([(0,3),(0,4)])]
+			with hand_record.HandRecordWriter(path, 2) as writer:
+				writer.write(board, hole_cards)
+			with open(path, 'rb') as record_file:
+				rows = list(evaluate_hands.evaluate_stream(evaluate_hands.binary_chunks(record_file, 10), binary=True))
+		finally:
+			shutil.rmtree(directory)
+
+		self.assertEquals([(1, [poker_hand.evaluate_hand(board + cards) for cards in hole_cards])], rows)
+
+	def test_badLine(self):
+		rows = evaluate_hands.evaluate_stream(evaluate_hands.text_chunks(self.lines + ['As Kd\n'], 64))
+
+		self.assertRaises(evaluate_hands.EvaluateHandsFormatError, list, rows)
+
+	def test_rowsBeforeBadLine(self):
+		rows = evaluate_hands.evaluate_stream(evaluate_hands.text_chunks(self.lines[:2] + ['As Kd As 7h 2s\n'] + self.lines[2:], 64))
+
+		self.assertEquals([1, 2], [number for number, ranks in itertools.islice(rows, 2)])
+		try:
+			list(rows)
+			self.fail('Expected an EvaluateHandsFormatError')
+		except evaluate_hands.EvaluateHandsFormatError as error:
+			self.assertTrue(error.msg.startswith('Line 3:'))
+
+	def test_shortHandScoredBackend(self):
+		lines = self.lines[:3] + ['As Kd 7c 7h 2s\n'] + self.lines[3:]
+		rows = evaluate_hands.evaluate_stream(evaluate_hands.text_chunks(lines, 64), backend_name='scored')
+
+		self.assertEquals([(number, [poker_hand.evaluate_hand(hand)]) for number, hand in enumerate(self.hands[:3], 1)],
+				  list(itertools.islice(rows, 3)))
+		try:
+			list(rows)
+			self.fail('Expected an EvaluateHandsFormatError')
+		except evaluate_hands.EvaluateHandsFormatError as error:
+			self.assertTrue(error.msg.startswith('Line 4:'))
+
+class testFormatRow(unittest.TestCase):
+	def test_tsv(self):
+		pair_rank = poker_hand.evaluate_hand(cardListCreator([(0,8),(1,8),(2,9),(3,7),(0,5),(1,3),(2,2)]))
+		high_rank = poker_hand.evaluate_hand(cardListCreator([(0,14),(1,13),(2,9),(3,7),(0,5),(1,3),(2,2)]))
+
+		self.assertEquals('3\t{0} {1}\tpair high_card\t0'.format(pair_rank, high_rank), evaluate_hands.format_row(3, [pair_rank, high_rank]))
+
+	def test_json(self):
+		row = json.loads(evaluate_hands.format_row(3, [5, 5], 'json'))
+
+		self.assertEquals({'hand': 3, 'ranks': [5, 5], 'classes': ['high_card', 'high_card'], 'winners': [0, 1]}, row)
+
+class testCommandLine(unittest.TestCase):
+	def test_stdin(self):
+		process = subprocess.Popen([sys.executable, 'evaluate_hands.py', '--format', 'json'], stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
+		output, errors = process.communicate('As Kd 7c 7h 2s | Qs Qd | 3c 4c\n')
+
+		self.assertEquals(0, process.returncode)
+		self.assertEquals([0], json.loads(output)['winners'])
+		self.assertTrue('hands per second' in errors)
+
+	def test_badInput(self):
+		process = subprocess.Popen([sys.executable, 'evaluate_hands.py'], stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
+		output, errors = process.communicate('As Kd 7c 7h 2s\nQs Qd 3c 4c 5h\nAs Kd\n')
+
+		self.assertEquals(1, process.returncode)
+		self.assertEquals(2, len(output.splitlines()))
+		self.assertTrue('Line 3' in errors)
+		self.assertTrue('Evaluated 2 hands' in errors)
+
+	def test_shortHandScoredBackend(self):
+		process = subprocess.Popen([sys.executable, 'evaluate_hands.py', '--backend', 'scored'], stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
+		output, errors = process.communicate('As Kd 7c 7h 2s | Qs Qd | 3c 4c\nAs Kd 7c 7h 2s Qs Qd\nAs Kd 7c 7h 2s\n')
+
+		self.assertEquals(1, process.returncode)
+		self.assertEquals(2, len(output.splitlines()))
+		self.assertTrue('Line 3' in errors)
+		self.assertTrue('Evaluated 2 hands' in errors)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,346 @@
+#!/usr/bin/python
+
+import argparse
+import collections
+import json
+import os
+import Queue
+import socket
+import SocketServer
+import stat
+import threading
+from timeit import default_timer
+
+from deck_of_cards import CARDS, CardParseError, parse_cards
+from equity_cache import EquityCache
+from equity import Error as EquityError
+from poker_hand import build_rank_tables, evaluate_batch, evaluate_hand, numpy
+
+
+class Error(Exception):
+	pass
+
+class EvaluationServiceRequestError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class EvaluationServiceError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+# Requests and responses are JSON objects, one per line. Cards are strings such as "As" or "10H".
+#   {"op": "evaluate", "hands": [["As", "Kd", ...], ...]}          -> {"ranks": [...]}
+#   {"op": "equity", "hole_cards": [[...], ...], "board": [...], "num_opponents": 0,
+#    "trials": 100000, "seed": null, "exact": false}               -> {"results": [...]}
+#   {"op": "stats"}                                                -> {"stats": {...}}
+# An "id" in a request is echoed in its response, a failed request gets {"error": message}.
+
+def _percentile(sorted_samples, fraction):
+	# Nearest rank percentile
+	index = max(0, int(round(fraction * len(sorted_samples))) - 1)
+	return sorted_samples[min(index, len(sorted_samples) - 1)]
+
+class ServiceMetrics(object):
+
+	def __init__(self, max_samples=10000):
+		self._lock = threading.Lock()
+		self.start_time = default_timer()
+		self.requests = collections.defaultdict(int)
+		self.errors = 0
+		self.hands = 0
+		self.batches = 0
+		self.batched_hands = 0
+		# The most recent max_samples latencies of each op
+		self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=max_samples))
+
+	def record_request(self, op, seconds, num_of_hands=0, error=False):
+		with self._lock:
+			self.requests[op] += 1
+			self.hands += num_of_hands
+			if error:
+				self.errors += 1
+			self._latencies[op].append(seconds)
+
+	def record_batch(self, num_of_hands):
+		with self._lock:
+			self.batches += 1
+			self.batched_hands += num_of_hands
+
+	def snapshot(self):
+		with self._lock:
+			uptime = default_timer() - self.start_time
+			latency = {}
+			for op, samples in self._latencies.items():
+				sorted_samples = sorted(samples)
+				if sorted_samples:
+					latency[op] = {'p50': _percentile(sorted_samples, 0.5), 'p90': _percentile(sorted_samples, 0.9),
+						'p99': _percentile(sorted_samples, 0.99), 'max': sorted_samples[-1]}
+			num_of_requests = sum(self.requests.values())
+			return {'uptime': uptime, 'requests': dict(self.requests), 'errors': self.errors, 'hands': self.hands,
+				'requests_per_second': num_of_requests / uptime if uptime > 0 else 0.0,
+				'hands_per_second': self.hands / uptime if uptime > 0 else 0.0,
+				'batches': self.batches, 'mean_batch_size': float(self.batched_hands) / self.batches if self.batches else 0.0,
+				'latency': latency}
+
+class _BatchRequest(object):
+
+	def __init__(self, card_ids):
+		self.card_ids = card_ids
+		self.ranks = None
+		self.error = None
+		self.done = threading.Event()
+
+class MicroBatcher(object):
+	# Seven card hands from concurrent requests are queued for one thread, which waits up to
+	# max_delay after the first arrival for others and scores them with a single evaluate_batch
+
+	def __init__(self, max_batch_size=4096, max_delay=0.001, metrics=None):
+		self.max_batch_size = max_batch_size
+		self.max_delay = max_delay
+		self.metrics = metrics
+		self._queue = Queue.Queue()
+		self._thread = threading.Thread(target=self._run)
+		self._thread.daemon = True
+		self._thread.start()
+
+	def evaluate(self, card_ids):
+		request = _BatchRequest(card_ids)
+		self._queue.put(request)
+		request.done.wait()
+		if request.error is not None:
+			raise EvaluationServiceRequestError(request.error)
+		return request.ranks
+
+	def close(self):
+		self._queue.put(None)
+		self._thread.join()
+
+	def _run(self):
+		stopping = False
+		while not stopping:
+			request = self._queue.get()
+			if request is None:
+				return
+
+			requests = [request]
+			num_of_hands = len(request.card_ids)
+			deadline = default_timer() + self.max_delay
+			while num_of_hands < self.max_batch_size:
+				timeout = deadline - default_timer()
+				if timeout <= 0:
+					break
+				try:
+					request = self._queue.get(timeout=timeout)
+				except Queue.Empty:
+					break
+				if request is None:
+					stopping = True
+					break
+				requests.append(request)
+				num_of_hands += len(request.card_ids)
+
+			self._evaluate(requests, num_of_hands)
+
+	def _evaluate(self, requests, num_of_hands):
+		try:
+			card_ids = [ids for request in requests for ids in request.card_ids]
+			if numpy is not None:
+				ranks = evaluate_batch(card_ids).tolist()
+			else:
+				ranks = [evaluate_hand([CARDS[card_id] for card_id in ids]) for ids in card_ids]
+		except Exception as error:
+			for request in requests:
+				request.error = 'Batch evaluation failed: {0}'.format(error)
+				request.done.set()
+			return
+
+		if self.metrics is not None:
+			self.metrics.record_batch(num_of_hands)
+		start = 0
+		for request in requests:
+			request.ranks = ranks[start:start + len(request.card_ids)]
+			start += len(request.card_ids)
+			request.done.set()
+
+def _parse_hand(strings):
+	if not isinstance(strings, list):
+		raise EvaluationServiceRequestError('Expected a list of card strings, found {0!r}'.format(strings))
+	try:
+		return parse_cards(' '.join(strings))
+	except (CardParseError, TypeError):
+		raise EvaluationServiceRequestError('Could not parse the cards {0!r}'.format(strings))
+
+class EvaluationServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+	daemon_threads = True
+
+	def __init__(self, path, max_batch_size=4096, max_delay=0.001, cache_entries=100000):
+		# Every table is built before the first request, so no request pays for warm up
+		build_rank_tables()
+		if numpy is not None:
+			evaluate_batch(numpy.zeros((0, 7), dtype=int))
+
+		self.metrics = ServiceMetrics()
+		self.batcher = MicroBatcher(max_batch_size, max_delay, self.metrics)
+		self.equity_cache = EquityCache(max_entries=cache_entries)
+		# The cache is not thread safe, so equity requests take turns
+		self.equity_lock = threading.Lock()
+
+		if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+			# Left behind by a server that did not shut down cleanly
+			os.unlink(path)
+		SocketServer.UnixStreamServer.__init__(self, path, EvaluationRequestHandler)
+
+	def evaluate(self, request):
+		hands = request.get('hands')
+		if not isinstance(hands, list):
+			raise EvaluationServiceRequestError('Expected "hands" to be a list of hands')
+
+		ranks = [None] * len(hands)
+		batched_hands = []
+		for index, strings in enumerate(hands):
+			list_of_cards = _parse_hand(strings)
+			if not 5 <= len(list_of_cards) <= 7:
+				raise EvaluationServiceRequestError('Expected 5 to 7 cards per hand, was given {0}'.format(len(list_of_cards)))
+			if len(set(list_of_cards)) != len(list_of_cards):
+				raise EvaluationServiceRequestError('Expected all cards unique in {0!r}'.format(strings))
+			if len(list_of_cards) == 7:
+				batched_hands.append((index, [card.id for card in list_of_cards]))
+			else:
+				ranks[index] = evaluate_hand(list_of_cards)
+
+		if batched_hands:
+			for (index, card_ids), rank in zip(batched_hands, self.batcher.evaluate([card_ids for index, card_ids in batched_hands])):
+				ranks[index] = rank
+		return {'ranks': ranks}, len(hands)
+
+	def equity(self, request):
+		received = default_timer()
+		hole_cards = request.get('hole_cards')
+		if not isinstance(hole_cards, list):
+			raise EvaluationServiceRequestError('Expected "hole_cards" to be a list of hands')
+		hole_cards = [_parse_hand(strings) for strings in hole_cards]
+		board = _parse_hand(request.get('board', []))
+
+		with self.equity_lock:
+			try:
+				# A time budget counts from when the request was read, so time queued behind the lock is spent from it
+				time_budget = request.get('time_budget')
+				if time_budget is not None:
+					time_budget = max(0.0, time_budget - (default_timer() - received))
+				results = self.equity_cache.calculate_equity(hole_cards, board, num_opponents=request.get('num_opponents', 0),
+					trials=request.get('trials', 100000), processes=1, shards=1, seed=request.get('seed'), exact=request.get('exact', False),
+					time_budget=time_budget)
+			except EquityError as error:
+				raise EvaluationServiceRequestError(error.msg)
+			except (TypeError, ValueError) as error:
+				raise EvaluationServiceRequestError('Bad equity request: {0}'.format(error))
+
+		return {'results': [{'wins': result.wins, 'ties': result.ties, 'losses': result.losses, 'tie_share': result.tie_share,
+			'equity': result.equity(), 'trials': result.trials(), 'standard_error': result.standard_error()} for result in results]}, 0
+
+	def stats(self, request):
+		snapshot = self.metrics.snapshot()
+		snapshot['equity_cache'] = self.equity_cache.stats()
+		return {'stats': snapshot}, 0
+
+	OPS = {'evaluate': evaluate, 'equity': equity, 'stats': stats}
+
+	def handle_line(self, line):
+		start = default_timer()
+		request = None
+		op = None
+		num_of_hands = 0
+		try:
+			try:
+				request = json.loads(line)
+			except ValueError:
+				raise EvaluationServiceRequestError('Could not decode the request as JSON')
+			if not isinstance(request, dict):
+				raise EvaluationServiceRequestError('Expected a JSON object per request')
+			op = request.get('op')
+			if op not in self.OPS:
+				raise EvaluationServiceRequestError('Expected op in {0}, observed value: {1!r}'.format(sorted(self.OPS), op))
+			response, num_of_hands = self.OPS[op](self, request)
+			error = False
+		except EvaluationServiceRequestError as request_error:
+			response = {'error': request_error.msg}
+			error = True
+
+		if isinstance(request, dict) and 'id' in request:
+			response['id'] = request['id']
+		self.metrics.record_request(op if op in self.OPS else 'invalid', default_timer() - start, num_of_hands, error)
+		return response
+
+	def server_close(self):
+		SocketServer.UnixStreamServer.server_close(self)
+		self.batcher.close()
+		if os.path.exists(self.server_address) and stat.S_ISSOCK(os.stat(self.server_address).st_mode):
+			os.unlink(self.server_address)
+
+class EvaluationRequestHandler(SocketServer.StreamRequestHandler):
+
+	def handle(self):
+		while True:
+			line = self.rfile.readline()
+			if not line:
+				return
+			if not line.strip():
+				continue
+			self.wfile.write(json.dumps(self.server.handle_line(line)) + '\n')
+			self.wfile.flush()
+
+class EvaluationClient(object):
+
+	def __init__(self, path):
+		self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self._socket.connect(path)
+		self._file = self._socket.makefile('rw')
+
+	def _call(self, request):
+		self._file.write(json.dumps(request) + '\n')
+		self._file.flush()
+		line = self._file.readline()
+		if not line:
+			raise EvaluationServiceError('The evaluation service closed the connection')
+		response = json.loads(line)
+		if 'error' in response:
+			raise EvaluationServiceError(response['error'])
+		return response
+
+	def evaluate(self, hands):
+		return self._call({'op': 'evaluate', 'hands': [[str(card) for card in hand] for hand in hands]})['ranks']
+
+	def equity(self, hole_cards, board=(), num_opponents=0, trials=100000, seed=None, exact=False, time_budget=None):
+		return self._call({'op': 'equity', 'hole_cards': [[str(card) for card in hand] for hand in hole_cards],
+			'board': [str(card) for card in board], 'num_opponents': num_opponents, 'trials': trials, 'seed': seed, 'exact': exact,
+			'time_budget': time_budget})['results']
+
+	def stats(self):
+		return self._call({'op': 'stats'})['stats']
+
+	def close(self):
+		self._file.close()
+		self._socket.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Serve hand evaluation and equity requests on a Unix socket')
+	parser.add_argument('path', help='socket path to listen on')
+	parser.add_argument('--max-batch-size', type=int, default=4096, help='most hands scored in one batch')
+	parser.add_argument('--max-delay', type=float, default=0.001, help='seconds to wait for more hands before scoring a batch')
+	parser.add_argument('--cache-entries', type=int, default=100000, help='equity results kept in memory')
+	args = parser.parse_args()
+
+	server = EvaluationServer(args.path, args.max_batch_size, args.max_delay, args.cache_entries)
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
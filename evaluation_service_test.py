@@ -0,0 +1,138 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import equity
+import evaluation_service
+import os
+import poker_hand
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+class testServiceMetrics(unittest.TestCase):
+	def test_percentiles(self):
+		metrics = evaluation_service.ServiceMetrics()
+		for i in xrange(1, 101):
+			metrics.record_request('evaluate', i / 1000.0, num_of_hands=2)
+		snapshot = metrics.snapshot()
+
+		self.assertEquals(0.05, snapshot['latency']['evaluate']['p50'])
+		self.assertEquals(0.09, snapshot['latency']['evaluate']['p90'])
+		self.assertEquals(0.099, snapshot['latency']['evaluate']['p99'])
+		self.assertEquals(0.1, snapshot['latency']['evaluate']['max'])
+		self.assertEquals(200, snapshot['hands'])
+		self.assertEquals({'evaluate': 100}, snapshot['requests'])
+
+	def test_batches(self):
+		metrics = evaluation_service.ServiceMetrics()
+		metrics.record_batch(10)
+		metrics.record_batch(30)
+
+		self.assertEquals(20.0, metrics.snapshot()['mean_batch_size'])
+
+class testMicroBatcher(unittest.TestCase):
+	def test_mergesConcurrentRequests(self):
+		metrics = evaluation_service.ServiceMetrics()
+		batcher = evaluation_service.MicroBatcher(max_delay=0.05, metrics=metrics)
+		rng = random.Random(1)
+		hands = [[rng.sample(deck_of_cards.CARDS, 7) for j in xrange(5)] for i in xrange(8)]
+		ranks = [None] * len(hands)
+
+		def evaluate(index):
+			ranks[index] = batcher.evaluate([[card.id for card in hand] for hand in hands[index]])
+		threads = [threading.Thread(target=evaluate, args=(index,)) for index in xrange(len(hands))]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		batcher.close()
+
+		self.assertEquals([[poker_hand.evaluate_hand(hand) for hand in request_hands] for request_hands in hands], ranks)
+		self.assertTrue(metrics.batches < len(hands))
+
+class testEvaluationService(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'evaluation.sock')
+		self.server = evaluation_service.EvaluationServer(self.path)
+		self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.01})
+		self.thread.start()
+		self.client = evaluation_service.EvaluationClient(self.path)
+
+	def tearDown(self):
+		self.client.close()
+		self.server.shutdown()
+		self.thread.join()
+		self.server.server_close()
+		shutil.rmtree(self.directory)
+
+	def test_evaluate(self):
+		rng = random.Random(2)
+		hands = [rng.sample(deck_of_cards.CARDS, 7) for i in xrange(50)] + [rng.sample(deck_of_cards.CARDS, 5)]
+
+		self.assertEquals([poker_hand.evaluate_hand(hand) for hand in hands], self.client.evaluate(hands))
+
+	def test_equity(self):
+		hole_cards = [cardListCreator([(0,14),(1,14)]), cardListCreator([(2,13),(2,12)])]
+		board = cardListCreator([(0,2),(3,7),(2,9),(1,11)])
+		results = self.client.equity(hole_cards, board, exact=True)
+		expected = equity.calculate_equity(hole_cards, board, processes=1, exact=True)
+
+		self.assertEquals([result.wins for result in expected], [result['wins'] for result in results])
+		self.assertEquals([result.equity() for result in expected], [result['equity'] for result in results])
+
+	def test_equityTimeBudget(self):
+		hole_cards = [cardListCreator([(0,14),(1,14)]), cardListCreator([(2,13),(2,12)])]
+		results = self.client.equity(hole_cards, trials=10000000, time_budget=0.02)
+
+		self.assertTrue(0 < results[0]['trials'] < 10000000)
+		self.assertTrue(results[0]['standard_error'] > 0)
+		self.assertEquals(0, self.client.stats()['equity_cache']['misses'])
+
+	def test_stats(self):
+		self.client.evaluate([cardListCreator([(0,14),(1,14),(2,2),(3,3),(0,9),(1,11),(2,13)])])
+		stats = self.client.stats()
+
+		self.assertEquals(1, stats['requests']['evaluate'])
+		self.assertEquals(1, stats['hands'])
+		self.assertEquals(1, stats['batches'])
+		self.assertTrue('p99' in stats['latency']['evaluate'])
+		self.assertEquals(0, stats['equity_cache']['misses'])
+
+	def test_badCard(self):
+		self.assertRaises(evaluation_service.EvaluationServiceError, self.client._call, {'op': 'evaluate', 'hands': [['As', 'Zz']]})
+
+	def test_duplicateCard(self):
+		self.assertRaises(evaluation_service.EvaluationServiceError, self.client.evaluate,
+			[cardListCreator([(0,14),(0,14),(2,2),(3,3),(0,9)])])
+
+	def test_badOp(self):
+		self.assertRaises(evaluation_service.EvaluationServiceError, self.client._call, {'op': 'shuffle'})
+
+	def test_badEquity(self):
+		self.assertRaises(evaluation_service.EvaluationServiceError, self.client.equity, [cardListCreator([(0,14),(1,14)])])
+
+	def test_errorKeepsConnection(self):
+		self.assertRaises(evaluation_service.EvaluationServiceError, self.client._call, {'op': 'shuffle'})
+
+		self.assertEquals(1, self.client.stats()['errors'])
+
+	def test_requestId(self):
+		self.assertEquals(7, self.client._call({'op': 'stats', 'id': 7})['id'])
+
+	def test_invalidJson(self):
+		self.client._file.write('not json\n')
+		self.client._file.flush()
+
+		self.assertTrue('error' in evaluation_service.json.loads(self.client._file.readline()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/python
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+from collections import defaultdict
+from combinatorics import binomial, iterate_combinations
+from deck_of_cards import CARDS
+from poker_hand import ScoredPokerHand, CARD_KEYS, rank_from_key, rank_score_class
+
+
+class Error(Exception):
+	pass
+
+class HandCensusCheckpointError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+NUM_OF_HANDS = binomial(52, 7)
+
+# Published seven card frequencies, in ScoredPokerHand.SCORE_CLASS order
+PUBLISHED_CLASS_COUNTS = [23294460, 58627800, 31433400, 6461620, 6180020, 4047644, 3473184, 224848, 37260, 4324]
+
+def census_range(task):
+	start, stop = task
+
+	card_keys = [CARD_KEYS[card.id] for card in CARDS]
+	card_masks = [card.mask for card in CARDS]
+	prefix_keys = [0] * 8
+	prefix_masks = [0] * 8
+
+	rank_counts = defaultdict(int)
+	for first_changed, combination in iterate_combinations(52, 7, start, stop):
+		for i in xrange(first_changed, 7):
+			prefix_keys[i + 1] = prefix_keys[i] + card_keys[combination[i]]
+			prefix_masks[i + 1] = prefix_masks[i] | card_masks[combination[i]]
+		rank_counts[rank_from_key(prefix_keys[7], prefix_masks[7])] += 1
+
+	return dict(rank_counts)
+
+def shard_range(shard, num_of_shards):
+	return shard * NUM_OF_HANDS // num_of_shards, (shard + 1) * NUM_OF_HANDS // num_of_shards
+
+def _census_shard(shard_task):
+	shard, num_of_shards = shard_task
+	return shard, census_range(shard_range(shard, num_of_shards))
+
+class HandCensus(object):
+
+	def __init__(self, num_of_shards):
+		self.num_of_shards = num_of_shards
+		self.completed_shards = set()
+		self.rank_counts = defaultdict(int)
+
+	def add_shard(self, shard, rank_counts):
+		self.completed_shards.add(shard)
+		for rank, count in rank_counts.items():
+			self.rank_counts[rank] += count
+
+	def is_complete(self):
+		return len(self.completed_shards) == self.num_of_shards
+
+	def num_of_hands(self):
+		return sum(self.rank_counts.values())
+
+	def class_counts(self):
+		class_counts = [0] * len(ScoredPokerHand.SCORE_CLASS)
+		for rank, count in self.rank_counts.items():
+			class_counts[rank_score_class(rank)] += count
+		return class_counts
+
+	def save(self, path):
+		# Written to a temporary file first, so an interrupted save leaves the old checkpoint intact
+		temporary_path = path + '.tmp'
+		with open(temporary_path, 'w') as checkpoint_file:
+			json.dump({'num_of_shards': self.num_of_shards,
+				   'completed_shards': sorted(self.completed_shards),
+				   'rank_counts': dict((str(rank), count) for rank, count in self.rank_counts.items())},
+				  checkpoint_file)
+		os.rename(temporary_path, path)
+
+	@classmethod
+	def load(cls, path):
+		with open(path) as checkpoint_file:
+			checkpoint = json.load(checkpoint_file)
+
+		census = cls(checkpoint['num_of_shards'])
+		census.completed_shards = set(checkpoint['completed_shards'])
+		for rank, count in checkpoint['rank_counts'].items():
+			census.rank_counts[int(rank)] = count
+		return census
+
+def run_census(num_of_shards=1000, processes=None, checkpoint_path=None, max_shards=None):
+	# Resumes from checkpoint_path when it exists and saves to it after every shard.
+	# max_shards stops the run after that many new shards, leaving the rest for a later run.
+	if checkpoint_path and os.path.exists(checkpoint_path):
+		census = HandCensus.load(checkpoint_path)
+		if census.num_of_shards != num_of_shards:
+			raise HandCensusCheckpointError('Checkpoint {0} was made with {1} shards, not {2}'.format(
+				checkpoint_path, census.num_of_shards, num_of_shards))
+	else:
+		census = HandCensus(num_of_shards)
+
+	pending_shards = [(shard, num_of_shards) for shard in xrange(num_of_shards) if shard not in census.completed_shards]
+	if max_shards is not None:
+		pending_shards = pending_shards[:max_shards]
+
+	if processes == 1:
+		shard_results = (_census_shard(shard_task) for shard_task in pending_shards)
+		pool = None
+	else:
+		pool = multiprocessing.Pool(processes)
+		shard_results = pool.imap_unordered(_census_shard, pending_shards)
+
+	try:
+		for shard, rank_counts in shard_results:
+			census.add_shard(shard, rank_counts)
+			if checkpoint_path:
+				census.save(checkpoint_path)
+	finally:
+		if pool is not None:
+			pool.terminate()
+			pool.join()
+
+	return census
+
+def format_report(census, num_of_hands=None, elapsed=None):
+	lines = ['Hands: {0} of {1} ({2} of {3} shards)'.format(
+		census.num_of_hands(), NUM_OF_HANDS, len(census.completed_shards), census.num_of_shards)]
+	if num_of_hands is not None and elapsed:
+		lines.append('Throughput: {0:.0f} hands per second'.format(num_of_hands / elapsed))
+
+	lines.append('{0:<16}{1:>12}{2:>12}{3:>12}'.format('Class', 'Count', 'Published', 'Difference'))
+	for score_class, count in enumerate(census.class_counts()):
+		published = PUBLISHED_CLASS_COUNTS[score_class]
+		lines.append('{0:<16}{1:>12}{2:>12}{3:>12}'.format(ScoredPokerHand.SCORE_CLASS[score_class], count, published,
+								   count - published if census.is_complete() else ''))
+	lines.append('Distinct ranks: {0}'.format(len(census.rank_counts)))
+	return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Count every seven card hand by score class and by rank')
+	parser.add_argument('--shards', type=int, default=1000, help='number of index ranges to split the hands into')
+	parser.add_argument('--processes', type=int, default=None, help='worker processes, defaults to one per core')
+	parser.add_argument('--checkpoint', default=None, help='file to resume from and save progress to')
+	parser.add_argument('--max-shards', type=int, default=None, help='stop after this many new shards')
+	parser.add_argument('--ranks', default=None, help='file to write the count of every distinct rank to, as JSON')
+	args = parser.parse_args()
+
+	hands_before = HandCensus.load(args.checkpoint).num_of_hands() if args.checkpoint and os.path.exists(args.checkpoint) else 0
+	start_time = time.time()
+	census = run_census(args.shards, args.processes, args.checkpoint, args.max_shards)
+	elapsed = time.time() - start_time
+
+	print format_report(census, census.num_of_hands() - hands_before, elapsed)
+	if args.ranks:
+		with open(args.ranks, 'w') as ranks_file:
+			json.dump(dict((str(rank), count) for rank, count in sorted(census.rank_counts.items())), ranks_file, indent=0)
@@ -0,0 +1,91 @@
+#!/usr/bin/python
+
+import hand_census
+import itertools
+import os
+import poker_hand
+import shutil
+import tempfile
+import unittest
+
+from collections import defaultdict
+from deck_of_cards import CARDS
+
+def referenceRankCounts(start, stop):
+	rank_counts = defaultdict(int)
+	for list_of_cards in itertools.islice(itertools.combinations(CARDS, 7), start, stop):
+		rank_counts[poker_hand.ScoredPokerHand(list(list_of_cards)).rank] += 1
+	return dict(rank_counts)
+
+class testCensusRange(unittest.TestCase):
+	def test_firstHands(self):
+		self.assertEquals(referenceRankCounts(0, 3000), hand_census.census_range((0, 3000)))
+
+	def test_middleHands(self):
+		start = hand_census.NUM_OF_HANDS // 2
+		self.assertEquals(sum(hand_census.census_range((start, start + 500)).values()), 500)
+
+	def test_shardRanges(self):
+		ranges = [hand_census.shard_range(shard, 7) for shard in xrange(7)]
+
+		self.assertEquals(0, ranges[0][0])
+		self.assertEquals(hand_census.NUM_OF_HANDS, ranges[-1][1])
+		self.assertTrue(all(ranges[i][1] == ranges[i + 1][0] for i in xrange(6)))
+
+	def test_publishedTotal(self):
+		self.assertEquals(hand_census.NUM_OF_HANDS, sum(hand_census.PUBLISHED_CLASS_COUNTS))
+
+class testRunCensus(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.checkpoint_path = os.path.join(self.directory, 'census.json')
+		# Small shards keep each test run to a few thousand hands
+		self.num_of_shards = hand_census.NUM_OF_HANDS // 1000
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def test_resume(self):
+		census = hand_census.run_census(self.num_of_shards, processes=1, checkpoint_path=self.checkpoint_path, max_shards=2)
+		self.assertEquals(set([0, 1]), census.completed_shards)
+
+		census = hand_census.run_census(self.num_of_shards, processes=1, checkpoint_path=self.checkpoint_path, max_shards=1)
+		self.assertEquals(set([0, 1, 2]), census.completed_shards)
+
+		stop = hand_census.shard_range(2, self.num_of_shards)[1]
+		self.assertEquals(referenceRankCounts(0, stop), dict(census.rank_counts))
+		self.assertFalse(census.is_complete())
+
+	def test_processPool(self):
+		census = hand_census.run_census(self.num_of_shards, processes=2, max_shards=3)
+		stop = hand_census.shard_range(2, self.num_of_shards)[1]
+
+		self.assertEquals(referenceRankCounts(0, stop), dict(census.rank_counts))
+
+	def test_checkpointShardMismatch(self):
+		hand_census.run_census(self.num_of_shards, processes=1, checkpoint_path=self.checkpoint_path, max_shards=1)
+
+		self.assertRaises(hand_census.HandCensusCheckpointError, hand_census.run_census, self.num_of_shards + 1,
+				  processes=1, checkpoint_path=self.checkpoint_path, max_shards=1)
+
+	def test_saveLoad(self):
+		census = hand_census.HandCensus(4)
+		census.add_shard(2, {poker_hand.pack_score((1, 14, 0, 13, 12, 11)): 3, poker_hand.pack_score((9, 0, 0)): 1})
+		census.save(self.checkpoint_path)
+		loaded = hand_census.HandCensus.load(self.checkpoint_path)
+
+		self.assertEquals(census.completed_shards, loaded.completed_shards)
+		self.assertEquals(dict(census.rank_counts), dict(loaded.rank_counts))
+		self.assertEquals([0, 3, 0, 0, 0, 0, 0, 0, 0, 1], loaded.class_counts())
+
+	def test_report(self):
+		census = hand_census.HandCensus(4)
+		census.add_shard(0, {poker_hand.pack_score((9, 0, 0)): 1})
+		report = hand_census.format_report(census, 1, 0.5)
+
+		self.assertTrue('Royal flush' in report)
+		self.assertTrue('Throughput: 2 hands per second' in report)
+
+
+if __name__ == '__main__':
+    unittest.main()
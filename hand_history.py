@@ -0,0 +1,239 @@
+#!/usr/bin/python
+
+import argparse
+import collections
+import itertools
+import multiprocessing
+import sys
+import time
+
+from deck_of_cards import CardParseError, parse_cards
+from poker_hand import ScoredPokerHand, evaluate_batch, evaluate_hand, rank_score_class, numpy
+
+
+class Error(Exception):
+	pass
+
+class HandHistoryFormatError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class HandHistoryBackendError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+# A hand history line is the five board cards and then each player's hole cards,
+# separated by '|', e.g. "As Kd 7c 7h 2s | Qs Qd | 3c 4c". Blank lines and lines
+# starting with '#' are skipped.
+FIELD_SEPARATOR = '|'
+COMMENT_PREFIX = '#'
+
+def _scored_backend(hands):
+	return [ScoredPokerHand(hand).rank for hand in hands]
+
+def _evaluate_hand_backend(hands):
+	return [evaluate_hand(hand) for hand in hands]
+
+def _batch_backend(hands):
+	return evaluate_batch([[card.id for card in hand] for hand in hands]).tolist()
+
+# Each backend scores a list of seven card hands and returns their ranks
+BACKENDS = {
+	'scored': _scored_backend,
+	'evaluate_hand': _evaluate_hand_backend,
+	'batch': _batch_backend,
+}
+
+class HandResult(object):
+
+	def __init__(self, line_number, board, hole_cards, ranks):
+		self.line_number = line_number
+		self.board = board
+		self.hole_cards = hole_cards
+		self.ranks = ranks
+
+	def winners(self):
+		best_rank = max(self.ranks)
+		return [player for player, rank in enumerate(self.ranks) if rank == best_rank]
+
+	def __str__(self):
+		return '{0}\t{1}\t{2}'.format(self.line_number, ' '.join(str(rank) for rank in self.ranks), ' '.join(str(player) for player in self.winners()))
+
+def parse_hand_line(line, line_number=None):
+	fields = line.split(FIELD_SEPARATOR)
+	location = 'Line {0}: '.format(line_number) if line_number is not None else ''
+	if len(fields) < 2:
+		raise HandHistoryFormatError('{0}expected a board and at least one player, found {1!r}'.format(location, line.strip()))
+
+	try:
+		board = parse_cards(fields[0])
+		hole_cards = [parse_cards(field) for field in fields[1:]]
+	except CardParseError as error:
+		raise HandHistoryFormatError(location + error.msg)
+
+	if len(board) != 5:
+		raise HandHistoryFormatError('{0}expected 5 board cards, found {1}'.format(location, len(board)))
+	for cards in hole_cards:
+		if len(cards) != 2:
+			raise HandHistoryFormatError('{0}expected 2 hole cards per player, found {1}'.format(location, len(cards)))
+
+	card_mask = 0
+	for cards in [board] + hole_cards:
+		for card in cards:
+			if card_mask & card.mask:
+				raise HandHistoryFormatError('{0}expected all cards unique, found two instances of {1}'.format(location, str(card)))
+			card_mask |= card.mask
+
+	return board, hole_cards
+
+def _hand_lines(lines):
+	for line_number, line in enumerate(lines, 1):
+		stripped_line = line.strip()
+		if stripped_line and not stripped_line.startswith(COMMENT_PREFIX):
+			yield line_number, stripped_line
+
+def _parse_hands(numbered_lines):
+	for line_number, line in numbered_lines:
+		board, hole_cards = parse_hand_line(line, line_number)
+		yield line_number, board, hole_cards
+
+def read_hands(lines):
+	# Yields (line_number, board, hole_cards) for every hand line
+	return _parse_hands(_hand_lines(lines))
+
+def _check_backend(backend_name):
+	if backend_name not in BACKENDS:
+		raise HandHistoryBackendError('Expected backend in {0}, observed value: {1}'.format(sorted(BACKENDS), backend_name))
+	if backend_name == 'batch' and numpy is None:
+		raise HandHistoryBackendError('The batch backend requires numpy')
+
+def evaluate_hands(hands, backend_name='evaluate_hand'):
+	# Scores a batch of (line_number, board, hole_cards) with a single backend call
+	_check_backend(backend_name)
+	ranks = BACKENDS[backend_name]([board + cards for line_number, board, hole_cards in hands for cards in hole_cards])
+
+	results = []
+	start = 0
+	for line_number, board, hole_cards in hands:
+		results.append(HandResult(line_number, board, hole_cards, ranks[start:start + len(hole_cards)]))
+		start += len(hole_cards)
+	return results
+
+def _batches(iterable, batch_size):
+	while True:
+		batch = list(itertools.islice(iterable, batch_size))
+		if not batch:
+			return
+		yield batch
+
+def _evaluate_lines(task):
+	# The errors here do not survive pickling, so a bad line comes back as its message
+	numbered_lines, backend_name = task
+	try:
+		return evaluate_hands(list(_parse_hands(numbered_lines)), backend_name), None
+	except HandHistoryFormatError as error:
+		return None, error.msg
+
+def _checked_results(evaluated):
+	results, error_msg = evaluated
+	if error_msg is not None:
+		raise HandHistoryFormatError(error_msg)
+	return results
+
+def ordered_map(function, tasks, processes=None, max_pending=None):
+	# Yields function(task) for every task, in order, from worker processes. Pool.imap would
+	# read the whole of tasks ahead of the workers, so tasks are submitted one at a time and
+	# no more than max_pending are outstanding.
+	if processes is None:
+		processes = multiprocessing.cpu_count()
+	if max_pending is None:
+		max_pending = 2 * processes
+
+	pool = multiprocessing.Pool(processes)
+	try:
+		pending = collections.deque()
+		for task in tasks:
+			if len(pending) >= max_pending:
+				yield pending.popleft().get()
+			pending.append(pool.apply_async(function, [task]))
+		while pending:
+			yield pending.popleft().get()
+	finally:
+		pool.terminate()
+		pool.join()
+
+def process_history(lines, backend_name='evaluate_hand', processes=1, batch_size=1000, max_pending=None):
+	# Yields a HandResult for every hand, in input order, holding at most a bounded number
+	# of batches in memory however long lines is
+	_check_backend(backend_name)
+	if processes == 1:
+		for batch in _batches(read_hands(lines), batch_size):
+			for result in evaluate_hands(batch, backend_name):
+				yield result
+		return
+
+	tasks = ((batch, backend_name) for batch in _batches(_hand_lines(lines), batch_size))
+	for evaluated in ordered_map(_evaluate_lines, tasks, processes, max_pending):
+		for result in _checked_results(evaluated):
+			yield result
+
+class HandHistoryStats(object):
+
+	def __init__(self):
+		self.num_of_hands = 0
+		self.num_of_split_pots = 0
+		# Pot shares won by each seat, a split pot is shared equally
+		self.seat_wins = collections.defaultdict(float)
+		# Number of hands won with each score class
+		self.winning_class_counts = [0] * len(ScoredPokerHand.SCORE_CLASS)
+
+	def add(self, result):
+		winners = result.winners()
+		self.num_of_hands += 1
+		if len(winners) > 1:
+			self.num_of_split_pots += 1
+		for player in winners:
+			self.seat_wins[player] += 1.0 / len(winners)
+		self.winning_class_counts[rank_score_class(result.ranks[winners[0]])] += 1
+
+def collect_stats(results, stats=None):
+	# Passes results through while adding them to stats
+	if stats is None:
+		stats = HandHistoryStats()
+	for result in results:
+		stats.add(result)
+		yield result
+
+def format_report(stats, elapsed):
+	lines = ['Hands: {0}'.format(stats.num_of_hands)]
+	if elapsed > 0:
+		lines.append('Hands per second: {0:.0f}'.format(stats.num_of_hands / elapsed))
+	lines.append('Split pots: {0}'.format(stats.num_of_split_pots))
+	for seat in sorted(stats.seat_wins):
+		lines.append('Seat {0} wins: {1:g}'.format(seat, stats.seat_wins[seat]))
+	for score_class, name in enumerate(ScoredPokerHand.SCORE_CLASS):
+		lines.append('Won with {0}: {1}'.format(name, stats.winning_class_counts[score_class]))
+	return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Evaluate the showdowns in a hand history file, one hand per line')
+	parser.add_argument('path', nargs='?', default=None, help='hand history to read, defaults to standard input')
+	parser.add_argument('--backend', default='evaluate_hand', choices=sorted(BACKENDS))
+	parser.add_argument('--processes', type=int, default=1, help='worker processes, 0 for one per core')
+	parser.add_argument('--batch-size', type=int, default=1000, help='hands per batch')
+	parser.add_argument('--quiet', action='store_true', help='only print the summary')
+	args = parser.parse_args()
+
+	history_file = open(args.path) if args.path else sys.stdin
+	stats = HandHistoryStats()
+	start_time = time.time()
+	try:
+		for result in collect_stats(process_history(history_file, args.backend, args.processes or None, args.batch_size), stats):
+			if not args.quiet:
+				print result
+	finally:
+		if history_file is not sys.stdin:
+			history_file.close()
+
+	print >> sys.stderr, format_report(stats, time.time() - start_time)
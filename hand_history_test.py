@@ -0,0 +1,106 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import hand_history
+import poker_hand
+import random
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+def historyLines(num_of_hands, num_of_players, seed):
+	rng = random.Random(seed)
+	deck = [card for card in deck_of_cards.generateDeck()]
+	for i in xrange(num_of_hands):
+		cards = rng.sample(deck, 5 + 2 * num_of_players)
+		fields = [cards[:5]] + [cards[5 + 2 * player:7 + 2 * player] for player in xrange(num_of_players)]
+		yield ' | '.join(' '.join(str(card) for card in field) for field in fields) + '\n'
+
+class testParseHandLine(unittest.TestCase):
+	def test_parse(self):
+		board, hole_cards = hand_history.parse_hand_line('As Kd 7c 7h 2s | Qs Qd | 3c 4c')
+
+		self.assertEquals(cardListCreator([(3,14),(1,13),(0,7),(2,7),(3,2)]), board)
+		self.assertEquals([cardListCreator([(3,12),(1,12)]), cardListCreator([(0,3),(0,4)])], hole_cards)
+
+	def test_noPlayers(self):
+		self.assertRaises(hand_history.HandHistoryFormatError, hand_history.parse_hand_line, 'As Kd 7c 7h 2s')
+
+	def test_shortBoard(self):
+		self.assertRaises(hand_history.HandHistoryFormatError, hand_history.parse_hand_line, 'As Kd 7c 7h | Qs Qd')
+
+	def test_wrongNumberOfHoleCards(self):
+		self.assertRaises(hand_history.HandHistoryFormatError, hand_history.parse_hand_line, 'As Kd 7c 7h 2s | Qs')
+
+	def test_badCard(self):
+		self.assertRaises(hand_history.HandHistoryFormatError, hand_history.parse_hand_line, 'As Kd 7c 7h 2s | Qs Qx')
+
+	def test_duplicateCard(self):
+		self.assertRaises(hand_history.HandHistoryFormatError, hand_history.parse_hand_line, 'As Kd 7c 7h 2s | Qs As')
+
+class testProcessHistory(unittest.TestCase):
+	def test_results(self):
+		lines = ['# a comment\n', '\n', 'As Kd 7c 7h 2s | Qs Qd | 3c 4c\n', 'Ah Kh Qh 2c 3d | Jh Th | Js Ts\n']
+		results = list(hand_history.process_history(lines))
+
+		self.assertEquals([3, 4], [result.line_number for result in results])
+		self.assertEquals([0], results[0].winners())
+		self.assertEquals([0], results[1].winners())
+		self.assertEquals(poker_hand.evaluate_hand(results[0].board + results[0].hole_cards[1]), results[0].ranks[1])
+
+	def test_backendsAgree(self):
+		lines = list(historyLines(300, 3, 1))
+		expected = [result.ranks for result in hand_history.process_history(lines, 'scored')]
+
+		self.assertEquals(expected, [result.ranks for result in hand_history.process_history(lines, 'evaluate_hand', batch_size=7)])
+		if poker_hand.numpy is not None:
+			self.assertEquals(expected, [result.ranks for result in hand_history.process_history(lines, 'batch', batch_size=64)])
+
+	def test_parallelPreservesOrder(self):
+		lines = list(historyLines(500, 2, 2))
+		expected = [(result.line_number, result.ranks) for result in hand_history.process_history(lines)]
+		results = hand_history.process_history(lines, processes=2, batch_size=37, max_pending=2)
+
+		self.assertEquals(expected, [(result.line_number, result.ranks) for result in results])
+
+	def test_parallelBadLine(self):
+		lines = list(historyLines(100, 2, 3)) + ['As Kd | Qs Qd\n']
+		results = hand_history.process_history(lines, processes=2, batch_size=10)
+
+		self.assertRaises(hand_history.HandHistoryFormatError, list, results)
+
+	def test_streams(self):
+		# Only the first batch is read to produce the first result
+		lines = historyLines(10 ** 9, 2, 4)
+		results = hand_history.process_history(lines, batch_size=10)
+
+		self.assertEquals(1, results.next().line_number)
+
+	def test_badBackend(self):
+		self.assertRaises(hand_history.HandHistoryBackendError, list, hand_history.process_history([], 'abacus'))
+
+class testHandHistoryStats(unittest.TestCase):
+	def test_stats(self):
+		lines = ['As Kd 7c 7h 2s | Qs Qd | 3c 4c\n', 'Ah Kh Qh Jh Th | 2c 3c | 2d 3d\n']
+		stats = hand_history.HandHistoryStats()
+		list(hand_history.collect_stats(hand_history.process_history(lines), stats))
+
+		self.assertEquals(2, stats.num_of_hands)
+		self.assertEquals(1, stats.num_of_split_pots)
+		self.assertEquals(1.5, stats.seat_wins[0])
+		self.assertEquals(0.5, stats.seat_wins[1])
+		self.assertEquals(1, stats.winning_class_counts[2])
+		self.assertEquals(1, stats.winning_class_counts[9])
+
+	def test_report(self):
+		stats = hand_history.HandHistoryStats()
+		list(hand_history.collect_stats(hand_history.process_history(['As Kd 7c 7h 2s | Qs Qd | 3c 4c\n']), stats))
+
+		self.assertTrue('Hands: 1' in hand_history.format_report(stats, 1.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+#!/usr/bin/python
+
+import mmap
+import struct
+
+from deck_of_cards import Card, CARDS
+from poker_hand import ScoredPokerHand, evaluate_hand
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+
+class Error(Exception):
+	pass
+
+class HandRecordFormatError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class HandRecordCardNumberError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class HandRecordCardTypeError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+# A record is the board, then two hole cards per player, one byte per card id,
+# then one little endian uint32 rank per player. Cards not dealt yet are NO_CARD.
+FILE_MAGIC = 'HREC'
+FILE_VERSION = 1
+# Magic, version, number of players
+HEADER_FORMAT = '<4sHH'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+BOARD_SIZE = 5
+NO_CARD = 0xFF
+
+def record_format(num_of_players):
+	return '<{0}B{1}I'.format(BOARD_SIZE + 2 * num_of_players, num_of_players)
+
+def record_size(num_of_players):
+	return struct.calcsize(record_format(num_of_players))
+
+def record_dtype(num_of_players):
+	if numpy is None:
+		raise HandRecordFormatError('NumPy is required for array views of hand records')
+	return numpy.dtype([('board', numpy.uint8, (BOARD_SIZE,)),
+		('hole_cards', numpy.uint8, (num_of_players, 2)),
+		('ranks', '<u4', (num_of_players,))])
+
+def _card_ids(list_of_cards, size):
+	if len(list_of_cards) > size:
+		raise HandRecordCardNumberError('Expected at most {0} cards, was given {1}'.format(size, len(list_of_cards)))
+	for card in list_of_cards:
+		if not isinstance(card, Card):
+			raise HandRecordCardTypeError('Expected elements of type Card, found element of type {0}'.format(str(type(card))))
+	return [card.id for card in list_of_cards] + [NO_CARD] * (size - len(list_of_cards))
+
+def _cards(card_ids):
+	return [CARDS[card_id] for card_id in card_ids if card_id != NO_CARD]
+
+class HandRecordWriter(object):
+
+	def __init__(self, path, num_of_players):
+		if num_of_players < 1:
+			raise HandRecordFormatError('Expected at least 1 player, was given {0}'.format(num_of_players))
+		self.num_of_players = num_of_players
+		self.num_of_records = 0
+		self._struct = struct.Struct(record_format(num_of_players))
+		self._file = open(path, 'wb')
+		self._file.write(struct.pack(HEADER_FORMAT, FILE_MAGIC, FILE_VERSION, num_of_players))
+
+	def write(self, board, hole_cards, ranks=None):
+		# Ranks may be ints or ScoredPokerHands. Left out, they are evaluated when the board is complete
+		# and stored as 0 otherwise.
+		if len(hole_cards) != self.num_of_players:
+			raise HandRecordCardNumberError('Expected hole cards for {0} players, was given {1}'.format(self.num_of_players, len(hole_cards)))
+
+		card_ids = _card_ids(board, BOARD_SIZE)
+		for player_cards in hole_cards:
+			card_ids.extend(_card_ids(player_cards, 2))
+
+		if ranks is None:
+			if len(board) == BOARD_SIZE and all(len(player_cards) == 2 for player_cards in hole_cards):
+				ranks = [evaluate_hand(list(board) + list(player_cards)) for player_cards in hole_cards]
+			else:
+				ranks = [0] * self.num_of_players
+		elif len(ranks) != self.num_of_players:
+			raise HandRecordFormatError('Expected {0} ranks, was given {1}'.format(self.num_of_players, len(ranks)))
+		ranks = [rank.rank if isinstance(rank, ScoredPokerHand) else rank for rank in ranks]
+
+		self._file.write(self._struct.pack(*(card_ids + ranks)))
+		self.num_of_records += 1
+
+	def close(self):
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+class HandRecord(object):
+	# A view of one record in the mapped file, fields are only decoded when read
+
+	__slots__ = ('_reader', '_offset')
+
+	def __init__(self, reader, offset):
+		self._reader = reader
+		self._offset = offset
+
+	def _fields(self):
+		return self._reader._struct.unpack_from(self._reader._map, self._offset)
+
+	def board(self):
+		return _cards(self._fields()[:BOARD_SIZE])
+
+	def hole_cards(self):
+		fields = self._fields()
+		return [_cards(fields[BOARD_SIZE + 2 * player:BOARD_SIZE + 2 * player + 2]) for player in xrange(self._reader.num_of_players)]
+
+	def ranks(self):
+		return list(self._fields()[BOARD_SIZE + 2 * self._reader.num_of_players:])
+
+	def scored_hand(self, player):
+		return ScoredPokerHand(self.board() + self.hole_cards()[player], lazy=True)
+
+def read_records(record_file, chunk_size=4096):
+	# Yields (board, hole_cards, ranks) for every record in a stream that cannot be mapped,
+	# such as a pipe, reading chunk_size records at a time
+	header = record_file.read(HEADER_SIZE)
+	if len(header) < HEADER_SIZE:
+		raise HandRecordFormatError('Stream too short for a hand record header')
+	magic, version, num_of_players = struct.unpack(HEADER_FORMAT, header)
+	if magic != FILE_MAGIC or version != FILE_VERSION or num_of_players < 1:
+		raise HandRecordFormatError('Not a version {0} hand record stream'.format(FILE_VERSION))
+
+	record_struct = struct.Struct(record_format(num_of_players))
+	while True:
+		data = record_file.read(chunk_size * record_struct.size)
+		if not data:
+			return
+		if len(data) % record_struct.size:
+			raise HandRecordFormatError('Stream ends part way through a record')
+		for offset in xrange(0, len(data), record_struct.size):
+			fields = record_struct.unpack_from(data, offset)
+			hole_cards = [_cards(fields[BOARD_SIZE + 2 * player:BOARD_SIZE + 2 * player + 2]) for player in xrange(num_of_players)]
+			yield _cards(fields[:BOARD_SIZE]), hole_cards, list(fields[BOARD_SIZE + 2 * num_of_players:])
+
+class HandRecordReader(object):
+
+	def __init__(self, path):
+		self._file = open(path, 'rb')
+		try:
+			self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:
+			# An empty file cannot be mapped
+			self._file.close()
+			raise HandRecordFormatError('File too short for a hand record header: {0}'.format(path))
+
+		if len(self._map) < HEADER_SIZE:
+			self.close()
+			raise HandRecordFormatError('File too short for a hand record header: {0}'.format(path))
+
+		magic, version, self.num_of_players = struct.unpack_from(HEADER_FORMAT, self._map, 0)
+		if magic != FILE_MAGIC or version != FILE_VERSION or self.num_of_players < 1:
+			self.close()
+			raise HandRecordFormatError('Not a version {0} hand record file: {1}'.format(FILE_VERSION, path))
+
+		self._struct = struct.Struct(record_format(self.num_of_players))
+		self.num_of_records, extra_bytes = divmod(len(self._map) - HEADER_SIZE, self._struct.size)
+		if extra_bytes:
+			self.close()
+			raise HandRecordFormatError('File ends part way through a record: {0}'.format(path))
+
+	def __len__(self):
+		return self.num_of_records
+
+	def __getitem__(self, index):
+		if index < 0:
+			index += self.num_of_records
+		if not 0 <= index < self.num_of_records:
+			raise IndexError('hand record index out of range')
+		return HandRecord(self, HEADER_SIZE + index * self._struct.size)
+
+	def __iter__(self):
+		for offset in xrange(HEADER_SIZE, HEADER_SIZE + self.num_of_records * self._struct.size, self._struct.size):
+			yield HandRecord(self, offset)
+
+	def as_array(self):
+		# A read only structured array over the mapped file, nothing is copied.
+		# It shares the map, so it must not be used after the reader is closed.
+		return numpy.frombuffer(self._map, dtype=record_dtype(self.num_of_players), count=self.num_of_records, offset=HEADER_SIZE)
+
+	def close(self):
+		self._map.close()
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
@@ -0,0 +1,148 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import hand_record
+import os
+import poker_hand
+import random
+import shutil
+import tempfile
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+class testHandRecord(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'hands.rec')
+
+		rng = random.Random(5)
+		deck = [card for card in deck_of_cards.generateDeck()]
+		self.hands = []
+		for i in xrange(50):
+			cards = rng.sample(deck, 11)
+			self.hands.append((cards[:5], [cards[5:7], cards[7:9], cards[9:11]]))
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def writeHands(self):
+		with hand_record.HandRecordWriter(self.path, 3) as writer:
+			for board, hole_cards in self.hands:
+				writer.write(board, hole_cards)
+
+	def test_roundTrip(self):
+		self.writeHands()
+
+		with hand_record.HandRecordReader(self.path) as reader:
+			self.assertEquals(50, len(reader))
+			for record, (board, hole_cards) in zip(reader, self.hands):
+				self.assertEquals(board, record.board())
+				self.assertEquals(hole_cards, record.hole_cards())
+				self.assertEquals([poker_hand.evaluate_hand(board + cards) for cards in hole_cards], record.ranks())
+
+	def test_fileSize(self):
+		self.writeHands()
+
+		self.assertEquals(hand_record.HEADER_SIZE + 50 * (5 + 6 + 12), os.path.getsize(self.path))
+
+	def test_indexing(self):
+		self.writeHands()
+
+		with hand_record.HandRecordReader(self.path) as reader:
+			self.assertEquals(self.hands[-1][0], reader[-1].board())
+			self.assertEquals(self.hands[7][1], reader[7].hole_cards())
+			self.assertRaises(IndexError, reader.__getitem__, 50)
+
+	def test_scoredHand(self):
+		self.writeHands()
+		board, hole_cards = self.hands[3]
+
+		with hand_record.HandRecordReader(self.path) as reader:
+			scored_hand = reader[3].scored_hand(1)
+			self.assertEquals(poker_hand.ScoredPokerHand(board + hole_cards[1]).rank, scored_hand.rank)
+			self.assertEquals(scored_hand.rank, reader[3].ranks()[1])
+
+	def test_scoredHandRanks(self):
+		board = cardListCreator([(0,14),(0,13),(0,12),(0,11),(0,10)])
+		hole_cards = [cardListCreator([(1,2),(2,3)])]
+		scored_hand = poker_hand.ScoredPokerHand(board + hole_cards[0])
+		with hand_record.HandRecordWriter(self.path, 1) as writer:
+			writer.write(board, hole_cards, ranks=[scored_hand])
+
+		with hand_record.HandRecordReader(self.path) as reader:
+			self.assertEquals([scored_hand.rank], reader[0].ranks())
+
+	def test_partialBoard(self):
+		board = cardListCreator([(0,14),(0,13),(0,12)])
+		hole_cards = [cardListCreator([(1,2),(2,3)]), cardListCreator([(1,9),(2,9)])]
+		with hand_record.HandRecordWriter(self.path, 2) as writer:
+			writer.write(board, hole_cards)
+
+		with hand_record.HandRecordReader(self.path) as reader:
+			self.assertEquals(board, reader[0].board())
+			self.assertEquals([0, 0], reader[0].ranks())
+
+	@unittest.skipIf(poker_hand.numpy is None, 'numpy is not installed')
+	def test_asArray(self):
+		self.writeHands()
+
+		with hand_record.HandRecordReader(self.path) as reader:
+			records = reader.as_array()
+			self.assertEquals(50, len(records))
+			self.assertEquals([card.id for card in self.hands[4][0]], records['board'][4].tolist())
+			self.assertEquals([[card.id for card in cards] for cards in self.hands[4][1]], records['hole_cards'][4].tolist())
+			self.assertEquals(reader[4].ranks(), records['ranks'][4].tolist())
+			del records
+
+	def test_readRecords(self):
+		self.writeHands()
+
+		with open(self.path, 'rb') as record_file:
+			records = list(hand_record.read_records(record_file, chunk_size=7))
+		self.assertEquals(50, len(records))
+		for (board, hole_cards, ranks), (expected_board, expected_hole_cards) in zip(records, self.hands):
+			self.assertEquals(expected_board, board)
+			self.assertEquals(expected_hole_cards, hole_cards)
+			self.assertEquals([poker_hand.evaluate_hand(board + cards) for cards in hole_cards], ranks)
+
+	def test_readRecordsTruncated(self):
+		self.writeHands()
+		with open(self.path, 'ab') as record_file:
+			record_file.write('\0')
+
+		with open(self.path, 'rb') as record_file:
+			self.assertRaises(hand_record.HandRecordFormatError, list, hand_record.read_records(record_file))
+
+	def test_wrongNumberOfPlayers(self):
+		with hand_record.HandRecordWriter(self.path, 2) as writer:
+			self.assertRaises(hand_record.HandRecordCardNumberError, writer.write, cardListCreator([(0,2)]), [cardListCreator([(1,2),(2,3)])])
+
+	def test_notACard(self):
+		with hand_record.HandRecordWriter(self.path, 1) as writer:
+			self.assertRaises(hand_record.HandRecordCardTypeError, writer.write, [2], [cardListCreator([(1,2),(2,3)])])
+
+	def test_badMagic(self):
+		with open(self.path, 'wb') as record_file:
+			record_file.write('PFEQ' + '\0' * 20)
+
+		self.assertRaises(hand_record.HandRecordFormatError, hand_record.HandRecordReader, self.path)
+
+	def test_truncated(self):
+		self.writeHands()
+		with open(self.path, 'ab') as record_file:
+			record_file.write('\0')
+
+		self.assertRaises(hand_record.HandRecordFormatError, hand_record.HandRecordReader, self.path)
+
+	def test_empty(self):
+		open(self.path, 'wb').close()
+
+		self.assertRaises(hand_record.HandRecordFormatError, hand_record.HandRecordReader, self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/python
+
+from deck_of_cards import Card, CARDS
+from poker_hand import IncrementalPokerHand, ScoredPokerHand
+
+
+class Error(Exception):
+	pass
+
+class OutsCardNumberError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class OutsCardTypeError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class OutsCardUniquenessError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+NUM_OF_CLASSES = len(ScoredPokerHand.SCORE_CLASS)
+
+class OutsResult(object):
+
+	def __init__(self, current_score_class, unseen_cards):
+		self.current_score_class = current_score_class
+		self.unseen_cards = unseen_cards
+		# Score class after each unseen card is dealt next
+		self.next_card_classes = {}
+		# Next cards after which the hand is ahead of, or level with, every opponent
+		self.winning_outs = []
+		self.tying_outs = []
+		# From a flop, counts over every turn and river pair
+		self.num_of_runouts = 0
+		self.runout_class_counts = [0] * NUM_OF_CLASSES
+		self.runout_wins = 0
+		self.runout_ties = 0
+
+	def outs(self):
+		# Next cards that improve the score class
+		return sorted(card for card, score_class in self.next_card_classes.items() if score_class > self.current_score_class)
+
+	def class_outs(self):
+		class_outs = {}
+		for card in self.outs():
+			class_outs.setdefault(self.next_card_classes[card], []).append(card)
+		return class_outs
+
+	def improvement_probability(self):
+		return float(len(self.outs())) / len(self.unseen_cards) if self.unseen_cards else 0.0
+
+	def class_probabilities(self):
+		# Probability of each improved score class on the next card
+		return dict((score_class, float(len(cards)) / len(self.unseen_cards)) for score_class, cards in self.class_outs().items())
+
+	def runout_improvement_probability(self):
+		if not self.num_of_runouts:
+			return 0.0
+		return float(sum(self.runout_class_counts[self.current_score_class + 1:])) / self.num_of_runouts
+
+	def runout_class_probabilities(self):
+		if not self.num_of_runouts:
+			return {}
+		return dict((score_class, float(count) / self.num_of_runouts) for score_class, count in enumerate(self.runout_class_counts) if count)
+
+	def runout_win_probability(self):
+		return float(self.runout_wins) / self.num_of_runouts if self.num_of_runouts else 0.0
+
+	def runout_tie_probability(self):
+		return float(self.runout_ties) / self.num_of_runouts if self.num_of_runouts else 0.0
+
+	def __str__(self):
+		lines = ['{0} outs to improve from {1}, {2:.1%} on the next card'.format(
+			len(self.outs()), ScoredPokerHand.SCORE_CLASS[self.current_score_class], self.improvement_probability())]
+		for score_class, cards in sorted(self.class_outs().items(), reverse=True):
+			lines.append('  {0}: {1}'.format(ScoredPokerHand.SCORE_CLASS[score_class], ' '.join(str(card) for card in cards)))
+		if self.num_of_runouts:
+			lines.append('{0:.1%} to improve by the river'.format(self.runout_improvement_probability()))
+		return '\n'.join(lines)
+
+def _validate(hole_cards, board, opponents):
+	if len(hole_cards) != 2:
+		raise OutsCardNumberError('Expected 2 hole cards, was given {0}'.format(len(hole_cards)))
+	if len(board) not in (3, 4):
+		raise OutsCardNumberError('Expected a board of 3 or 4 cards, was given {0}'.format(len(board)))
+	for opponent_cards in opponents:
+		if len(opponent_cards) != 2:
+			raise OutsCardNumberError('Expected 2 hole cards per opponent, was given {0}'.format(len(opponent_cards)))
+
+	card_mask = 0
+	for card in list(hole_cards) + list(board) + [card for opponent_cards in opponents for card in opponent_cards]:
+		if not isinstance(card, Card):
+			raise OutsCardTypeError('Expected elements of type Card, found element of type {0}'.format(str(type(card))))
+		if card_mask & card.mask:
+			raise OutsCardUniquenessError('Expected all cards unique, found two instances of {0}'.format(str(card)))
+		card_mask |= card.mask
+	return card_mask
+
+def _compare(hand, opponent_hands):
+	# 1 when hand beats every opponent, 0 when it ties the best of them, -1 otherwise
+	rank = hand.rank()
+	best_opponent_rank = max(opponent_hand.rank() for opponent_hand in opponent_hands)
+	return cmp(rank, best_opponent_rank)
+
+def calculate_outs(hole_cards, board, opponents=()):
+	# Every candidate card is added to and removed from the same hands, so no hand is rebuilt per card
+	known_mask = _validate(hole_cards, board, opponents)
+	unseen_cards = [card for card in CARDS if not known_mask & card.mask]
+
+	hand = IncrementalPokerHand(list(hole_cards) + list(board))
+	opponent_hands = [IncrementalPokerHand(list(opponent_cards) + list(board)) for opponent_cards in opponents]
+	hands = [hand] + opponent_hands
+	result = OutsResult(hand.score_class(), unseen_cards)
+
+	for index, card in enumerate(unseen_cards):
+		for each_hand in hands:
+			each_hand.add_card(card)
+
+		result.next_card_classes[card] = hand.score_class()
+		if opponent_hands:
+			comparison = _compare(hand, opponent_hands)
+			if comparison > 0:
+				result.winning_outs.append(card)
+			elif comparison == 0:
+				result.tying_outs.append(card)
+
+		if len(board) == 3:
+			for river_card in unseen_cards[index + 1:]:
+				for each_hand in hands:
+					each_hand.add_card(river_card)
+
+				result.num_of_runouts += 1
+				result.runout_class_counts[hand.score_class()] += 1
+				if opponent_hands:
+					comparison = _compare(hand, opponent_hands)
+					if comparison > 0:
+						result.runout_wins += 1
+					elif comparison == 0:
+						result.runout_ties += 1
+
+				for each_hand in hands:
+					each_hand.remove_card(river_card)
+
+		for each_hand in hands:
+			each_hand.remove_card(card)
+
+	return result
@@ -0,0 +1,92 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import itertools
+import outs
+import poker_hand
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+class testCalculateOuts(unittest.TestCase):
+	def setUp(self):
+		# Ace king of hearts on a flop with two hearts: a flush draw and overcards
+		self.hole_cards = cardListCreator([(2,14),(2,13)])
+		self.board = cardListCreator([(2,2),(2,7),(0,9)])
+		self.opponent = cardListCreator([(3,12),(1,12)])
+
+	def test_flushDraw(self):
+		result = outs.calculate_outs(self.hole_cards, self.board)
+		class_outs = result.class_outs()
+
+		self.assertEquals(0, result.current_score_class)
+		self.assertEquals(47, len(result.unseen_cards))
+		self.assertEquals(9, len(class_outs[5]))
+		self.assertEquals(14, len(class_outs[1]))
+		self.assertEquals(23, len(result.outs()))
+		self.assertAlmostEquals(23 / 47.0, result.improvement_probability())
+		self.assertAlmostEquals(9 / 47.0, result.class_probabilities()[5])
+
+	def test_nextCardMatchesScoredPokerHand(self):
+		result = outs.calculate_outs(self.hole_cards, self.board)
+
+		for card in result.unseen_cards:
+			self.assertEquals(poker_hand.IncrementalPokerHand(self.hole_cards + self.board + [card]).score_class(), result.next_card_classes[card])
+
+	def test_runoutsMatchScoredPokerHand(self):
+		result = outs.calculate_outs(self.hole_cards, self.board)
+		class_counts = [0] * 10
+		for turn_card, river_card in itertools.combinations(result.unseen_cards, 2):
+			class_counts[poker_hand.ScoredPokerHand(self.hole_cards + self.board + [turn_card, river_card]).score_class] += 1
+
+		self.assertEquals(1081, result.num_of_runouts)
+		self.assertEquals(class_counts, result.runout_class_counts)
+		self.assertAlmostEquals(sum(class_counts[1:]) / 1081.0, result.runout_improvement_probability())
+
+	def test_opponents(self):
+		result = outs.calculate_outs(self.hole_cards, self.board, [self.opponent])
+		wins = ties = 0
+		for turn_card, river_card in itertools.combinations(result.unseen_cards, 2):
+			rank = poker_hand.evaluate_hand(self.hole_cards + self.board + [turn_card, river_card])
+			opponent_rank = poker_hand.evaluate_hand(self.opponent + self.board + [turn_card, river_card])
+			wins += rank > opponent_rank
+			ties += rank == opponent_rank
+
+		self.assertEquals(45, len(result.unseen_cards))
+		self.assertEquals(wins, result.runout_wins)
+		self.assertEquals(ties, result.runout_ties)
+		self.assertTrue(cardCreator(2,5) in result.winning_outs)
+		self.assertTrue(cardCreator(0,14) in result.winning_outs)
+		self.assertFalse(cardCreator(0,3) in result.winning_outs)
+
+	def test_turn(self):
+		result = outs.calculate_outs(self.hole_cards, self.board + [cardCreator(1,3)])
+
+		self.assertEquals(46, len(result.unseen_cards))
+		self.assertEquals(0, result.num_of_runouts)
+		self.assertEquals(9, len(result.class_outs()[5]))
+		self.assertEquals(0.0, result.runout_improvement_probability())
+
+	def test_str(self):
+		self.assertTrue(str(outs.calculate_outs(self.hole_cards, self.board)).startswith('23 outs to improve from High Card'))
+
+	def test_wrongNumberOfBoardCards(self):
+		self.assertRaises(outs.OutsCardNumberError, outs.calculate_outs, self.hole_cards, self.board[:2])
+		self.assertRaises(outs.OutsCardNumberError, outs.calculate_outs, self.hole_cards, self.board + cardListCreator([(1,3),(1,4)]))
+
+	def test_wrongNumberOfHoleCards(self):
+		self.assertRaises(outs.OutsCardNumberError, outs.calculate_outs, self.hole_cards[:1], self.board)
+		self.assertRaises(outs.OutsCardNumberError, outs.calculate_outs, self.hole_cards, self.board, [self.opponent[:1]])
+
+	def test_notACard(self):
+		self.assertRaises(outs.OutsCardTypeError, outs.calculate_outs, self.hole_cards, self.board[:2] + ['9C'])
+
+	def test_duplicateCard(self):
+		self.assertRaises(outs.OutsCardUniquenessError, outs.calculate_outs, self.hole_cards, self.board, [[self.hole_cards[0], self.opponent[0]]])
+
+if __name__ == '__main__':
+    unittest.main()
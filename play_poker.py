@@ -46,7 +46,8 @@ def play_poker():
 		
 
 	
-play_poker();
+if __name__ == '__main__':
+	play_poker();
 	
 
 
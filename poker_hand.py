@@ -1,8 +1,16 @@
 #!/usr/bin/python
 
+import gc
+import json
 from collections import defaultdict
-from deck_of_cards import Card, DeckOfCards, SUITS, NAMED_VALUES
+from itertools import combinations_with_replacement
+from timeit import default_timer
+from deck_of_cards import Card, DeckOfCards, SUITS, NAMED_VALUES, CARDS
 
+try:
+	import numpy
+except ImportError:
+	numpy = None
 
 class Error(Exception):
 	pass
@@ -31,6 +39,38 @@ class ScoredPokerHandInitializationScoreClassError(Error):
 	def __init__(self, msg):
 		self.msg = msg
 
+class PokerHandEvaluationError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class IncrementalPokerHandCardNumberError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class IncrementalPokerHandCardTypeError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class IncrementalPokerHandCardUniquenessError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class IncrementalPokerHandCardMissingError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class ShowdownCardNumberError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class ShowdownCardTypeError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class ShowdownCardUniquenessError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
 def cardValueName(value):
 	return NAMED_VALUES[value]
 
@@ -45,24 +85,503 @@ def createHistograms(list_of_values):
 
 	return histogram, inverse_histogram
 
+def findStraightHigh(value_histogram):
+	straight_high = 0
+
+	list_of_values = value_histogram.keys()
+
+	for value in value_histogram.keys():
+		if all( v in value_histogram.keys() for v in xrange(value+1, value+4) ):
+			if (value == 2 and 14 in list_of_values):
+				straight_high = value + 3
+			elif (value+4 in list_of_values):
+				straight_high = value + 4
+
+	return straight_high
+
+# A rank packs a score tuple into 4 bit fields, most significant first:
+# score class, value, secondary value and up to five side card values.
+# Comparing two ranks gives the same answer as comparing the score tuples.
+RANK_FIELDS = 8
+RANK_CLASS_SHIFT = 4 * (RANK_FIELDS - 1)
+
+def pack_score(score_tuple):
+	rank = 0
+	for i in xrange(RANK_FIELDS):
+		rank <<= 4
+		if i < len(score_tuple):
+			rank |= score_tuple[i]
+	return rank
+
+def rank_score_class(rank):
+	return rank >> RANK_CLASS_SHIFT
+
+def _score_values(list_of_values):
+	# Mirrors the non flush branches of ScoredPokerHand, which only ever look at card values
+	value_histogram, inverse_value_histogram = createHistograms(list_of_values)
+	straight_high = findStraightHigh(value_histogram)
+
+	if 4 in inverse_value_histogram:
+		value = inverse_value_histogram[4][-1]
+		return (7, value, 0) + tuple([v for v in list_of_values if v != value][0:1])
+	elif 3 in inverse_value_histogram and 2 in inverse_value_histogram:
+		return (6, inverse_value_histogram[3][-1], inverse_value_histogram[2][-1])
+	elif straight_high > 0:
+		return (4, straight_high, 0)
+	elif 3 in inverse_value_histogram:
+		value = inverse_value_histogram[3][-1]
+		return (3, value, 0) + tuple([v for v in list_of_values if v != value][0:2])
+	elif 2 in inverse_value_histogram and len(inverse_value_histogram[2]) > 1:
+		pair_value = inverse_value_histogram[2][-1]
+		second_pair_value = inverse_value_histogram[2][-2]
+		side_values = [v for v in list_of_values if v != pair_value and v != second_pair_value][0:1]
+		return (2, pair_value, second_pair_value) + tuple(side_values)
+	elif 2 in inverse_value_histogram:
+		value = inverse_value_histogram[2][-1]
+		return (1, value, 0) + tuple([v for v in list_of_values if v != value][0:3])
+	else:
+		return (0, list_of_values[0], 0) + tuple(list_of_values[0:5])
+
+def _score_flush_values(suited_values, wheel_only):
+	# ScoredPokerHand only looks for straight flushes up to two below its straight high.
+	# That finds the best straight flush, except when the hand holds A23456 but no 7:
+	# the straight high is then taken to be 5, so only the wheel can count.
+	for high in xrange(14, 4, -1):
+		if wheel_only and high != 5:
+			continue
+		needed = range(high-4, high+1) if high > 5 else [14, 2, 3, 4, 5]
+		if all(v in suited_values for v in needed):
+			if high == 14:
+				return (9, 0, 0)
+			return (8, high, 0)
+
+	return (5, suited_values[0], 0) + tuple(suited_values[0:5])
+
+# Per card lookup keys, indexed by Card.id. The low 32 bits hold a base 5 digit
+# per value and the high bits hold a base 8 digit per suit, so the sum of the
+# keys of up to seven distinct cards identifies their value multiset and suit counts.
+VALUE_KEY_BITS = 32
+VALUE_KEY_MASK = (1 << VALUE_KEY_BITS) - 1
+CARD_KEYS = [5 ** (card.value - 2) + (1 << (VALUE_KEY_BITS + 3 * SUITS.index(card.suit))) for card in CARDS]
+
+_WHEEL_SIX_MASK = sum(1 << (v - 2) for v in [14, 2, 3, 4, 5, 6])
+_SEVEN_MASK = 1 << 5
+_WHEEL_ONLY_FLAG = 1 << 13
+
+_FLUSH_SUIT = [-1] * (1 << 12)
+for _suit_key in xrange(1 << 12):
+	for _suit_index in xrange(4):
+		if (_suit_key >> (3 * _suit_index)) & 7 >= 5:
+			_FLUSH_SUIT[_suit_key] = _suit_index
+
+# Both rank tables fill in on first lookup; build_rank_tables fills them completely
+_VALUE_RANK = {}
+_FLUSH_RANK = {}
+
+def _value_rank(value_key):
+	list_of_values = []
+	for value in xrange(14, 1, -1):
+		list_of_values += [value] * ((value_key // 5 ** (value - 2)) % 5)
+
+	if len(list_of_values) < 1 or len(list_of_values) > 7 or value_key >= 5 ** 13:
+		raise PokerHandEvaluationError('Expected between 1 and 7 distinct cards, found value key {0}'.format(value_key))
+
+	rank = _VALUE_RANK[value_key] = pack_score(_score_values(list_of_values))
+	return rank
+
+def _flush_rank(flush_key):
+	suited_values = [v for v in xrange(14, 1, -1) if flush_key & (1 << (v - 2))]
+	rank = _FLUSH_RANK[flush_key] = pack_score(_score_flush_values(suited_values, flush_key & _WHEEL_ONLY_FLAG))
+	return rank
+
+def build_rank_tables():
+	for num_of_cards in xrange(1, 8):
+		for list_of_values in combinations_with_replacement(xrange(14, 1, -1), num_of_cards):
+			value_key = sum(5 ** (v - 2) for v in list_of_values)
+			if value_key not in _VALUE_RANK and max(list_of_values.count(v) for v in list_of_values) <= 4:
+				_value_rank(value_key)
+
+	for suited_mask in xrange(1 << 13):
+		if bin(suited_mask).count('1') >= 5:
+			for flush_key in (suited_mask, suited_mask | _WHEEL_ONLY_FLAG):
+				if flush_key not in _FLUSH_RANK:
+					_flush_rank(flush_key)
+
+	for rank in set(_VALUE_RANK.itervalues()) | set(_FLUSH_RANK.itervalues()):
+		if rank not in _RANK_INFO:
+			_build_rank_info(rank)
+
+def rank_from_key(hand_key, card_mask):
+	flush_suit = _FLUSH_SUIT[hand_key >> VALUE_KEY_BITS]
+	if flush_suit < 0:
+		value_key = hand_key & VALUE_KEY_MASK
+		try:
+			return _VALUE_RANK[value_key]
+		except KeyError:
+			return _value_rank(value_key)
+
+	flush_key = (card_mask >> (16 * flush_suit)) & 0x1FFF
+	value_mask = (card_mask | card_mask >> 16 | card_mask >> 32 | card_mask >> 48) & 0x1FFF
+	if value_mask & _WHEEL_SIX_MASK == _WHEEL_SIX_MASK and not value_mask & _SEVEN_MASK:
+		flush_key |= _WHEEL_ONLY_FLAG
+	try:
+		return _FLUSH_RANK[flush_key]
+	except KeyError:
+		return _flush_rank(flush_key)
+
+def evaluate_hand(list_of_cards):
+	hand_key = 0
+	card_mask = 0
+	for card in list_of_cards:
+		hand_key += CARD_KEYS[card.id]
+		card_mask |= card.mask
+	return rank_from_key(hand_key, card_mask)
+
+# Score classes whose message names the flush suit, which a rank does not record
+SUITED_SCORE_CLASSES = frozenset([5, 8, 9])
+
+class RankInfo(object):
+	__slots__ = ('score_class', 'value', 'secondary_value', 'side_values', 'message')
+
+	def __init__(self, score_class, value, secondary_value, side_values, message):
+		self.score_class = score_class
+		self.value = value
+		self.secondary_value = secondary_value
+		self.side_values = side_values
+		# For suited score classes this has a {suit} placeholder for the flush suit
+		self.message = message
+
+	def score_message(self, flush_suit=None):
+		if self.score_class in SUITED_SCORE_CLASSES:
+			return self.message.format(suit=flush_suit)
+		return self.message
+
+def _rank_message(score_class, value, secondary_value, side_values):
+	# All messages start with the score class name
+	message = ScoredPokerHand.SCORE_CLASS[score_class]
+	if score_class == 9:
+		message += " in {suit}"
+	elif score_class == 8:
+		message += " in {{suit}}, {0} high".format(cardValueName(value))
+	elif score_class == 7:
+		message += " {0}s, ".format(cardValueName(value))
+	elif score_class == 6:
+		message += ": {0}s full of {1}s".format(cardValueName(value), cardValueName(secondary_value))
+	elif score_class == 5:
+		message += " in {{suit}}, {0} high, ".format(cardValueName(value))
+	elif score_class == 4:
+		message += ", {0} high".format(cardValueName(value))
+	elif score_class == 3:
+		message += " {0}s, ".format(cardValueName(value))
+	elif score_class == 2:
+		message += ": {0}s over {1}s, ".format(cardValueName(value), cardValueName(secondary_value))
+	elif score_class == 1:
+		message += " of {0}s, ".format(cardValueName(value))
+	elif score_class == 0:
+		message += ": {0} high, ".format(cardValueName(value))
+
+	if len(side_values) == 1:
+		message += "{0} kicker".format(cardValueName(side_values[0]))
+	elif len(side_values) > 1:
+		# With five side cards the first one is already named as the high card
+		if len(side_values) == 5:
+			side_values = side_values[1:]
+		message = "{0}{1} side cards".format(message, ", ".join(cardValueName(v) for v in side_values))
+
+	return message
+
+# RankInfo for every rank seen so far, filled on first use or all at once by build_rank_tables
+_RANK_INFO = {}
+
+def _build_rank_info(rank):
+	fields = [(rank >> (4 * (RANK_FIELDS - 1 - i))) & 0xF for i in xrange(RANK_FIELDS)]
+	side_values = tuple(v for v in fields[3:] if v)
+	info = _RANK_INFO[rank] = RankInfo(fields[0], fields[1], fields[2], side_values, _rank_message(fields[0], fields[1], fields[2], side_values))
+	return info
+
+def rank_info(rank):
+	try:
+		return _RANK_INFO[rank]
+	except KeyError:
+		return _build_rank_info(rank)
+
+class IncrementalPokerHand(object):
+	# Keeps the summed card keys and the card mask of up to seven cards, so cards can be
+	# added and removed one at a time. With fewer than seven cards the rank scores the
+	# cards held by the same rules ScoredPokerHand applies to seven.
+	MAX_CARDS = 7
+
+	def __init__(self, list_of_cards=()):
+		self.hand_key = 0
+		self.card_mask = 0
+		self._num_of_cards = 0
+		for card in list_of_cards:
+			self.add_card(card)
+
+	def copy(self):
+		other = IncrementalPokerHand()
+		other.hand_key = self.hand_key
+		other.card_mask = self.card_mask
+		other._num_of_cards = self._num_of_cards
+		return other
+
+	def num_of_cards(self):
+		return self._num_of_cards
+
+	def cards(self):
+		return [card for card in CARDS if self.card_mask & card.mask]
+
+	def __contains__(self, card):
+		return bool(self.card_mask & card.mask)
+
+	def add_card(self, card):
+		if not isinstance(card, Card):
+			raise IncrementalPokerHandCardTypeError('Expected element of type Card, found element of type {0}'.format(str(type(card))))
+		if self.card_mask & card.mask:
+			raise IncrementalPokerHandCardUniquenessError('Expected all cards unique, found two instances of {0}'.format(str(card)))
+		if self._num_of_cards == self.MAX_CARDS:
+			raise IncrementalPokerHandCardNumberError('Expected at most {0} cards, attempted to add {1}'.format(self.MAX_CARDS, str(card)))
+
+		self.hand_key += CARD_KEYS[card.id]
+		self.card_mask |= card.mask
+		self._num_of_cards += 1
+
+	def remove_card(self, card):
+		if not isinstance(card, Card):
+			raise IncrementalPokerHandCardTypeError('Expected element of type Card, found element of type {0}'.format(str(type(card))))
+		if not self.card_mask & card.mask:
+			raise IncrementalPokerHandCardMissingError('Attempted to remove {0}, which is not in the hand'.format(str(card)))
+
+		self.hand_key -= CARD_KEYS[card.id]
+		self.card_mask &= ~card.mask
+		self._num_of_cards -= 1
+
+	def rank(self):
+		if not self._num_of_cards:
+			return 0
+		return rank_from_key(self.hand_key, self.card_mask)
+
+	def score_class(self):
+		return rank_score_class(self.rank())
+
+def showdown(board, hole_cards):
+	# Scores every player against one shared board and returns (rank, players) pairs, best
+	# rank first, where players lists the indices into hole_cards holding that rank.
+	# The first pair holds the winners; more than one index there is a split pot.
+	if len(board) > 5:
+		raise ShowdownCardNumberError('Expected at most 5 board cards, was given {0}'.format(len(board)))
+
+	# Every card seen so far, to catch a card dealt twice to the board, to the board and a player or to two players
+	seen_mask = 0
+	for card in board:
+		if not isinstance(card, Card):
+			raise ShowdownCardTypeError('Expected elements of type Card, found element of type {0}'.format(str(type(card))))
+		if seen_mask & card.mask:
+			raise ShowdownCardUniquenessError('Expected all cards unique, found two instances of {0}'.format(str(card)))
+		seen_mask |= card.mask
+	board_hand = IncrementalPokerHand(board)
+
+	ranked_players = defaultdict(list)
+	for player, hand in enumerate(hole_cards):
+		if len(hand) != 2:
+			raise ShowdownCardNumberError('Expected 2 hole cards per player, was given {0}'.format(len(hand)))
+
+		hand_key = board_hand.hand_key
+		card_mask = board_hand.card_mask
+		for card in hand:
+			if not isinstance(card, Card):
+				raise ShowdownCardTypeError('Expected elements of type Card, found element of type {0}'.format(str(type(card))))
+			if seen_mask & card.mask:
+				raise ShowdownCardUniquenessError('Expected all cards unique, found two instances of {0}'.format(str(card)))
+			seen_mask |= card.mask
+			hand_key += CARD_KEYS[card.id]
+			card_mask |= card.mask
+		ranked_players[rank_from_key(hand_key, card_mask)].append(player)
+
+	return sorted(ranked_players.items(), reverse=True)
+
+class _BatchTables(object):
+	def __init__(self):
+		build_rank_tables()
+
+		self.value_keys = numpy.array(sorted(_VALUE_RANK), dtype=numpy.int64)
+		self.value_ranks = numpy.array([_VALUE_RANK[key] for key in self.value_keys], dtype=numpy.uint32)
+
+		self.flush_suit = numpy.array(_FLUSH_SUIT, dtype=numpy.int8)
+		self.flush_ranks = numpy.zeros(1 << 14, dtype=numpy.uint32)
+		for flush_key, rank in _FLUSH_RANK.items():
+			self.flush_ranks[flush_key] = rank
+
+		self.card_value_keys = numpy.array([key & VALUE_KEY_MASK for key in CARD_KEYS], dtype=numpy.int64)
+		self.card_suit_keys = numpy.array([key >> VALUE_KEY_BITS for key in CARD_KEYS], dtype=numpy.int32)
+		self.card_suits = numpy.array([SUITS.index(card.suit) for card in CARDS], dtype=numpy.int8)
+		self.card_value_bits = numpy.array([1 << (card.value - 2) for card in CARDS], dtype=numpy.int32)
+
+_batch_tables = None
+
+def evaluate_batch(card_ids, score_class=False, chunk_size=1 << 18):
+	# card_ids is an (N, 7) array of Card.id values, seven distinct cards per row
+	global _batch_tables
+
+	if numpy is None:
+		raise PokerHandEvaluationError('evaluate_batch requires numpy')
+
+	card_ids = numpy.asarray(card_ids)
+	if card_ids.ndim != 2 or card_ids.shape[1] != 7:
+		raise PokerHandEvaluationError('Expected an (N, 7) array of card ids, was given shape {0}'.format(card_ids.shape))
+	if card_ids.dtype.kind not in 'iu':
+		raise PokerHandEvaluationError('Expected integer card ids, was given dtype {0}'.format(card_ids.dtype))
+
+	if _batch_tables is None:
+		_batch_tables = _BatchTables()
+	tables = _batch_tables
+
+	ranks = numpy.empty(len(card_ids), dtype=numpy.uint32)
+	for start in xrange(0, len(card_ids), chunk_size):
+		ids = card_ids[start:start + chunk_size]
+
+		# Bad ids would index the tables anyway, from the end for negative ones, and a
+		# repeated card sums to some other hand's key, so both are rejected up front
+		bad_rows = numpy.nonzero(((ids < 0) | (ids >= len(CARDS))).any(axis=1))[0]
+		if len(bad_rows):
+			raise PokerHandEvaluationError('Expected card ids between 0 and {0}, row {1} is {2}'.format(
+				len(CARDS) - 1, start + bad_rows[0], ids[bad_rows[0]].tolist()))
+		sorted_ids = numpy.sort(ids, axis=1)
+		bad_rows = numpy.nonzero((sorted_ids[:, 1:] == sorted_ids[:, :-1]).any(axis=1))[0]
+		if len(bad_rows):
+			raise PokerHandEvaluationError('Expected seven distinct cards per row, row {0} is {1}'.format(
+				start + bad_rows[0], ids[bad_rows[0]].tolist()))
+
+		value_keys = tables.card_value_keys[ids].sum(axis=1)
+		chunk_ranks = tables.value_ranks[numpy.searchsorted(tables.value_keys, value_keys)]
+
+		flush_suits = tables.flush_suit[tables.card_suit_keys[ids].sum(axis=1)]
+		flush_rows = numpy.nonzero(flush_suits >= 0)[0]
+		if len(flush_rows):
+			flush_ids = ids[flush_rows]
+			value_bits = tables.card_value_bits[flush_ids]
+			in_suit = tables.card_suits[flush_ids] == flush_suits[flush_rows][:, numpy.newaxis]
+
+			flush_keys = numpy.where(in_suit, value_bits, 0).sum(axis=1)
+			value_masks = numpy.bitwise_or.reduce(value_bits, axis=1)
+			wheel_only = ((value_masks & _WHEEL_SIX_MASK) == _WHEEL_SIX_MASK) & ((value_masks & _SEVEN_MASK) == 0)
+			flush_keys |= numpy.where(wheel_only, _WHEEL_ONLY_FLAG, 0)
+
+			chunk_ranks[flush_rows] = tables.flush_ranks[flush_keys]
+
+		ranks[start:start + len(ids)] = chunk_ranks
+
+	if score_class:
+		return ranks, (ranks >> RANK_CLASS_SHIFT).astype(numpy.uint8)
+	return ranks
+
+# Each score class is reached through its own branch of ScoredPokerHand._score_cards
+SCORING_BRANCHES = ["high_card", "pair", "two_pair", "three", "straight", "flush", "full_house", "four", "straight_flush", "royal_flush"]
+
+class ScoringInstrumentation(object):
+	def __init__(self):
+		self.reset()
+
+	def reset(self):
+		self.calls = [0] * len(SCORING_BRANCHES)
+		self.seconds = [0.0] * len(SCORING_BRANCHES)
+		self.allocations = [0] * len(SCORING_BRANCHES)
+
+	def measure(self, hand, list_of_cards):
+		# The collector is paused so its generation 0 count is the net number of
+		# container objects the branch created and kept alive
+		gc_was_enabled = gc.isenabled()
+		gc.disable()
+		try:
+			allocations_before = gc.get_count()[0]
+			start = default_timer()
+			hand._score_branches(list_of_cards)
+			elapsed = default_timer() - start
+			allocations = gc.get_count()[0] - allocations_before
+		finally:
+			if gc_was_enabled:
+				gc.enable()
+
+		self.calls[hand.score_class] += 1
+		self.seconds[hand.score_class] += elapsed
+		self.allocations[hand.score_class] += allocations
+
+	def snapshot(self):
+		return dict((branch, {'calls': self.calls[index], 'seconds': self.seconds[index], 'allocations': self.allocations[index]})
+			for index, branch in enumerate(SCORING_BRANCHES))
+
+	def dump(self, path):
+		with open(path, 'w') as snapshot_file:
+			json.dump(self.snapshot(), snapshot_file, indent=2, sort_keys=True)
+
+# None unless instrumentation is enabled, so the disabled cost is a single check per scored hand
+_instrumentation = None
+
+def enable_instrumentation():
+	global _instrumentation
+	if _instrumentation is None:
+		_instrumentation = ScoringInstrumentation()
+	return _instrumentation
+
+def disable_instrumentation():
+	global _instrumentation
+	instrumentation, _instrumentation = _instrumentation, None
+	return instrumentation
+
+def instrumentation_snapshot():
+	if _instrumentation is None:
+		return None
+	return _instrumentation.snapshot()
+
 class ScoredPokerHand(object):
 	SCORE_CLASS = ["High Card", "Pair", "Two pair", "Three", "Straight", "Flush", "Full house", "Four", "Straight flush", "Royal flush"]
 
-	def __init__(self, list_of_cards):
+	# Breakdown attributes a lazy hand only builds when one of them is first read
+	LAZY_ATTRIBUTES = frozenset(['list_of_cards', 'played_cards', 'unplayed_cards', 'side_cards', 'flush_suit'])
+
+	def __init__(self, list_of_cards, lazy=False):
 		if len(list_of_cards) != 7:
 			raise ScoredPokerHandInitializationCardNumberError('Expected 7 cards, was given {0}'.format( len(list_of_cards)))
+
+		hand_key = 0
+		card_mask = 0
 		for card in list_of_cards:
 			if not isinstance(card, Card):
 				raise ScoredPokerHandInitializationCardTypeError('Expected elements of type Card, found element of type {0}'.format(str(type(card))))
+			if card_mask & card.mask:
+				raise ScoredPokerHandInitializationCardUniquenessError('Expected all cards unique, found two instances of {0}'.format(str(card)))
+			hand_key += CARD_KEYS[card.id]
+			card_mask |= card.mask
 
+		self.rank = rank_from_key(hand_key, card_mask)
+		self._message = None
+
+		if lazy:
+			self._lazy_cards = tuple(list_of_cards)
+			self.score_class = self.rank >> RANK_CLASS_SHIFT
+			self.value = (self.rank >> (RANK_CLASS_SHIFT - 4)) & 0xF
+			self.secondary_value = (self.rank >> (RANK_CLASS_SHIFT - 8)) & 0xF
+		else:
+			self._score_cards(list_of_cards)
+
+	def __getattr__(self, name):
+		# Only called for attributes that are not set yet, which for a lazy hand means the breakdown
+		if name in self.LAZY_ATTRIBUTES and '_lazy_cards' in self.__dict__:
+			self._score_cards(self.__dict__.pop('_lazy_cards'))
+			return getattr(self, name)
+		raise AttributeError("'{0}' object has no attribute '{1}'".format(type(self).__name__, name))
+
+	def _score_cards(self, list_of_cards):
+		if _instrumentation is None:
+			self._score_branches(list_of_cards)
+		else:
+			_instrumentation.measure(self, list_of_cards)
+
+	def _score_branches(self, list_of_cards):
 		self.played_cards = []
 		self.unplayed_cards = []
 
 		list_of_cards = self.list_of_cards = sorted( list_of_cards )
-
-		for card in list_of_cards:
-			if list_of_cards.count(card) > 1:
-				raise ScoredPokerHandInitializationCardUniquenessError('Expected all cards unique, found two instances of {0}'.format(str(card)))
 		
 		value_histogram, inverse_value_histogram = createHistograms([card.value for card in list_of_cards])
 		suit_histogram, inverse_suit_histogram = createHistograms([card.suit for card in list_of_cards])
@@ -75,16 +594,7 @@ class ScoredPokerHand(object):
 			flush = True
 			self.flush_suit = [inverse_suit_histogram[x][0] for x in xrange(5,8) if x in inverse_suit_histogram][0]
 
-		straight_high = 0
-
-		list_of_values = value_histogram.keys()
-
-		for value in value_histogram.keys():
-			if all( v in value_histogram.keys() for v in xrange(value+1, value+4) ):
-				if (value == 2 and 14 in list_of_values):
-					straight_high = value + 3
-				elif (value+4 in list_of_values):
-					straight_high = value + 4
+		straight_high = findStraightHigh(value_histogram)
 
 		if straight_high > 0 and flush:
 			for value in xrange(straight_high-2, straight_high+1):
@@ -219,49 +729,20 @@ class ScoredPokerHand(object):
 				raise ScoredPokerHandInitializationSideCardError(
 					"All side_cards must be of type Card, found element of type {0}".format(str(type(card))))
 		self.side_cards = side_cards
+		# The rank drives comparisons and the message, so it follows the score set here
+		self.rank = pack_score(self._score_tuple())
+		self._message = None
 
 
 	def score_message(self):
-
-		# All messages start with the score class name
-		message = self.SCORE_CLASS[self.score_class]
-		if self.score_class == 9:
-			message += " in {0}".format(self.flush_suit)
-		elif self.score_class == 8:
-			message += " in {0}, {1} high".format(self.flush_suit, cardValueName(self.value))
-		elif self.score_class == 7:
-			message += " {0}s, ".format(cardValueName(self.value))
-		elif self.score_class == 6:
-			message += ": {0}s full of {1}s".format(cardValueName(self.value), cardValueName(self.secondary_value))
-		elif self.score_class == 5:
-			message += " in {0}, {1} high, ".format(self.flush_suit, cardValueName(self.value))
-		elif self.score_class == 4:
-			message += ", {0} high".format(cardValueName(self.value))
-		elif self.score_class == 3:
-			message += " {0}s, ".format(cardValueName(self.value))
-		elif self.score_class == 2:
-			message += ": {0}s over {1}s, ".format(cardValueName(self.value), cardValueName(self.secondary_value))
-		elif self.score_class == 1:
-			message += " of {0}s, ".format(cardValueName(self.value))
-		elif self.score_class == 0:
-			message += ": {0} high, ".format(cardValueName(self.value))
-
-		if len(self.side_cards) == 1:
-			message += "{0} kicker".format(cardValueName(self.side_cards[0].value))
-		elif len(self.side_cards) > 1:
-			if len(self.side_cards) == 5:
-				for card in self.side_cards[1:]:	
-					message += "{0}, ".format(cardValueName(card.value))
-			else:
-				for card in self.side_cards:	
-					message += "{0}, ".format(cardValueName(card.value))
-
-			message = "{0} side cards".format(message[0:-2])
-
-		return message
+		if self._message is None:
+			info = rank_info(self.rank)
+			# Only flushes need the breakdown, for their suit
+			self._message = info.score_message(self.flush_suit if info.score_class in SUITED_SCORE_CLASSES else None)
+		return self._message
 
 	def _score_tuple(self):
 		return (self.score_class, self.value, self.secondary_value) + tuple( card.value for card in self.side_cards )
 
 	def __cmp__(self, other):
-		return cmp(self._score_tuple(), other._score_tuple())
+		return cmp(self.rank, other.rank)
@@ -1,7 +1,11 @@
 #!/usr/bin/python
 
 import deck_of_cards
+import json
+import os
 import poker_hand
+import random
+import tempfile
 import unittest
 
 def cardCreator(suit, value):
@@ -52,6 +56,15 @@ class testScoredPokerHandSetScore(unittest.TestCase):
 		side_cards.append("Not a card")
 		self.assertRaises(poker_hand.ScoredPokerHandInitializationSideCardError, self.hand._set_score, 0, side_cards=side_cards)
 
+	def test_setScoreUpdatesRank(self):
+		full_house = poker_hand.ScoredPokerHand(cardListCreator([(0,9),(1,9),(2,9),(3,8),(0,8),(1,2),(2,3)]))
+		self.hand.score_message()
+		self.hand._set_score(6, value=9, secondary_value=8)
+
+		self.assertEquals(full_house.rank, self.hand.rank)
+		self.assertEquals(full_house.score_message(), self.hand.score_message())
+		self.assertEquals(0, cmp(full_house, self.hand))
+
 
 class testScoredPokerHandInit(unittest.TestCase):
 	def setUp(self):
@@ -960,5 +973,364 @@ class testScoredPokerHandCmp(unittest.TestCase):
 		self.assertTrue(high_hand_1 < high_hand_2)
 		self.assertFalse(high_hand_1 > high_hand_2)
 
+class testScoredPokerHandLazy(unittest.TestCase):
+	def setUp(self):
+		self.list_of_cards = cardListCreator([(3,2),(3,13),(3,5),(1,5),(2,7),(2,9),(3,7)])
+		self.lazy_hand = poker_hand.ScoredPokerHand(self.list_of_cards, lazy=True)
+		self.eager_hand = poker_hand.ScoredPokerHand(self.list_of_cards)
+
+	def test_breakdownDeferred(self):
+		for name in poker_hand.ScoredPokerHand.LAZY_ATTRIBUTES:
+			self.assertFalse(name in self.lazy_hand.__dict__)
+
+	def test_score(self):
+		self.assertEquals(self.eager_hand.score_class, self.lazy_hand.score_class)
+		self.assertEquals(self.eager_hand.value, self.lazy_hand.value)
+		self.assertEquals(self.eager_hand.secondary_value, self.lazy_hand.secondary_value)
+		self.assertEquals(self.eager_hand.rank, self.lazy_hand.rank)
+
+	def test_cmp(self):
+		self.assertFalse(self.lazy_hand < self.eager_hand)
+		self.assertFalse(self.lazy_hand > self.eager_hand)
+		self.assertFalse(any(name in self.lazy_hand.__dict__ for name in poker_hand.ScoredPokerHand.LAZY_ATTRIBUTES))
+
+	def test_breakdown(self):
+		self.assertEquals(self.eager_hand.played_cards, self.lazy_hand.played_cards)
+		self.assertEquals(self.eager_hand.unplayed_cards, self.lazy_hand.unplayed_cards)
+		self.assertEquals(self.eager_hand.side_cards, self.lazy_hand.side_cards)
+		self.assertEquals(self.eager_hand.list_of_cards, self.lazy_hand.list_of_cards)
+		self.assertEquals(self.eager_hand.flush_suit, self.lazy_hand.flush_suit)
+		self.assertEquals(self.eager_hand._score_tuple(), self.lazy_hand._score_tuple())
+
+	def test_breakdownCached(self):
+		played_cards = self.lazy_hand.played_cards
+
+		self.assertTrue(played_cards is self.lazy_hand.played_cards)
+
+	def test_scoreMessage(self):
+		message = self.lazy_hand.score_message()
+
+		self.assertEquals(self.eager_hand.score_message(), message)
+		self.assertTrue(message is self.lazy_hand.score_message())
+
+	def test_missingAttribute(self):
+		self.assertRaises(AttributeError, getattr, self.lazy_hand, 'not_an_attribute')
+
+	def test_lazyValidation(self):
+		self.list_of_cards[0] = self.list_of_cards[1]
+		self.assertRaises(poker_hand.ScoredPokerHandInitializationCardUniquenessError, poker_hand.ScoredPokerHand, self.list_of_cards, lazy=True)
+
+class testEvaluateHand(unittest.TestCase):
+	def assertMatchesScoredPokerHand(self, list_of_cards):
+		expected_rank = poker_hand.pack_score(poker_hand.ScoredPokerHand(list_of_cards)._score_tuple())
+		self.assertEquals(expected_rank, poker_hand.evaluate_hand(list_of_cards))
+
+	def test_packScoreOrder(self):
+		scores = [(0,14,0,14,9,8,7,5), (1,2,0,14,13,12), (2,3,2,14), (2,7,13,3), (9,0,0)]
+		ranks = [poker_hand.pack_score(score) for score in scores]
+
+		self.assertEquals(sorted(ranks), ranks)
+
+	def test_rankScoreClass(self):
+		for score_class in xrange(10):
+			rank = poker_hand.pack_score((score_class, 14, 13))
+			self.assertEquals(score_class, poker_hand.rank_score_class(rank))
+
+	def test_RoyalFlush(self):
+		self.assertMatchesScoredPokerHand(cardListCreator([(0,14),(0,13),(0,12),(0,11),(0,10),(1,2),(2,3)]))
+
+	def test_LoweredStraightFlushAceLow(self):
+		self.assertMatchesScoredPokerHand(cardListCreator([(0,14),(0,2),(0,3),(0,4),(0,5),(0,7),(1,6)]))
+
+	def test_SixHighStraightFlushWithAce(self):
+		six_high = cardListCreator([(1,14),(0,2),(0,3),(0,4),(0,5),(0,6),(2,9)])
+
+		self.assertMatchesScoredPokerHand(six_high)
+		self.assertEquals(5, poker_hand.rank_score_class(poker_hand.evaluate_hand(six_high)))
+
+	def test_WheelStraightWithSix(self):
+		self.assertMatchesScoredPokerHand(cardListCreator([(0,14),(1,2),(1,3),(2,4),(1,5),(3,6),(2,9)]))
+
+	def test_TwoThrees(self):
+		self.assertMatchesScoredPokerHand(cardListCreator([(0,13),(1,13),(2,13),(0,7),(1,7),(2,7),(3,2)]))
+
+	def test_ThreePairs(self):
+		self.assertMatchesScoredPokerHand(cardListCreator([(0,13),(1,13),(0,7),(1,7),(0,3),(1,3),(3,2)]))
+
+	def test_RandomHands(self):
+		rng = random.Random(7)
+		deck = [card for card in deck_of_cards.generateDeck()]
+
+		for i in xrange(2000):
+			self.assertMatchesScoredPokerHand(rng.sample(deck, 7))
+
+	def test_TooManyCards(self):
+		list_of_cards = cardListCreator([(0,2),(1,2),(2,2),(0,3),(1,3),(2,3),(0,4),(1,4)])
+
+		self.assertRaises(poker_hand.PokerHandEvaluationError, poker_hand.evaluate_hand, list_of_cards)
+
+	def test_ScoredPokerHandRank(self):
+		list_of_cards = cardListCreator([(3,2),(3,8),(3,5),(1,4),(2,8),(2,9),(3,7)])
+		scored_poker_hand = poker_hand.ScoredPokerHand(list_of_cards)
+
+		self.assertEquals(poker_hand.evaluate_hand(list_of_cards), scored_poker_hand.rank)
+
+	def test_buildRankTables(self):
+		poker_hand.build_rank_tables()
+		list_of_cards = cardListCreator([(0,14),(0,2),(0,3),(0,4),(0,5),(0,7),(1,6)])
+
+		self.assertMatchesScoredPokerHand(list_of_cards)
+
+class testIncrementalPokerHand(unittest.TestCase):
+	def setUp(self):
+		self.hole_cards = cardListCreator([(0,14),(0,13)])
+		self.board = cardListCreator([(0,12),(2,12),(0,11),(3,2),(0,10)])
+		self.hand = poker_hand.IncrementalPokerHand(self.hole_cards)
+
+	def test_streets(self):
+		self.assertEquals(2, self.hand.num_of_cards())
+		self.assertEquals(0, self.hand.score_class())
+
+		for card in self.board[:3]:
+			self.hand.add_card(card)
+		self.assertEquals(1, self.hand.score_class())
+
+		self.hand.add_card(self.board[3])
+		self.assertEquals(poker_hand.evaluate_hand(self.hole_cards + self.board[:4]), self.hand.rank())
+
+		self.hand.add_card(self.board[4])
+		self.assertEquals(9, self.hand.score_class())
+		self.assertEquals(poker_hand.ScoredPokerHand(self.hole_cards + self.board).rank, self.hand.rank())
+
+	def test_removeRestores(self):
+		for card in self.board[:4]:
+			self.hand.add_card(card)
+		turn_rank = self.hand.rank()
+
+		self.hand.add_card(self.board[4])
+		self.hand.remove_card(self.board[4])
+
+		self.assertEquals(turn_rank, self.hand.rank())
+		self.assertEquals(6, self.hand.num_of_cards())
+
+	def test_randomWalk(self):
+		rng = random.Random(3)
+		deck = [card for card in deck_of_cards.generateDeck()]
+		hand = poker_hand.IncrementalPokerHand()
+		held_cards = []
+		for step in xrange(2000):
+			if len(held_cards) == 7 or (held_cards and rng.random() < 0.4):
+				card = held_cards.pop(rng.randrange(len(held_cards)))
+				hand.remove_card(card)
+			else:
+				card = rng.choice([card for card in deck if card not in held_cards])
+				held_cards.append(card)
+				hand.add_card(card)
+
+			self.assertEquals(sorted(held_cards), sorted(hand.cards()))
+			if len(held_cards) == 7:
+				self.assertEquals(poker_hand.ScoredPokerHand(held_cards).rank, hand.rank())
+
+	def test_copy(self):
+		other = self.hand.copy()
+		other.add_card(self.board[0])
+
+		self.assertEquals(2, self.hand.num_of_cards())
+		self.assertFalse(self.board[0] in self.hand)
+		self.assertTrue(self.board[0] in other)
+
+	def test_empty(self):
+		self.assertEquals(0, poker_hand.IncrementalPokerHand().rank())
+
+	def test_addDuplicate(self):
+		self.assertRaises(poker_hand.IncrementalPokerHandCardUniquenessError, self.hand.add_card, self.hole_cards[0])
+
+	def test_addTooMany(self):
+		for card in self.board:
+			self.hand.add_card(card)
+		self.assertRaises(poker_hand.IncrementalPokerHandCardNumberError, self.hand.add_card, cardCreator(1, 3))
+
+	def test_addBadType(self):
+		self.assertRaises(poker_hand.IncrementalPokerHandCardTypeError, self.hand.add_card, "Not a card")
+
+	def test_removeMissing(self):
+		self.assertRaises(poker_hand.IncrementalPokerHandCardMissingError, self.hand.remove_card, self.board[0])
+
+class testShowdown(unittest.TestCase):
+	def setUp(self):
+		self.board = cardListCreator([(0,12),(2,12),(0,11),(3,2),(1,7)])
+		self.hole_cards = [cardListCreator([(1,14),(3,11)]),
+				   cardListCreator([(3,12),(1,3)]),
+				   cardListCreator([(2,14),(2,11)]),
+				   cardListCreator([(0,4),(0,5)])]
+
+	def test_ranking(self):
+		results = poker_hand.showdown(self.board, self.hole_cards)
+
+		self.assertEquals([[1], [0, 2], [3]], [players for rank, players in results])
+		for rank, players in results:
+			for player in players:
+				self.assertEquals(poker_hand.ScoredPokerHand(self.board + self.hole_cards[player]).rank, rank)
+
+	def test_matchesScoredPokerHand(self):
+		rng = random.Random(5)
+		deck = [card for card in deck_of_cards.generateDeck()]
+		for deal in xrange(200):
+			cards = rng.sample(deck, 23)
+			board, hole_cards = cards[:5], [cards[5 + 2 * i:7 + 2 * i] for i in xrange(9)]
+			scored_hands = [poker_hand.ScoredPokerHand(board + hand) for hand in hole_cards]
+			best_hand = max(scored_hands)
+
+			results = poker_hand.showdown(board, hole_cards)
+			self.assertEquals([player for player, hand in enumerate(scored_hands) if not hand < best_hand], results[0][1])
+			self.assertEquals(sorted(hand.rank for hand in scored_hands), sorted(rank for rank, players in results for player in players))
+
+	def test_noPlayers(self):
+		self.assertEquals([], poker_hand.showdown(self.board, []))
+
+	def test_sharedCard(self):
+		self.hole_cards[3] = cardListCreator([(1,14),(0,5)])
+		self.assertRaises(poker_hand.ShowdownCardUniquenessError, poker_hand.showdown, self.board, self.hole_cards)
+
+	def test_boardCard(self):
+		self.hole_cards[3] = cardListCreator([(0,12),(0,5)])
+		self.assertRaises(poker_hand.ShowdownCardUniquenessError, poker_hand.showdown, self.board, self.hole_cards)
+
+	def test_wrongNumberOfHoleCards(self):
+		self.hole_cards[3] = cardListCreator([(0,4)])
+		self.assertRaises(poker_hand.ShowdownCardNumberError, poker_hand.showdown, self.board, self.hole_cards)
+
+	def test_badCardType(self):
+		self.hole_cards[3] = ["Not a card", cardCreator(0, 4)]
+		self.assertRaises(poker_hand.ShowdownCardTypeError, poker_hand.showdown, self.board, self.hole_cards)
+
+	def test_duplicateBoardCard(self):
+		self.board[4] = cardCreator(0, 12)
+		self.assertRaises(poker_hand.ShowdownCardUniquenessError, poker_hand.showdown, self.board, self.hole_cards)
+
+	def test_tooManyBoardCards(self):
+		board = self.board + cardListCreator([(1,9),(1,10)])
+		self.assertRaises(poker_hand.ShowdownCardNumberError, poker_hand.showdown, board, self.hole_cards)
+		self.assertRaises(poker_hand.ShowdownCardNumberError, poker_hand.showdown, board[:6], [])
+
+	def test_badBoardCardType(self):
+		self.board[4] = "Not a card"
+		self.assertRaises(poker_hand.ShowdownCardTypeError, poker_hand.showdown, self.board, self.hole_cards)
+
+class testRankInfo(unittest.TestCase):
+	def test_fields(self):
+		hand = poker_hand.ScoredPokerHand(cardListCreator([(0,8),(1,8),(2,9),(3,7),(0,5),(1,3),(2,2)]))
+		info = poker_hand.rank_info(hand.rank)
+
+		self.assertEquals(1, info.score_class)
+		self.assertEquals(8, info.value)
+		self.assertEquals(0, info.secondary_value)
+		self.assertEquals((9, 7, 5), info.side_values)
+		self.assertEquals(hand.score_message(), info.message)
+
+	def test_suitPlaceholder(self):
+		hand = poker_hand.ScoredPokerHand(cardListCreator([(3,11),(3,7),(3,6),(3,5),(3,2),(1,3),(2,4)]))
+		info = poker_hand.rank_info(hand.rank)
+
+		self.assertEquals("Flush in {suit}, Jack high, Seven, Six, Five, Two side cards", info.message)
+		self.assertEquals("Flush in Spades, Jack high, Seven, Six, Five, Two side cards", info.score_message('Spades'))
+
+	def test_interned(self):
+		first_hand = poker_hand.ScoredPokerHand(cardListCreator([(0,8),(1,8),(2,9),(3,7),(0,5),(1,3),(2,2)]))
+		second_hand = poker_hand.ScoredPokerHand(cardListCreator([(2,8),(3,8),(0,9),(1,7),(2,5),(3,3),(0,2)]))
+
+		self.assertTrue(poker_hand.rank_info(first_hand.rank) is poker_hand.rank_info(second_hand.rank))
+
+	def test_lazyMessageKeepsLazy(self):
+		hand = poker_hand.ScoredPokerHand(cardListCreator([(0,8),(1,8),(2,9),(3,7),(0,5),(1,3),(2,2)]), lazy=True)
+		hand.score_message()
+
+		self.assertTrue('_lazy_cards' in hand.__dict__)
+
+@unittest.skipIf(poker_hand.numpy is None, 'numpy is not installed')
+class testEvaluateBatch(unittest.TestCase):
+	def setUp(self):
+		rng = random.Random(11)
+		deck = [card for card in deck_of_cards.generateDeck()]
+		self.hands = [rng.sample(deck, 7) for i in xrange(3000)]
+		self.hands.append(cardListCreator([(1,14),(0,2),(0,3),(0,4),(0,5),(0,6),(2,9)]))
+		self.hands.append(cardListCreator([(0,14),(0,2),(0,3),(0,4),(0,5),(0,7),(1,6)]))
+		self.hands.append(cardListCreator([(0,14),(0,13),(0,12),(0,11),(0,10),(1,2),(2,3)]))
+		self.card_ids = [[card.id for card in hand] for hand in self.hands]
+
+	def test_matchesEvaluateHand(self):
+		ranks = poker_hand.evaluate_batch(self.card_ids, chunk_size=1000)
+
+		self.assertEquals([poker_hand.evaluate_hand(hand) for hand in self.hands], ranks.tolist())
+
+	def test_scoreClass(self):
+		ranks, score_classes = poker_hand.evaluate_batch(self.card_ids, score_class=True)
+
+		self.assertEquals([poker_hand.rank_score_class(rank) for rank in ranks.tolist()], score_classes.tolist())
+
+	def test_empty(self):
+		self.assertEquals(0, len(poker_hand.evaluate_batch(poker_hand.numpy.zeros((0, 7), dtype=int))))
+
+	def test_badShape(self):
+		self.assertRaises(poker_hand.PokerHandEvaluationError, poker_hand.evaluate_batch, [[0, 1, 2, 3, 4, 5]])
+
+	def test_badCardIds(self):
+		self.assertRaises(poker_hand.PokerHandEvaluationError, poker_hand.evaluate_batch, [[-1, -2, -3, -4, -5, -6, -7]])
+		self.assertRaises(poker_hand.PokerHandEvaluationError, poker_hand.evaluate_batch, self.card_ids[:5] + [[0, 1, 2, 3, 4, 5, 52]])
+		self.assertRaises(poker_hand.PokerHandEvaluationError, poker_hand.evaluate_batch, [[0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]])
+
+	def test_duplicateCards(self):
+		self.assertRaises(poker_hand.PokerHandEvaluationError, poker_hand.evaluate_batch, [[0, 0, 0, 0, 0, 1, 2]])
+		self.assertRaises(poker_hand.PokerHandEvaluationError, poker_hand.evaluate_batch, self.card_ids[:5] + [[0, 4, 8, 12, 16, 20, 0]])
+
+class testScoringInstrumentation(unittest.TestCase):
+	def tearDown(self):
+		poker_hand.disable_instrumentation()
+
+	def test_disabledByDefault(self):
+		poker_hand.ScoredPokerHand(cardListCreator([(0,2),(1,2),(2,5),(3,7),(0,9),(1,11),(2,13)]))
+
+		self.assertEquals(None, poker_hand.instrumentation_snapshot())
+
+	def test_countsBranches(self):
+		poker_hand.enable_instrumentation()
+		poker_hand.ScoredPokerHand(cardListCreator([(0,2),(1,2),(2,5),(3,7),(0,9),(1,11),(2,13)]))
+		poker_hand.ScoredPokerHand(cardListCreator([(0,2),(1,2),(2,5),(3,7),(0,9),(1,11),(2,11)]))
+		poker_hand.ScoredPokerHand(cardListCreator([(0,14),(0,13),(0,12),(0,11),(0,10),(1,2),(2,3)]))
+		snapshot = poker_hand.instrumentation_snapshot()
+
+		self.assertEquals(1, snapshot['pair']['calls'])
+		self.assertEquals(1, snapshot['two_pair']['calls'])
+		self.assertEquals(1, snapshot['royal_flush']['calls'])
+		self.assertEquals(0, snapshot['flush']['calls'])
+		self.assertTrue(snapshot['pair']['seconds'] > 0)
+
+	def test_lazyCountedOnMaterialise(self):
+		poker_hand.enable_instrumentation()
+		hand = poker_hand.ScoredPokerHand(cardListCreator([(0,2),(1,2),(2,5),(3,7),(0,9),(1,11),(2,13)]), lazy=True)
+
+		self.assertEquals(0, poker_hand.instrumentation_snapshot()['pair']['calls'])
+		hand.played_cards
+		self.assertEquals(1, poker_hand.instrumentation_snapshot()['pair']['calls'])
+
+	def test_reset(self):
+		instrumentation = poker_hand.enable_instrumentation()
+		poker_hand.ScoredPokerHand(cardListCreator([(0,2),(1,2),(2,5),(3,7),(0,9),(1,11),(2,13)]))
+		instrumentation.reset()
+
+		self.assertEquals(0, poker_hand.instrumentation_snapshot()['pair']['calls'])
+
+	def test_dump(self):
+		instrumentation = poker_hand.enable_instrumentation()
+		poker_hand.ScoredPokerHand(cardListCreator([(0,2),(1,2),(2,5),(3,7),(0,9),(1,11),(2,13)]))
+		handle, path = tempfile.mkstemp()
+		os.close(handle)
+		try:
+			instrumentation.dump(path)
+			with open(path) as snapshot_file:
+				self.assertEquals(instrumentation.snapshot(), json.load(snapshot_file))
+		finally:
+			os.remove(path)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/python
+
+import argparse
+import mmap
+import multiprocessing
+import random
+import struct
+
+from deck_of_cards import Card, SUITS
+from equity import calculate_equity
+
+
+class Error(Exception):
+	pass
+
+class StartingHandError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class PreflopTableFormatError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+# Starting hands sit on a 13 x 13 grid with aces first: pairs on the diagonal,
+# suited hands above it (row = high card) and offsuit hands below it (row = low card)
+NUM_OF_CLASSES = 169
+
+FILE_MAGIC = 'PFEQ'
+FILE_VERSION = 1
+# Magic, version, number of classes, trials per matchup
+HEADER_FORMAT = '<4sHHI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+EQUITY_SCALE = 65535
+
+VALUE_LETTERS = '23456789TJQKA'
+
+def _value_letter(value):
+	return VALUE_LETTERS[value - 2]
+
+def starting_hand_class(list_of_cards):
+	if len(list_of_cards) != 2:
+		raise StartingHandError('Expected 2 hole cards, was given {0}'.format(len(list_of_cards)))
+	if list_of_cards[0] == list_of_cards[1]:
+		raise StartingHandError('Expected two different cards, found two instances of {0}'.format(str(list_of_cards[0])))
+
+	high_value = max(card.value for card in list_of_cards)
+	low_value = min(card.value for card in list_of_cards)
+	if list_of_cards[0].suit == list_of_cards[1].suit:
+		return (14 - high_value) * 13 + (14 - low_value)
+	return (14 - low_value) * 13 + (14 - high_value)
+
+def _class_values(hand_class):
+	row, column = divmod(hand_class, 13)
+	return 14 - min(row, column), 14 - max(row, column), row < column
+
+def starting_hand_class_name(hand_class):
+	high_value, low_value, suited = _class_values(hand_class)
+	name = _value_letter(high_value) + _value_letter(low_value)
+	if high_value == low_value:
+		return name
+	return name + ('s' if suited else 'o')
+
+def class_combos(hand_class):
+	high_value, low_value, suited = _class_values(hand_class)
+	if suited:
+		return [[Card(suit, high_value), Card(suit, low_value)] for suit in SUITS]
+	return [[Card(high_suit, high_value), Card(low_suit, low_value)]
+		for high_suit in SUITS for low_suit in SUITS
+		if high_suit != low_suit and (high_value != low_value or high_suit > low_suit)]
+
+def matchup_equity(hand_class, other_class, trials, seed=None):
+	# Equity of hand_class against other_class, averaged over every pair of combos that share no card.
+	# Each pair is equally likely, so each gets the same share of the trials and the same weight.
+	pairs = [(hand, other_hand) for hand in class_combos(hand_class) for other_hand in class_combos(other_class)
+		 if not set(hand) & set(other_hand)]
+
+	seed_rng = random.Random(seed)
+	pair_trials = max(1, trials // len(pairs))
+	total_equity = 0.0
+	for hand, other_hand in pairs:
+		total_equity += calculate_equity([hand, other_hand], trials=pair_trials, processes=1, shards=1, seed=seed_rng.getrandbits(64))[0].equity()
+	return total_equity / len(pairs)
+
+def _matchup_task(task):
+	hand_class, other_class, trials, seed = task
+	return hand_class, other_class, matchup_equity(hand_class, other_class, trials, seed)
+
+def write_preflop_table(path, equities, trials=0):
+	with open(path, 'wb') as table_file:
+		table_file.write(struct.pack(HEADER_FORMAT, FILE_MAGIC, FILE_VERSION, NUM_OF_CLASSES, trials))
+		for row in equities:
+			table_file.write(struct.pack('<{0}H'.format(NUM_OF_CLASSES), *[int(round(equity * EQUITY_SCALE)) for equity in row]))
+
+def build_preflop_table(path, trials=10000, processes=None, seed=None):
+	# Only matchups with hand_class < other_class are simulated. A class against itself is even,
+	# and the other half of the table follows by symmetry.
+	seed_rng = random.Random(seed)
+	tasks = [(hand_class, other_class, trials, seed_rng.getrandbits(64))
+		 for hand_class in xrange(NUM_OF_CLASSES) for other_class in xrange(hand_class + 1, NUM_OF_CLASSES)]
+
+	equities = [[0.5] * NUM_OF_CLASSES for hand_class in xrange(NUM_OF_CLASSES)]
+
+	if processes == 1:
+		matchups = map(_matchup_task, tasks)
+	else:
+		pool = multiprocessing.Pool(processes)
+		try:
+			matchups = pool.map(_matchup_task, tasks, chunksize=64)
+		finally:
+			pool.close()
+			pool.join()
+
+	for hand_class, other_class, equity in matchups:
+		equities[hand_class][other_class] = equity
+		equities[other_class][hand_class] = 1.0 - equity
+
+	write_preflop_table(path, equities, trials)
+	return equities
+
+class PreflopEquityTable(object):
+
+	def __init__(self, path):
+		self._file = open(path, 'rb')
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		if len(self._map) < HEADER_SIZE:
+			self.close()
+			raise PreflopTableFormatError('File too short for a preflop table header: {0}'.format(path))
+
+		magic, version, num_of_classes, self.trials = struct.unpack_from(HEADER_FORMAT, self._map, 0)
+		if magic != FILE_MAGIC or version != FILE_VERSION or num_of_classes != NUM_OF_CLASSES:
+			self.close()
+			raise PreflopTableFormatError('Not a version {0} preflop table: {1}'.format(FILE_VERSION, path))
+		num_of_bytes = len(self._map) - HEADER_SIZE
+		if num_of_bytes != 2 * NUM_OF_CLASSES * NUM_OF_CLASSES:
+			self.close()
+			raise PreflopTableFormatError('Expected {0} bytes of equities, found {1}'.format(2 * NUM_OF_CLASSES * NUM_OF_CLASSES, num_of_bytes))
+
+	def class_equity(self, hand_class, other_class):
+		offset = HEADER_SIZE + 2 * (hand_class * NUM_OF_CLASSES + other_class)
+		return struct.unpack_from('<H', self._map, offset)[0] / float(EQUITY_SCALE)
+
+	def equity(self, hole_cards, other_hole_cards):
+		return self.class_equity(starting_hand_class(hole_cards), starting_hand_class(other_hole_cards))
+
+	def close(self):
+		self._map.close()
+		self._file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Build a heads up preflop equity table for the 169 starting hand classes')
+	parser.add_argument('path', help='file to write the table to')
+	parser.add_argument('--trials', type=int, default=10000, help='trials per matchup')
+	parser.add_argument('--processes', type=int, default=None, help='worker processes, defaults to one per core')
+	parser.add_argument('--seed', type=int, default=None)
+	args = parser.parse_args()
+
+	build_preflop_table(args.path, trials=args.trials, processes=args.processes, seed=args.seed)
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import os
+import preflop_table
+import shutil
+import tempfile
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+class testStartingHandClass(unittest.TestCase):
+	def test_allClasses(self):
+		deck = [card for card in deck_of_cards.generateDeck()]
+		classes = set(preflop_table.starting_hand_class([first, second]) for first in deck for second in deck if first != second)
+
+		self.assertEquals(set(xrange(169)), classes)
+
+	def test_combos(self):
+		num_of_combos = sum(len(preflop_table.class_combos(hand_class)) for hand_class in xrange(169))
+
+		self.assertEquals(1326, num_of_combos)
+		for hand_class in xrange(169):
+			for combo in preflop_table.class_combos(hand_class):
+				self.assertEquals(hand_class, preflop_table.starting_hand_class(combo))
+
+	def test_names(self):
+		self.assertEquals('AA', preflop_table.starting_hand_class_name(preflop_table.starting_hand_class(cardListCreator([(0,14),(1,14)]))))
+		self.assertEquals('AKs', preflop_table.starting_hand_class_name(preflop_table.starting_hand_class(cardListCreator([(2,13),(2,14)]))))
+		self.assertEquals('T2o', preflop_table.starting_hand_class_name(preflop_table.starting_hand_class(cardListCreator([(2,2),(3,10)]))))
+		self.assertEquals(169, len(set(preflop_table.starting_hand_class_name(hand_class) for hand_class in xrange(169))))
+
+	def test_wrongNumberOfCards(self):
+		self.assertRaises(preflop_table.StartingHandError, preflop_table.starting_hand_class, cardListCreator([(0,14)]))
+
+	def test_sameCard(self):
+		self.assertRaises(preflop_table.StartingHandError, preflop_table.starting_hand_class, cardListCreator([(0,14),(0,14)]))
+
+class testMatchupEquity(unittest.TestCase):
+	def test_acesKings(self):
+		aces = preflop_table.starting_hand_class(cardListCreator([(0,14),(1,14)]))
+		kings = preflop_table.starting_hand_class(cardListCreator([(0,13),(1,13)]))
+
+		self.assertTrue(0.78 < preflop_table.matchup_equity(aces, kings, 6000, seed=1) < 0.86)
+
+	def test_fewerTrialsThanCombos(self):
+		aces = preflop_table.starting_hand_class(cardListCreator([(0,14),(1,14)]))
+		kings_offsuit = preflop_table.starting_hand_class(cardListCreator([(0,13),(1,12)]))
+
+		self.assertTrue(0.0 <= preflop_table.matchup_equity(aces, kings_offsuit, 10, seed=1) <= 1.0)
+
+class testPreflopEquityTable(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'preflop.bin')
+		self.equities = [[(row * 169 + column) / (169.0 * 169.0) for column in xrange(169)] for row in xrange(169)]
+		preflop_table.write_preflop_table(self.path, self.equities, trials=7)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def test_fileSize(self):
+		self.assertEquals(preflop_table.HEADER_SIZE + 2 * 169 * 169, os.path.getsize(self.path))
+
+	def test_classEquity(self):
+		with preflop_table.PreflopEquityTable(self.path) as table:
+			self.assertEquals(7, table.trials)
+			for row, column in [(0, 0), (0, 168), (100, 3), (168, 168)]:
+				self.assertAlmostEquals(self.equities[row][column], table.class_equity(row, column), places=4)
+
+	def test_equity(self):
+		aces = cardListCreator([(0,14),(1,14)])
+		kings = cardListCreator([(2,13),(3,13)])
+		with preflop_table.PreflopEquityTable(self.path) as table:
+			self.assertAlmostEquals(self.equities[0][14], table.equity(aces, kings), places=4)
+
+	def test_badFile(self):
+		with open(self.path, 'wb') as table_file:
+			table_file.write('not a preflop table')
+
+		self.assertRaises(preflop_table.PreflopTableFormatError, preflop_table.PreflopEquityTable, self.path)
+
+	def test_truncatedFile(self):
+		with open(self.path, 'rb') as table_file:
+			contents = table_file.read()
+		with open(self.path, 'wb') as table_file:
+			table_file.write(contents[:-2])
+
+		self.assertRaises(preflop_table.PreflopTableFormatError, preflop_table.PreflopEquityTable, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/python
+
+from deck_of_cards import Card, CARDS, SUITS
+from preflop_table import NUM_OF_CLASSES, class_combos, starting_hand_class
+
+
+class Error(Exception):
+	pass
+
+class SuitIsomorphismCardTypeError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class SuitIsomorphismCardUniquenessError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+class SuitIsomorphismIndexError(Error):
+	def __init__(self, msg):
+		self.msg = msg
+
+# A situation is a list of rounds, each a list of cards, e.g. [hole_cards, board] or
+# [hole_cards, flop, turn]. Cards within a round are unordered. Two situations are
+# isomorphic when relabelling the suits turns one into the other.
+#
+# Each suit gets a signature with one 13 bit field of card values per round, the first
+# round most significant. Sorting the four signatures forgets which suit had which, so the
+# sorted signatures are the same for every relabelling and they are packed into the
+# situation key. Keys are unique per class but not dense.
+VALUE_BITS = 13
+VALUE_MASK = (1 << VALUE_BITS) - 1
+
+FACTORIALS = [1, 1, 2, 6, 24]
+
+def _suit_signatures(rounds):
+	signatures = [0] * len(SUITS)
+	card_mask = 0
+	for round_index, list_of_cards in enumerate(rounds):
+		shift = VALUE_BITS * (len(rounds) - 1 - round_index)
+		for card in list_of_cards:
+			if not isinstance(card, Card):
+				raise SuitIsomorphismCardTypeError('Expected elements of type Card, found element of type {0}'.format(str(type(card))))
+			if card_mask & card.mask:
+				raise SuitIsomorphismCardUniquenessError('Expected all cards unique, found two instances of {0}'.format(str(card)))
+			card_mask |= card.mask
+			# Card ids are (value - 2) * 4 + suit index
+			signatures[card.id & 3] |= 1 << ((card.id >> 2) + shift)
+	return signatures
+
+def situation_key(rounds):
+	width = VALUE_BITS * len(rounds)
+	key = 0
+	for signature in sorted(_suit_signatures(rounds), reverse=True):
+		key = (key << width) | signature
+	return key
+
+def situation_from_key(key, num_of_rounds):
+	# The canonical situation for a key: suits are handed out in signature order, Clubs first
+	width = VALUE_BITS * num_of_rounds
+	rounds = [[] for round_index in xrange(num_of_rounds)]
+	for suit_index in xrange(len(SUITS)):
+		signature = (key >> (width * (len(SUITS) - 1 - suit_index))) & ((1 << width) - 1)
+		for round_index in xrange(num_of_rounds):
+			values = (signature >> (VALUE_BITS * (num_of_rounds - 1 - round_index))) & VALUE_MASK
+			for value_index in xrange(VALUE_BITS):
+				if values & (1 << value_index):
+					rounds[round_index].append(CARDS[value_index * 4 + suit_index])
+	return [sorted(list_of_cards) for list_of_cards in rounds]
+
+def canonical_situation(rounds):
+	return situation_from_key(situation_key(rounds), len(rounds))
+
+def num_of_isomorphs(rounds):
+	# How many situations share this one's key: the 24 relabellings, less those that
+	# only swap suits with the same signature
+	signatures = _suit_signatures(rounds)
+	num_of_symmetries = 1
+	for signature in set(signatures):
+		num_of_symmetries *= FACTORIALS[signatures.count(signature)]
+	return FACTORIALS[len(SUITS)] // num_of_symmetries
+
+# Hole cards alone have a dense index, the 169 starting hand classes of preflop_table
+def preflop_index(hole_cards):
+	_suit_signatures([hole_cards])
+	return starting_hand_class(hole_cards)
+
+def preflop_hand(index):
+	if not 0 <= index < NUM_OF_CLASSES:
+		raise SuitIsomorphismIndexError('Expected preflop index between 0 and {0}, observed value: {1}'.format(NUM_OF_CLASSES - 1, index))
+	return canonical_situation([class_combos(index)[0]])[0]
+
+def preflop_combos(index):
+	if not 0 <= index < NUM_OF_CLASSES:
+		raise SuitIsomorphismIndexError('Expected preflop index between 0 and {0}, observed value: {1}'.format(NUM_OF_CLASSES - 1, index))
+	return class_combos(index)
@@ -0,0 +1,110 @@
+#!/usr/bin/python
+
+import deck_of_cards
+import itertools
+import random
+import suit_isomorphism
+import unittest
+
+def cardCreator(suit, value):
+	return deck_of_cards.Card(deck_of_cards.SUITS[suit], value)
+
+def cardListCreator(list_suit_value_tuples):
+	return [cardCreator(suit, value) for (suit, value) in list_suit_value_tuples]
+
+def relabel(rounds, permutation):
+	return [[cardCreator(permutation[deck_of_cards.SUITS.index(card.suit)], card.value) for card in list_of_cards] for list_of_cards in rounds]
+
+class testSituationKey(unittest.TestCase):
+	def test_relabellingKeepsKey(self):
+		rng = random.Random(2)
+		deck = [card for card in deck_of_cards.generateDeck()]
+		for i in xrange(200):
+			cards = rng.sample(deck, 7)
+			rounds = [cards[:2], cards[2:5], cards[5:6], cards[6:]]
+			key = suit_isomorphism.situation_key(rounds)
+			for permutation in itertools.permutations(xrange(4)):
+				self.assertEquals(key, suit_isomorphism.situation_key(relabel(rounds, permutation)))
+
+	def test_roundOrderMatters(self):
+		flop = cardListCreator([(0,14),(0,13),(1,2)])
+		hole_cards = cardListCreator([(2,7),(3,7)])
+
+		self.assertNotEquals(suit_isomorphism.situation_key([hole_cards, flop]), suit_isomorphism.situation_key([flop, hole_cards]))
+
+	def test_cardOrderIgnored(self):
+		self.assertEquals(suit_isomorphism.situation_key([cardListCreator([(0,14),(1,13)])]),
+			suit_isomorphism.situation_key([cardListCreator([(1,13),(0,14)])]))
+
+	def test_preflopClasses(self):
+		deck = [card for card in deck_of_cards.generateDeck()]
+		keys = set(suit_isomorphism.situation_key([list(hole_cards)]) for hole_cards in itertools.combinations(deck, 2))
+
+		self.assertEquals(169, len(keys))
+
+	def test_boardClasses(self):
+		deck = [card for card in deck_of_cards.generateDeck()]
+		keys = set(suit_isomorphism.situation_key([list(flop)]) for flop in itertools.combinations(deck, 3))
+
+		self.assertEquals(1755, len(keys))
+
+	def test_notACard(self):
+		self.assertRaises(suit_isomorphism.SuitIsomorphismCardTypeError, suit_isomorphism.situation_key, [[cardCreator(0,2), 3]])
+
+	def test_duplicateCard(self):
+		self.assertRaises(suit_isomorphism.SuitIsomorphismCardUniquenessError, suit_isomorphism.situation_key,
+			[cardListCreator([(0,2),(1,3)]), cardListCreator([(0,2),(2,4),(3,5)])])
+
+class testSituationFromKey(unittest.TestCase):
+	def test_inverse(self):
+		rng = random.Random(3)
+		deck = [card for card in deck_of_cards.generateDeck()]
+		for i in xrange(500):
+			cards = rng.sample(deck, 7)
+			rounds = [cards[:2], cards[2:7]]
+			key = suit_isomorphism.situation_key(rounds)
+			canonical = suit_isomorphism.situation_from_key(key, 2)
+
+			self.assertEquals([2, 5], [len(list_of_cards) for list_of_cards in canonical])
+			self.assertEquals(key, suit_isomorphism.situation_key(canonical))
+			self.assertEquals(canonical, suit_isomorphism.canonical_situation(canonical))
+
+	def test_canonicalSuits(self):
+		canonical = suit_isomorphism.canonical_situation([cardListCreator([(3,14),(2,14)]), cardListCreator([(3,2),(3,3),(1,9)])])
+
+		self.assertEquals([cardListCreator([(1,14),(0,14)]), cardListCreator([(2,9),(0,3),(0,2)])], canonical)
+
+class testNumOfIsomorphs(unittest.TestCase):
+	def test_preflopCombos(self):
+		deck = [card for card in deck_of_cards.generateDeck()]
+		representatives = {}
+		for hole_cards in itertools.combinations(deck, 2):
+			representatives.setdefault(suit_isomorphism.situation_key([list(hole_cards)]), list(hole_cards))
+
+		self.assertEquals(1326, sum(suit_isomorphism.num_of_isomorphs([hole_cards]) for hole_cards in representatives.values()))
+
+	def test_pairAndSuited(self):
+		self.assertEquals(6, suit_isomorphism.num_of_isomorphs([cardListCreator([(0,14),(1,14)])]))
+		self.assertEquals(4, suit_isomorphism.num_of_isomorphs([cardListCreator([(0,14),(0,13)])]))
+		self.assertEquals(12, suit_isomorphism.num_of_isomorphs([cardListCreator([(0,14),(1,13)])]))
+
+class testPreflopIndex(unittest.TestCase):
+	def test_roundTrip(self):
+		for index in xrange(169):
+			hole_cards = suit_isomorphism.preflop_hand(index)
+
+			self.assertEquals(index, suit_isomorphism.preflop_index(hole_cards))
+			self.assertEquals(hole_cards, suit_isomorphism.canonical_situation([hole_cards])[0])
+
+	def test_combos(self):
+		self.assertEquals(1326, sum(len(suit_isomorphism.preflop_combos(index)) for index in xrange(169)))
+
+	def test_outOfRange(self):
+		self.assertRaises(suit_isomorphism.SuitIsomorphismIndexError, suit_isomorphism.preflop_hand, 169)
+		self.assertRaises(suit_isomorphism.SuitIsomorphismIndexError, suit_isomorphism.preflop_combos, -1)
+
+	def test_notACard(self):
+		self.assertRaises(suit_isomorphism.SuitIsomorphismCardTypeError, suit_isomorphism.preflop_index, [cardCreator(0,2), 'AS'])
+
+if __name__ == '__main__':
+    unittest.main()